@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 # This lets you keep GOOGLE_API_KEY in .env without hard-coding it.
 load_dotenv()
 
+from .client_provider import ClientProvider, get_default_provider
 from .search_agent import LiteratureSearchAgent
 from .summarization_agent import SummarizationAgent
 from .fact_checker_agent import FactCheckerAgent
@@ -17,6 +18,8 @@ from .writer_agent import WriterAgent
 from .orchestrator_agent import OrchestratorAgent
 
 __all__ = [
+    "ClientProvider",
+    "get_default_provider",
     "LiteratureSearchAgent",
     "SummarizationAgent",
     "FactCheckerAgent",
@@ -0,0 +1,309 @@
+"""
+Base Agent
+Common plumbing shared by the specialized research agents.
+"""
+
+import asyncio
+import sqlite3
+from typing import AsyncIterator, Awaitable, Iterator, Optional, Tuple, TypeVar
+from google import genai
+from google.genai import errors, types
+
+from config.agent_config import AgentConfig
+from .call_policy import estimate_tokens
+from .client_provider import ClientProvider, get_default_provider
+
+
+T = TypeVar("T")
+
+# Stands in for shared material that was moved into a cached context
+CACHED_CONTEXT_MARKER = "[The research material is provided in the cached context above.]"
+
+
+class BaseAgent:
+    """Base class holding the injected client provider and model settings."""
+
+    # Key into AgentConfig settings such as RESPONSE_CACHE_TTL_SECONDS
+    agent_type: Optional[str] = None
+
+    def __init__(
+        self,
+        model_name: str = "gemini-2.0-flash",
+        client_provider: Optional[ClientProvider] = None
+    ):
+        """
+        Initialize the agent.
+
+        Args:
+            model_name: The Gemini model to use for this agent
+            client_provider: Shared client provider, defaults to the process-wide one
+        """
+        self.client_provider = client_provider or get_default_provider()
+        self.model_name = model_name
+        self.system_instruction = ""
+
+    @property
+    def client(self) -> genai.Client:
+        """The pooled Gemini client owned by the provider."""
+        return self.client_provider.client
+
+    def _search_tools(self) -> list:
+        """Tools for calls grounded in Google Search."""
+        return [types.Tool(google_search=types.GoogleSearch())]
+
+    def _run_sync(self, coro: Awaitable[T]) -> T:
+        """Run one of this agent's coroutines from blocking code."""
+        return self.client_provider.run_sync(coro)
+
+    def _iter_sync(self, agen: AsyncIterator[T]) -> Iterator[T]:
+        """Iterate one of this agent's async generators from blocking code."""
+        return self.client_provider.iter_sync(agen)
+
+    def _build_config(
+        self,
+        temperature: float,
+        tools: Optional[list] = None,
+        cached_content: Optional[str] = None
+    ) -> types.GenerateContentConfig:
+        """
+        Build the generation config for one of this agent's calls.
+
+        With a cached content, the system instruction and tools live in the
+        cache and must not be repeated in the request.
+        """
+        if cached_content:
+            return self.client_provider.build_config(
+                self.model_name,
+                temperature=temperature,
+                cached_content=cached_content
+            )
+        return self.client_provider.build_config(
+            self.model_name,
+            system_instruction=self.system_instruction,
+            temperature=temperature,
+            tools=tools
+        )
+
+    async def _with_cached_context(
+        self,
+        prompt: str,
+        temperature: float,
+        tools: Optional[list],
+        shared_context: Optional[str]
+    ) -> Tuple[str, Optional[types.GenerateContentConfig], Optional[str]]:
+        """
+        Rewrite a request to reference a cached prompt prefix when one is available.
+
+        Shared material (e.g. search results sent to several agents) is cached
+        on its own so every agent can reuse it; the agent's system instruction
+        then moves into the prompt. Otherwise the system instruction and tools
+        themselves are cached.
+
+        Returns:
+            Tuple of (contents, config, cached content name), with a None config
+            when no cached prefix applies
+        """
+        manager = self.client_provider.context_cache
+        if manager is None:
+            return prompt, None, None
+
+        if shared_context and not tools and shared_context in prompt:
+            name = await manager.acquire(self.model_name, contents=shared_context)
+            if name:
+                contents = (
+                    f"{self.system_instruction.strip()}\n\n"
+                    f"{prompt.replace(shared_context, CACHED_CONTEXT_MARKER, 1)}"
+                )
+                return contents, self._build_config(temperature, cached_content=name), name
+
+        name = await manager.acquire(
+            self.model_name,
+            system_instruction=self.system_instruction,
+            tools=tools
+        )
+        if name:
+            return prompt, self._build_config(temperature, cached_content=name), name
+        return prompt, None, None
+
+    async def _open_request(
+        self,
+        method: str,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        temperature: float,
+        tools: Optional[list],
+        shared_context: Optional[str]
+    ):
+        """
+        Send a request through the call policy, using a cached prefix if possible.
+
+        Falls back to the full request if the API rejects the cached content
+        (e.g. it expired or was deleted server-side).
+
+        Args:
+            method: "generate_content" or "generate_content_stream"
+            prompt: The full prompt
+            config: The full generation config
+            temperature: Sampling temperature
+            tools: Optional tools for the call
+            shared_context: Material within the prompt that may be cached separately
+
+        Returns:
+            The response, or the response stream
+        """
+        models = self.client_provider.get_async_client().models
+        call = getattr(models, method)
+
+        async def send(contents, request_config):
+            return await self.client_provider.call_async(
+                lambda: call(model=self.model_name, contents=contents, config=request_config),
+                estimated_tokens=self._estimate_tokens(contents),
+                timeout=self._timeout()
+            )
+
+        contents, cached_config, cache_name = await self._with_cached_context(
+            prompt, temperature, tools, shared_context
+        )
+        if cached_config is not None:
+            try:
+                return await send(contents, cached_config)
+            except errors.APIError as e:
+                if e.code not in (400, 403, 404):
+                    raise
+                self.client_provider.context_cache.invalidate(cache_name)
+        return await send(prompt, config)
+
+    def _timeout(self) -> float:
+        """Deadline for one of this agent's API calls."""
+        return AgentConfig.API_TIMEOUT_SECONDS_BY_AGENT.get(
+            self.agent_type, AgentConfig.API_TIMEOUT_SECONDS
+        )
+
+    def _estimate_tokens(self, prompt: str) -> int:
+        """Estimated input tokens of a request, for rate limiting."""
+        return estimate_tokens(prompt) + estimate_tokens(self.system_instruction)
+
+    def _cache_key(self, prompt: str, config: types.GenerateContentConfig) -> Optional[str]:
+        """Cache key for a request, or None when this agent's calls aren't cached."""
+        cache = self.client_provider.response_cache
+        if cache is None or AgentConfig.RESPONSE_CACHE_TTL_SECONDS.get(self.agent_type, 0) <= 0:
+            return None
+        return cache.make_key(self.model_name, prompt, config)
+
+    async def _cache_get(self, key: Optional[str]) -> Optional[types.GenerateContentResponse]:
+        """Look up a cached response."""
+        if key is None:
+            return None
+        try:
+            payload = await asyncio.to_thread(self.client_provider.response_cache.get, key)
+        except sqlite3.Error as e:
+            print(f"Warning: Response cache lookup failed: {e}")
+            return None
+        if payload is None:
+            return None
+        return types.GenerateContentResponse.model_validate_json(payload)
+
+    async def _cache_put(self, key: Optional[str], response: types.GenerateContentResponse):
+        """Store a response for this agent's TTL."""
+        if key is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self.client_provider.response_cache.put,
+                key,
+                response.model_dump_json(exclude_none=True),
+                AgentConfig.RESPONSE_CACHE_TTL_SECONDS[self.agent_type],
+                self.agent_type
+            )
+        except sqlite3.Error as e:
+            print(f"Warning: Response cache store failed: {e}")
+
+    async def _generate_async(
+        self,
+        prompt: str,
+        temperature: float,
+        tools: Optional[list] = None,
+        shared_context: Optional[str] = None
+    ) -> types.GenerateContentResponse:
+        """
+        Run a single generation with this agent's system instruction.
+
+        Identical requests are served from the shared response cache while
+        the agent's TTL allows; API calls go through the provider's rate
+        limiter, deadline and retry policy, and reuse cached prompt prefixes.
+
+        Args:
+            prompt: The prompt to send
+            temperature: Sampling temperature
+            tools: Optional tools for the call
+            shared_context: Material within the prompt that other agents also
+                receive, cached separately when large enough
+
+        Returns:
+            The model response
+        """
+        config = self._build_config(temperature, tools)
+        key = self._cache_key(prompt, config)
+        cached = await self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        response = await self._open_request(
+            "generate_content", prompt, config, temperature, tools, shared_context
+        )
+        await self._cache_put(key, response)
+        return response
+
+    async def _generate_stream_async(
+        self,
+        prompt: str,
+        temperature: float,
+        tools: Optional[list] = None,
+        shared_context: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a generation as text chunks as soon as the model produces them.
+
+        A cached response is yielded as a single chunk; a streamed response is
+        cached once complete.
+
+        Args:
+            prompt: The prompt to send
+            temperature: Sampling temperature
+            tools: Optional tools for the call
+            shared_context: Material within the prompt that other agents also
+                receive, cached separately when large enough
+
+        Yields:
+            Text chunks of the response
+        """
+        config = self._build_config(temperature, tools)
+        key = self._cache_key(prompt, config)
+        cached = await self._cache_get(key)
+        if cached is not None:
+            if cached.text:
+                yield cached.text
+            return
+
+        stream = await self._open_request(
+            "generate_content_stream", prompt, config, temperature, tools, shared_context
+        )
+        # Once tokens are flowing a retry would duplicate output, so the
+        # deadline only bounds the wait for each next chunk
+        chunks = []
+        stream = stream.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(stream.__anext__(), self._timeout())
+            except StopAsyncIteration:
+                break
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+
+        await self._cache_put(key, types.GenerateContentResponse(
+            candidates=[types.Candidate(content=types.Content(
+                role="model",
+                parts=[types.Part(text="".join(chunks))]
+            ))]
+        ))
@@ -0,0 +1,273 @@
+"""
+Call Policy
+Retry, backoff, deadlines and client-side rate limiting for Gemini calls.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import httpx
+from google.genai import errors
+
+from config.agent_config import AgentConfig
+
+
+T = TypeVar("T")
+
+# HTTP status codes worth retrying: timeouts, rate limits and transient server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about four characters per token)."""
+    return max(1, len(text or "") // 4)
+
+
+class RateLimiter:
+    """
+    Process-wide token-bucket limiter for requests and tokens per minute.
+
+    Callers wait for capacity before a request is sent, so bursts of
+    concurrent research jobs are spread out instead of tripping the
+    server-side quota. A rate-limit response pauses every caller.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """
+        Initialize the Rate Limiter.
+
+        Args:
+            requests_per_minute: Request budget per minute, 0 for unlimited
+            tokens_per_minute: Token budget per minute, 0 for unlimited
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Top up both buckets for the time elapsed since the last update."""
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                float(self.requests_per_minute),
+                self._request_allowance + elapsed * self.requests_per_minute / 60
+            )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                float(self.tokens_per_minute),
+                self._token_allowance + elapsed * self.tokens_per_minute / 60
+            )
+
+    def _reserve(self, tokens: int) -> float:
+        """Take capacity if available, otherwise return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            if now < self._paused_until:
+                return self._paused_until - now
+
+            # A single request larger than the whole bucket must still go through
+            tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+
+            wait = 0.0
+            if self.requests_per_minute and self._request_allowance < 1:
+                wait = max(wait, (1 - self._request_allowance) * 60 / self.requests_per_minute)
+            if tokens and self._token_allowance < tokens:
+                wait = max(wait, (tokens - self._token_allowance) * 60 / self.tokens_per_minute)
+            if wait > 0:
+                return wait
+
+            if self.requests_per_minute:
+                self._request_allowance -= 1
+            self._token_allowance -= tokens
+            return 0.0
+
+    async def acquire(self, tokens: int = 0):
+        """
+        Wait until a request of the given size fits within the limits.
+
+        Args:
+            tokens: Estimated tokens for the request
+        """
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Correct the token bucket once the real usage of a request is known.
+
+        Args:
+            estimated_tokens: Tokens reserved by acquire()
+            actual_tokens: Tokens reported by the API
+        """
+        if not self.tokens_per_minute:
+            return
+        with self._lock:
+            self._token_allowance -= actual_tokens - estimated_tokens
+
+    def pause(self, seconds: float):
+        """
+        Hold back every caller, e.g. after the server reported a rate limit.
+
+        Args:
+            seconds: How long to pause
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class RetryPolicy:
+    """Jittered exponential backoff with Retry-After support and per-call deadlines."""
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        """
+        Initialize the Retry Policy.
+
+        Args:
+            attempts: Total attempts per call, including the first one
+            base_delay: Backoff before the first retry, in seconds
+            max_delay: Upper bound for any single backoff, in seconds
+        """
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """Whether an error is transient and the call may be retried."""
+        if isinstance(error, errors.APIError):
+            return error.code in RETRYABLE_STATUS_CODES
+        return isinstance(error, (asyncio.TimeoutError, httpx.TransportError))
+
+    @staticmethod
+    def retry_after(error: BaseException) -> Optional[float]:
+        """
+        Server-suggested delay from a Retry-After header or RetryInfo detail.
+
+        Args:
+            error: The failed call's exception
+
+        Returns:
+            Delay in seconds, or None if the server gave no hint
+        """
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        value = headers.get("retry-after") or headers.get("Retry-After")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass
+
+        details = getattr(error, "details", None)
+        if isinstance(details, dict):
+            for detail in details.get("error", {}).get("details", []) or []:
+                delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+                match = re.fullmatch(r"([\d.]+)s", delay or "")
+                if match:
+                    return float(match.group(1))
+        return None
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """
+        Delay before the next attempt.
+
+        Args:
+            attempt: Number of the attempt that just failed (1-based)
+            error: The failed call's exception
+
+        Returns:
+            Delay in seconds
+        """
+        suggested = self.retry_after(error)
+        if suggested is not None:
+            return min(suggested, self.max_delay)
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+async def call_with_retry(
+    make_call: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    limiter: Optional[RateLimiter] = None,
+    estimated_tokens: int = 0,
+    timeout: Optional[float] = None
+) -> T:
+    """
+    Run an API call under the rate limiter, deadline and retry policy.
+
+    Args:
+        make_call: Factory returning a fresh awaitable for each attempt
+        policy: Retry policy to apply
+        limiter: Rate limiter to wait on before every attempt
+        estimated_tokens: Estimated tokens for the rate limiter
+        timeout: Deadline for a single attempt, in seconds
+
+    Returns:
+        The call's result
+    """
+    for attempt in range(1, policy.attempts + 1):
+        if limiter is not None:
+            await limiter.acquire(estimated_tokens)
+        try:
+            result = await asyncio.wait_for(make_call(), timeout)
+        except Exception as e:
+            if attempt == policy.attempts or not policy.is_retryable(e):
+                raise
+            delay = policy.backoff(attempt, e)
+            if limiter is not None and getattr(e, "code", None) == 429:
+                limiter.pause(delay)
+            print(f"Warning: API call failed ({e.__class__.__name__}), "
+                  f"retrying in {delay:.1f}s (attempt {attempt + 1}/{policy.attempts})")
+            await asyncio.sleep(delay)
+            continue
+
+        usage = getattr(result, "usage_metadata", None)
+        if limiter is not None and getattr(usage, "total_token_count", None):
+            limiter.settle(estimated_tokens, usage.total_token_count)
+        return result
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_default_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter configured from AgentConfig."""
+    global _default_limiter
+    if _default_limiter is None:
+        with _default_limiter_lock:
+            if _default_limiter is None:
+                _default_limiter = RateLimiter(
+                    AgentConfig.API_REQUESTS_PER_MINUTE,
+                    AgentConfig.API_TOKENS_PER_MINUTE
+                )
+    return _default_limiter
+
+
+__all__ = [
+    "RateLimiter",
+    "RetryPolicy",
+    "call_with_retry",
+    "estimate_tokens",
+    "get_default_rate_limiter"
+]
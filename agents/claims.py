@@ -0,0 +1,142 @@
+"""
+Claims
+Local extraction, normalization and verdict parsing for claim-level fact-checking.
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+# Verdicts in the order they must be matched ("PARTIALLY TRUE" before "TRUE")
+VERDICTS = ("PARTIALLY TRUE", "UNVERIFIABLE", "FALSE", "TRUE")
+CONFIDENCE_LEVELS = ("HIGH", "MEDIUM", "LOW")
+
+# Contribution of each verdict to the reliability score
+VERDICT_WEIGHTS = {"TRUE": 1.0, "PARTIALLY TRUE": 0.5, "FALSE": 0.0}
+
+# Sentences shorter than this are headings or fragments, not claims
+MIN_CLAIM_WORDS = 6
+
+# Sentence splits after these words are undone
+ABBREVIATIONS = {"al.", "e.g.", "i.e.", "etc.", "vs.", "fig.", "no.", "dr.", "prof.", "approx."}
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[])")
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•+]|\d+[.)])\s+")
+_MARKUP = re.compile(r"[*_`#>]+")
+
+
+def _clean(line: str) -> str:
+    """Strip list markers and markdown emphasis from a line."""
+    return " ".join(_MARKUP.sub("", _LIST_MARKER.sub("", line)).split())
+
+
+def _sentences(line: str) -> List[str]:
+    """Split a line into sentences, keeping abbreviations intact."""
+    sentences = []
+    for piece in _SENTENCE_SPLIT.split(line):
+        if sentences and sentences[-1].split()[-1].casefold() in ABBREVIATIONS:
+            sentences[-1] += " " + piece
+        else:
+            sentences.append(piece)
+    return sentences
+
+
+def normalize_claim(claim: str) -> str:
+    """
+    Canonical form of a claim, used to recognize the same claim across topics.
+
+    Case, markdown, punctuation and whitespace differences are ignored.
+    """
+    text = _MARKUP.sub("", claim).casefold()
+    text = re.sub(r"[^\w\s%.]|(?<!\d)\.|\.(?!\d)", " ", text)
+    return " ".join(text.split())
+
+
+def _check_worthiness(sentence: str) -> int:
+    """Rank sentences by how much checkable detail they carry."""
+    words = sentence.split()
+    score = 2 * sum(1 for w in words if any(c.isdigit() for c in w))
+    score += sum(1 for w in words[1:] if w[:1].isupper())
+    return score
+
+
+def extract_claims(text: str, max_claims: int = 0) -> List[str]:
+    """
+    Pull individual factual claims out of a summary.
+
+    Headings, questions and short fragments are dropped; when there are more
+    claims than ``max_claims``, the ones with the most specific detail
+    (numbers, names) are kept, in their original order.
+
+    Args:
+        text: Summary or report text
+        max_claims: Maximum claims to return, 0 for all
+
+    Returns:
+        Distinct claims in the order they appear
+    """
+    claims = []
+    seen = set()
+    for line in (text or "").splitlines():
+        if line.lstrip().startswith("#"):
+            continue
+        for sentence in _sentences(_clean(line)):
+            sentence = sentence.strip()
+            if len(sentence.split()) < MIN_CLAIM_WORDS or sentence.endswith((":", "?")):
+                continue
+            key = normalize_claim(sentence)
+            if key in seen:
+                continue
+            seen.add(key)
+            claims.append(sentence)
+
+    if max_claims and len(claims) > max_claims:
+        ranked = sorted(range(len(claims)), key=lambda i: -_check_worthiness(claims[i]))
+        keep = set(ranked[:max_claims])
+        claims = [c for i, c in enumerate(claims) if i in keep]
+    return claims
+
+
+def parse_verdict(verification: str) -> Tuple[str, Optional[str]]:
+    """
+    Read the verification status and confidence from a fact-check response.
+
+    Args:
+        verification: Text returned for a claim check
+
+    Returns:
+        Tuple of (status, confidence); status is "UNVERIFIABLE" and confidence
+        None when the response doesn't state them
+    """
+    upper = (verification or "").upper()
+    alternatives = "|".join(VERDICTS)
+
+    match = re.search(rf"STATUS\W*({alternatives})", upper)
+    if match is None:
+        match = re.search(rf"\b({alternatives})\b", upper)
+    status = match.group(1) if match else "UNVERIFIABLE"
+
+    match = re.search(rf"CONFIDENCE(?: LEVEL)?\W*({'|'.join(CONFIDENCE_LEVELS)})", upper)
+    confidence = match.group(1) if match else None
+    return status, confidence
+
+
+def reliability_score(verdicts: List[Dict]) -> Optional[int]:
+    """
+    Score (0-100) from claim verdicts; unverifiable and failed checks don't count.
+
+    Returns:
+        The score, or None if no claim could be decided
+    """
+    weights = [VERDICT_WEIGHTS[v["status"]] for v in verdicts if v.get("status") in VERDICT_WEIGHTS]
+    if not weights:
+        return None
+    return round(100 * sum(weights) / len(weights))
+
+
+__all__ = [
+    "extract_claims",
+    "normalize_claim",
+    "parse_verdict",
+    "reliability_score"
+]
@@ -0,0 +1,304 @@
+"""
+Client Provider
+Shared, pooled Gemini client used by every agent in the system.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+import httpx
+from google import genai
+from google.genai import types
+
+from config.agent_config import AgentConfig
+from .call_policy import RateLimiter, RetryPolicy, call_with_retry, get_default_rate_limiter
+from .context_cache import ContextCacheManager
+from .response_cache import ResponseCache
+
+
+T = TypeVar("T")
+
+
+class ClientProvider:
+    """
+    Owns a single Gemini client and its HTTP connection pools.
+
+    Agents receive a provider by injection instead of creating their own
+    ``genai.Client``, so every phase of a research run reuses the same
+    keep-alive connections, timeouts and per-model settings.
+
+    Async HTTP connections are bound to the event loop that opened them, so
+    the provider keeps one async client per running loop. Blocking callers
+    are served by a single background loop owned by the provider, which keeps
+    their pooled connections warm between calls.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        timeout_seconds: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry_seconds: Optional[float] = None,
+        model_settings: Optional[Dict[str, Dict[str, Any]]] = None,
+        response_cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        context_cache: Optional[ContextCacheManager] = None
+    ):
+        """
+        Initialize the Client Provider.
+
+        Args:
+            api_key: Gemini API key, defaults to GOOGLE_API_KEY
+            timeout_seconds: HTTP timeout for a single request
+            max_connections: Maximum open connections in the pool
+            max_keepalive_connections: Maximum idle connections kept warm
+            keepalive_expiry_seconds: How long an idle connection stays open
+            model_settings: Per-model GenerateContentConfig defaults
+            response_cache: Response cache shared by all agents, defaults to
+                the one configured in AgentConfig (if enabled)
+            retry_policy: Retry policy for API calls, defaults to AgentConfig settings
+            rate_limiter: Rate limiter for API calls, defaults to the process-wide one
+            context_cache: Manager for server-side cached prompt prefixes,
+                defaults to one using this provider's clients (if enabled)
+        """
+        self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
+        self.timeout_seconds = timeout_seconds or AgentConfig.HTTP_TIMEOUT_SECONDS
+        self.max_connections = max_connections or AgentConfig.HTTP_MAX_CONNECTIONS
+        self.max_keepalive_connections = (
+            max_keepalive_connections or AgentConfig.HTTP_MAX_KEEPALIVE_CONNECTIONS
+        )
+        self.keepalive_expiry_seconds = (
+            keepalive_expiry_seconds or AgentConfig.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        )
+
+        self.model_settings = {
+            model: dict(settings) for model, settings in AgentConfig.MODEL_SETTINGS.items()
+        }
+        for model, settings in (model_settings or {}).items():
+            self.model_settings.setdefault(model, {}).update(settings)
+
+        self.retry_policy = retry_policy or RetryPolicy(
+            attempts=AgentConfig.API_RETRY_ATTEMPTS,
+            base_delay=AgentConfig.API_RETRY_BASE_DELAY_SECONDS,
+            max_delay=AgentConfig.API_RETRY_MAX_DELAY_SECONDS
+        )
+        self.rate_limiter = rate_limiter or get_default_rate_limiter()
+
+        self._response_cache = response_cache
+        self._context_cache = context_cache
+        self._client = None
+        self._loop_clients = weakref.WeakKeyDictionary()
+        self._loop = None
+        self._loop_thread = None
+        self._lock = threading.Lock()
+
+    def _new_client(self) -> genai.Client:
+        """Create a Gemini client with the pooled HTTP options."""
+        return genai.Client(api_key=self.api_key, http_options=self._http_options())
+
+    @property
+    def client(self) -> genai.Client:
+        """The shared Gemini client, created on first use."""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._new_client()
+        return self._client
+
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """The shared response cache, or None when caching is disabled."""
+        if self._response_cache is None and AgentConfig.RESPONSE_CACHE_ENABLED:
+            with self._lock:
+                if self._response_cache is None:
+                    self._response_cache = ResponseCache(
+                        AgentConfig.RESPONSE_CACHE_PATH,
+                        max_bytes=AgentConfig.RESPONSE_CACHE_MAX_BYTES
+                    )
+        return self._response_cache
+
+    @property
+    def context_cache(self) -> Optional[ContextCacheManager]:
+        """The shared context cache manager, or None when disabled."""
+        if self._context_cache is None and AgentConfig.CONTEXT_CACHE_ENABLED:
+            with self._lock:
+                if self._context_cache is None:
+                    self._context_cache = ContextCacheManager(
+                        self.get_async_client,
+                        ttl_seconds=AgentConfig.CONTEXT_CACHE_TTL_SECONDS,
+                        min_tokens=AgentConfig.CONTEXT_CACHE_MIN_TOKENS
+                    )
+        return self._context_cache
+
+    def get_async_client(self):
+        """
+        Get the async client surface for the running event loop.
+
+        Returns:
+            ``client.aio`` of the Gemini client bound to the current loop
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._loop_clients.get(loop)
+            if client is None:
+                client = self._new_client()
+                self._loop_clients[loop] = client
+        return client.aio
+
+    async def call_async(
+        self,
+        make_call: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        timeout: Optional[float] = None
+    ) -> T:
+        """
+        Run an API call through the shared rate limiter, deadline and retry policy.
+
+        Args:
+            make_call: Factory returning a fresh awaitable for each attempt
+            estimated_tokens: Estimated tokens for the rate limiter
+            timeout: Deadline for a single attempt, in seconds
+
+        Returns:
+            The call's result
+        """
+        return await call_with_retry(
+            make_call,
+            self.retry_policy,
+            self.rate_limiter,
+            estimated_tokens=estimated_tokens,
+            timeout=timeout
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop used by blocking callers."""
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="gemini-client-loop",
+                    daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    def run_sync(self, coro: Awaitable[T]) -> T:
+        """
+        Run a coroutine to completion from blocking code.
+
+        Args:
+            coro: The coroutine to run
+
+        Returns:
+            The coroutine's result
+        """
+        loop = self._ensure_loop()
+        if self._on_loop(loop):
+            coro.close()
+            raise RuntimeError(
+                "Blocking agent methods cannot be called from async agent code; "
+                "await the *_async variant instead"
+            )
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def iter_sync(self, agen: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Iterate an async generator from blocking code.
+
+        Each item is produced on the background loop and handed over as soon
+        as it is ready, so streamed output is not buffered.
+
+        Args:
+            agen: The async generator to iterate
+
+        Yields:
+            Items produced by the async generator
+        """
+        loop = self._ensure_loop()
+        if self._on_loop(loop):
+            raise RuntimeError(
+                "Blocking agent methods cannot be called from async agent code; "
+                "iterate the *_async variant instead"
+            )
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
+
+    @staticmethod
+    def _on_loop(loop: asyncio.AbstractEventLoop) -> bool:
+        """Whether the caller is already running on the given loop."""
+        try:
+            return asyncio.get_running_loop() is loop
+        except RuntimeError:
+            return False
+
+    def _http_options(self) -> types.HttpOptions:
+        """Build HTTP options with keep-alive pooling for sync and async transports."""
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry_seconds
+        )
+        return types.HttpOptions(
+            # The SDK expects the timeout in milliseconds
+            timeout=int(self.timeout_seconds * 1000),
+            client_args={"limits": limits},
+            async_client_args={"limits": limits}
+        )
+
+    def build_config(self, model_name: str, **overrides) -> types.GenerateContentConfig:
+        """
+        Build a generation config for a model.
+
+        Args:
+            model_name: The model the config is for
+            **overrides: Call-specific settings (system_instruction, temperature, tools, ...)
+
+        Returns:
+            GenerateContentConfig combining per-model defaults and overrides
+        """
+        settings = dict(self.model_settings.get(model_name, {}))
+        settings.update({key: value for key, value in overrides.items() if value is not None})
+        return types.GenerateContentConfig(**settings)
+
+    def close(self):
+        """Close the shared clients, release pooled connections and stop the loop."""
+        with self._lock:
+            if self._client is not None and hasattr(self._client, "close"):
+                self._client.close()
+            self._client = None
+            self._loop_clients = weakref.WeakKeyDictionary()
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop_thread.join(timeout=5)
+                self._loop.close()
+            self._loop = None
+            self._loop_thread = None
+
+
+_default_provider: Optional[ClientProvider] = None
+_default_provider_lock = threading.Lock()
+
+
+def get_default_provider() -> ClientProvider:
+    """Get the process-wide provider, creating it on first use."""
+    global _default_provider
+    if _default_provider is None:
+        with _default_provider_lock:
+            if _default_provider is None:
+                _default_provider = ClientProvider()
+    return _default_provider
+
+
+__all__ = ["ClientProvider", "get_default_provider"]
@@ -0,0 +1,158 @@
+"""
+Context Cache
+Registers reusable prompt prefixes with the Gemini cached-content API.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from google.genai import errors, types
+
+from .call_policy import estimate_tokens
+
+
+class ContextCacheManager:
+    """
+    Keeps server-side cached contents for long, repeated prompt prefixes.
+
+    A prefix (system instruction, tools and/or shared material such as search
+    results) is registered once per model and referenced by name in later
+    calls until its TTL runs out, after which it is registered again.
+    Prefixes below the model's minimum cacheable size are never registered,
+    and a prefix the API refuses to cache is remembered as unsupported for a
+    while, so callers simply fall back to sending the full prompt.
+
+    The manager only needs an object exposing the async ``caches`` surface
+    (``create`` and ``delete`` coroutines), so a local stand-in client can
+    replace the real one.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        ttl_seconds: int = 3600,
+        min_tokens: int = 4096,
+        refresh_margin_seconds: int = 60,
+        unsupported_retry_seconds: int = 3600
+    ):
+        """
+        Initialize the Context Cache Manager.
+
+        Args:
+            client_factory: Returns the async client surface (``client.aio``)
+                for the running event loop
+            ttl_seconds: Lifetime of each cached content
+            min_tokens: Smallest prefix worth caching (model minimum)
+            refresh_margin_seconds: Re-register entries this close to expiry
+            unsupported_retry_seconds: How long a refused prefix is not retried
+        """
+        self.client_factory = client_factory
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.unsupported_retry_seconds = unsupported_retry_seconds
+
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._unsupported: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model: str, contents: Optional[str], system_instruction: Optional[str], tools: Any) -> str:
+        """Identify a prefix by everything that goes into the cached content."""
+        if tools is not None:
+            tools = [t.model_dump(mode="json", exclude_none=True) if hasattr(t, "model_dump") else t
+                     for t in tools]
+        material = json.dumps(
+            [model, contents, system_instruction, tools],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def acquire(
+        self,
+        model: str,
+        contents: Optional[str] = None,
+        system_instruction: Optional[str] = None,
+        tools: Optional[list] = None
+    ) -> Optional[str]:
+        """
+        Get the cached content name for a prefix, registering it if needed.
+
+        Args:
+            model: Model the prefix is used with
+            contents: Shared material sent as the first user turn
+            system_instruction: System instruction to cache
+            tools: Tools to cache
+
+        Returns:
+            Cached content name, or None if the prefix isn't (or can't be) cached
+        """
+        if estimate_tokens(contents or "") + estimate_tokens(system_instruction or "") < self.min_tokens:
+            return None
+
+        key = self._key(model, contents, system_instruction, tools)
+        now = time.time()
+        with self._lock:
+            if self._unsupported.get(key, 0) > now:
+                return None
+            entry = self._entries.get(key)
+            if entry and entry["expires_at"] - self.refresh_margin_seconds > now:
+                return entry["name"]
+
+        config = types.CreateCachedContentConfig(
+            ttl=f"{self.ttl_seconds}s",
+            system_instruction=system_instruction or None,
+            tools=tools or None,
+            contents=[types.Content(role="user", parts=[types.Part(text=contents)])] if contents else None
+        )
+        try:
+            cached = await self.client_factory().caches.create(model=model, config=config)
+        except errors.APIError as e:
+            print(f"Warning: Context caching unavailable, sending full prompts ({e.code})")
+            with self._lock:
+                self._unsupported[key] = now + self.unsupported_retry_seconds
+            return None
+
+        with self._lock:
+            self._entries[key] = {"name": cached.name, "expires_at": now + self.ttl_seconds}
+        return cached.name
+
+    def invalidate(self, name: str):
+        """
+        Forget a cached content, e.g. after the API reported it missing.
+
+        Args:
+            name: Cached content name
+        """
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry["name"] == name:
+                    del self._entries[key]
+
+    async def clear(self):
+        """Delete every cached content this manager registered."""
+        with self._lock:
+            names = [entry["name"] for entry in self._entries.values()]
+            self._entries.clear()
+        for name in names:
+            try:
+                await self.client_factory().caches.delete(name=name)
+            except errors.APIError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of live and refused prefixes."""
+        now = time.time()
+        with self._lock:
+            return {
+                "cached_prefixes": sum(1 for e in self._entries.values() if e["expires_at"] > now),
+                "unsupported_prefixes": sum(1 for t in self._unsupported.values() if t > now)
+            }
+
+
+__all__ = ["ContextCacheManager"]
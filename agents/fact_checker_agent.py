@@ -3,23 +3,38 @@ Fact-Checker Agent
 Validates claims and statements across multiple sources.
 """
 
-from google import genai
-from google.genai import types
-import os
+import asyncio
+import json
+import re
+import sqlite3
+from typing import AsyncIterator, Iterator, Optional
 
+from config.agent_config import AgentConfig
 
-class FactCheckerAgent:
+from .base_agent import BaseAgent
+from .claims import extract_claims, normalize_claim, parse_verdict, reliability_score
+from .client_provider import ClientProvider
+from .near_duplicates import NearDuplicateGrouper
+
+
+class FactCheckerAgent(BaseAgent):
     """Agent responsible for fact-checking and validating claims."""
     
-    def __init__(self, model_name: str = "gemini-2.0-flash"):
+    agent_type = "fact_check"
+    
+    def __init__(
+        self,
+        model_name: str = "gemini-2.0-flash",
+        client_provider: Optional[ClientProvider] = None
+    ):
         """
         Initialize the Fact-Checker Agent.
         
         Args:
             model_name: The Gemini model to use for this agent
+            client_provider: Shared client provider, defaults to the process-wide one
         """
-        self.client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
-        self.model_name = model_name
+        super().__init__(model_name, client_provider)
         
         # System instruction for the fact-checker agent
         self.system_instruction = """
@@ -37,7 +52,7 @@ class FactCheckerAgent:
         Always be thorough, objective, and evidence-based in your fact-checking.
         """
     
-    def check_claim(self, claim: str) -> dict:
+    async def check_claim_async(self, claim: str) -> dict:
         """
         Fact-check a specific claim.
         
@@ -60,14 +75,10 @@ class FactCheckerAgent:
         Be thorough and cite specific sources.
         """
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.2,
-                tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+        response = await self._generate_async(
+            prompt,
+            temperature=0.2,
+            tools=self._search_tools()
         )
         
         return {
@@ -75,18 +86,155 @@ class FactCheckerAgent:
             "verification": response.text
         }
     
-    def validate_content(self, content: str, topic: str) -> dict:
+    def check_claim(self, claim: str) -> dict:
+        """Blocking wrapper around check_claim_async()."""
+        return self._run_sync(self.check_claim_async(claim))
+    
+    def _verdict_key(self, claim: str) -> Optional[str]:
+        """Verdict cache key for a claim, or None when verdicts aren't cached."""
+        cache = self.client_provider.response_cache
+        if cache is None or AgentConfig.RESPONSE_CACHE_TTL_SECONDS.get("claim_verdict", 0) <= 0:
+            return None
+        return cache.make_key(self.model_name, normalize_claim(claim), {"kind": "claim_verdict"})
+    
+    async def _verdict_get(self, key: Optional[str]) -> Optional[dict]:
+        """Look up a cached claim verdict."""
+        if key is None:
+            return None
+        try:
+            payload = await asyncio.to_thread(self.client_provider.response_cache.get, key)
+        except sqlite3.Error as e:
+            print(f"Warning: Claim verdict lookup failed: {e}")
+            return None
+        return json.loads(payload) if payload is not None else None
+    
+    async def _verdict_put(self, key: Optional[str], verdict: dict):
+        """Store a claim verdict for the verdict TTL."""
+        if key is None:
+            return
+        try:
+            await asyncio.to_thread(
+                self.client_provider.response_cache.put,
+                key,
+                json.dumps(verdict, ensure_ascii=False),
+                AgentConfig.RESPONSE_CACHE_TTL_SECONDS["claim_verdict"],
+                "claim_verdict"
+            )
+        except sqlite3.Error as e:
+            print(f"Warning: Claim verdict store failed: {e}")
+    
+    async def check_claims_async(
+        self,
+        claims: list[str],
+        max_concurrency: Optional[int] = None
+    ) -> list[dict]:
         """
-        Validate the accuracy of content about a topic.
+        Fact-check several claims concurrently.
+        
+        Claims that normalize to the same text are checked once, and verdicts
+        are cached per normalized claim, so a claim that recurs across topics
+        is only sent to the model again after its verdict expires.
+        
+        Args:
+            claims: Claims to verify
+            max_concurrency: Maximum claim checks in flight, defaults to
+                AgentConfig.MAX_PARALLEL_CLAIM_CHECKS
+            
+        Returns:
+            One verdict per claim, in order, with status, confidence,
+            verification text and whether it came from the cache
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or AgentConfig.MAX_PARALLEL_CLAIM_CHECKS)
+        
+        async def check(claim: str) -> dict:
+            key = self._verdict_key(claim)
+            cached = await self._verdict_get(key)
+            if cached is not None:
+                return {**cached, "claim": claim, "cached": True}
+            try:
+                async with semaphore:
+                    result = await self.check_claim_async(claim)
+            except Exception as e:
+                return {"claim": claim, "status": "ERROR", "confidence": None,
+                        "verification": "", "error": str(e), "cached": False}
+            status, confidence = parse_verdict(result["verification"])
+            verdict = {"claim": claim, "status": status, "confidence": confidence,
+                       "verification": result["verification"]}
+            await self._verdict_put(key, verdict)
+            return {**verdict, "cached": False}
+        
+        unique = {}
+        for claim in claims:
+            unique.setdefault(normalize_claim(claim), claim)
+        verdicts = dict(zip(unique, await asyncio.gather(*(check(c) for c in unique.values()))))
+        return [{**verdicts[normalize_claim(c)], "claim": c} for c in claims]
+    
+    def check_claims(self, claims: list[str], max_concurrency: Optional[int] = None) -> list[dict]:
+        """Blocking wrapper around check_claims_async()."""
+        return self._run_sync(self.check_claims_async(claims, max_concurrency))
+    
+    async def validate_claims_async(
+        self,
+        content: str,
+        topic: str,
+        max_claims: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ) -> dict:
+        """
+        Validate content claim by claim instead of in one grounded prompt.
         
         Args:
             content: Content to validate
             topic: The topic context
+            max_claims: Maximum claims checked, defaults to
+                AgentConfig.MAX_CLAIMS_PER_VALIDATION
+            max_concurrency: Maximum claim checks in flight
             
         Returns:
-            Dictionary containing validation results
+            Dictionary containing per-claim verdicts, verdict counts, a
+            reliability score and a readable validation report
         """
-        prompt = f"""
+        if max_claims is None:
+            max_claims = AgentConfig.MAX_CLAIMS_PER_VALIDATION
+        claims = extract_claims(content, max_claims)
+        verdicts = await self.check_claims_async(claims, max_concurrency)
+        
+        counts = {}
+        for verdict in verdicts:
+            counts[verdict["status"]] = counts.get(verdict["status"], 0) + 1
+        score = reliability_score(verdicts)
+        
+        lines = [f"## Claim-level Validation: {topic}", ""]
+        summary = ", ".join(f"{n} {status}" for status, n in counts.items()) or "no checkable claims found"
+        lines.append(f"**Reliability score:** {f'{score}/100' if score is not None else 'n/a'} ({summary})")
+        for i, verdict in enumerate(verdicts, 1):
+            confidence = f" ({verdict['confidence']} confidence)" if verdict["confidence"] else ""
+            lines += ["", f"### {i}. {verdict['claim']}", f"**Status:** {verdict['status']}{confidence}"]
+            lines.append(verdict.get("error") or verdict["verification"].strip())
+        
+        return {
+            "content_validated": True,
+            "topic": topic,
+            "mode": "claims",
+            "claims": verdicts,
+            "verdict_counts": counts,
+            "reliability_score": score,
+            "validation_report": "\n".join(lines)
+        }
+    
+    def validate_claims(
+        self,
+        content: str,
+        topic: str,
+        max_claims: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ) -> dict:
+        """Blocking wrapper around validate_claims_async()."""
+        return self._run_sync(self.validate_claims_async(content, topic, max_claims, max_concurrency))
+    
+    def _validation_prompt(self, content: str, topic: str) -> str:
+        """Build the content validation prompt."""
+        return f"""
         Validate the following content about '{topic}':
         
         {content}
@@ -100,15 +248,24 @@ class FactCheckerAgent:
         
         Use Google Search to verify claims. Provide detailed feedback.
         """
+    
+    async def validate_content_async(self, content: str, topic: str) -> dict:
+        """
+        Validate the accuracy of content about a topic.
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.2,
-                tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+        Args:
+            content: Content to validate
+            topic: The topic context
+            
+        Returns:
+            Dictionary containing validation results
+        """
+        prompt = self._validation_prompt(content, topic)
+        
+        response = await self._generate_async(
+            prompt,
+            temperature=0.2,
+            tools=self._search_tools()
         )
         
         return {
@@ -117,17 +274,44 @@ class FactCheckerAgent:
             "validation_report": response.text
         }
     
-    def cross_reference(self, statements: list[str]) -> dict:
+    def validate_content(self, content: str, topic: str) -> dict:
+        """Blocking wrapper around validate_content_async()."""
+        return self._run_sync(self.validate_content_async(content, topic))
+    
+    async def validate_content_stream_async(self, content: str, topic: str) -> AsyncIterator[str]:
         """
-        Cross-reference multiple statements for consistency.
+        Stream a validation report as it is generated.
         
         Args:
-            statements: List of statements to cross-reference
+            content: Content to validate
+            topic: The topic context
             
-        Returns:
-            Dictionary containing cross-reference analysis
+        Yields:
+            Text chunks of the validation report
         """
-        formatted_statements = "\n".join([f"{i+1}. {s}" for i, s in enumerate(statements)])
+        prompt = self._validation_prompt(content, topic)
+        
+        async for chunk in self._generate_stream_async(
+            prompt,
+            temperature=0.2,
+            tools=self._search_tools()
+        ):
+            yield chunk
+    
+    def validate_content_stream(self, content: str, topic: str) -> Iterator[str]:
+        """Blocking wrapper around validate_content_stream_async()."""
+        return self._iter_sync(self.validate_content_stream_async(content, topic))
+    
+    async def _cross_reference_batch_async(
+        self,
+        statements: list[str],
+        repeats: list[int]
+    ) -> tuple[str, dict]:
+        """Cross-reference one batch of statements; returns (report, verdicts by number)."""
+        formatted_statements = "\n".join(
+            f"{i+1}. {s}" + (f" [stated {n} times]" if n > 1 else "")
+            for i, (s, n) in enumerate(zip(statements, repeats))
+        )
         
         prompt = f"""
         Cross-reference these statements for consistency and accuracy:
@@ -141,19 +325,87 @@ class FactCheckerAgent:
         4. Overall consistency score
         
         Use Google Search as needed to verify claims.
+        
+        End with a "Verdicts:" section listing every statement on its own line
+        as "<number>: SUPPORTED", "<number>: CONTRADICTED" or "<number>: UNVERIFIED".
         """
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.2,
-                tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+        response = await self._generate_async(
+            prompt,
+            temperature=0.2,
+            tools=self._search_tools()
         )
         
+        report = response.text or ""
+        verdict_section = re.split(r"verdicts\W*\n", report, flags=re.IGNORECASE)[-1]
+        verdicts = {
+            int(number) - 1: verdict.upper()
+            for number, verdict in re.findall(
+                r"(\d+)\s*[:.)-]\W*(SUPPORTED|CONTRADICTED|UNVERIFIED)",
+                verdict_section,
+                flags=re.IGNORECASE
+            )
+        }
+        return report, verdicts
+    
+    async def cross_reference_async(self, statements: list[str]) -> dict:
+        """
+        Cross-reference multiple statements for consistency.
+        
+        Near-duplicate statements are grouped locally first and only one
+        representative per group is sent to the model, in batches of
+        AgentConfig.CROSS_REFERENCE_BATCH_SIZE; each representative's verdict
+        applies to every member of its group.
+        
+        Args:
+            statements: List of statements to cross-reference
+            
+        Returns:
+            Dictionary containing cross-reference analysis, the duplicate
+            groups and a verdict per statement
+        """
+        groups = NearDuplicateGrouper(AgentConfig.CROSS_REFERENCE_SIMILARITY).group(statements)
+        representatives = [statements[g[0]] for g in groups]
+        repeats = [len(g) for g in groups]
+        
+        size = AgentConfig.CROSS_REFERENCE_BATCH_SIZE
+        semaphore = asyncio.Semaphore(AgentConfig.MAX_PARALLEL_CLAIM_CHECKS)
+        
+        async def run_batch(start: int) -> tuple[str, dict]:
+            async with semaphore:
+                return await self._cross_reference_batch_async(
+                    representatives[start:start + size],
+                    repeats[start:start + size]
+                )
+        
+        batches = await asyncio.gather(*(run_batch(i) for i in range(0, len(groups), size)))
+        
+        statement_verdicts = [None] * len(statements)
+        for batch_number, (_, verdicts) in enumerate(batches):
+            for offset in range(min(size, len(groups) - batch_number * size)):
+                group_number = batch_number * size + offset
+                for member in groups[group_number]:
+                    statement_verdicts[member] = {
+                        "statement": statements[member],
+                        "verdict": verdicts.get(offset, "UNVERIFIED"),
+                        "group": group_number
+                    }
+        
+        if len(batches) == 1:
+            report = batches[0][0]
+        else:
+            report = "\n\n".join(
+                f"## Batch {i + 1}\n\n{text}" for i, (text, _) in enumerate(batches)
+            )
+        
         return {
             "num_statements": len(statements),
-            "cross_reference_report": response.text
+            "num_groups": len(groups),
+            "groups": groups,
+            "statement_verdicts": statement_verdicts,
+            "cross_reference_report": report
         }
+    
+    def cross_reference(self, statements: list[str]) -> dict:
+        """Blocking wrapper around cross_reference_async()."""
+        return self._run_sync(self.cross_reference_async(statements))
@@ -0,0 +1,152 @@
+"""
+Map Reduce
+Chunked, hierarchical condensing of inputs too large for a single prompt.
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from .call_policy import estimate_tokens
+
+
+def _split_oversized(paragraph: str, chunk_tokens: int) -> List[str]:
+    """Split a paragraph larger than a chunk at sentences, then hard at characters."""
+    pieces = []
+    current = ""
+    for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+        candidate = f"{current} {sentence}".strip()
+        if current and estimate_tokens(candidate) > chunk_tokens:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+
+    max_chars = chunk_tokens * 4
+    return [p[i:i + max_chars] for p in pieces for i in range(0, len(p), max_chars)]
+
+
+def split_chunks(texts: List[str], chunk_tokens: int) -> List[str]:
+    """
+    Pack texts into chunks of at most ``chunk_tokens``.
+
+    Chunks never span two input texts (sources), are filled with whole
+    paragraphs where possible, and only paragraphs larger than a chunk are
+    split further.
+
+    Args:
+        texts: Input texts, one per source
+        chunk_tokens: Token budget per chunk
+
+    Returns:
+        Chunks in input order
+    """
+    chunks = []
+    for text in texts:
+        current = []
+        size = 0
+        for paragraph in (p.strip() for p in re.split(r"\n\s*\n", text or "")):
+            if not paragraph:
+                continue
+            tokens = estimate_tokens(paragraph)
+            if tokens > chunk_tokens:
+                pieces = _split_oversized(paragraph, chunk_tokens)
+            else:
+                pieces = [paragraph]
+            for piece in pieces:
+                tokens = estimate_tokens(piece)
+                if current and size + tokens > chunk_tokens:
+                    chunks.append("\n\n".join(current))
+                    current, size = [], 0
+                current.append(piece)
+                size += tokens
+        if current:
+            chunks.append("\n\n".join(current))
+    return chunks
+
+
+class MapReduceSummarizer:
+    """
+    Condenses large inputs by summarizing chunks and then summaries of summaries.
+
+    The map level summarizes every chunk concurrently; each reduce level
+    merges groups of ``fan_out`` partial summaries concurrently, until the
+    partial summaries together fit ``target_tokens``. Every level's size and
+    duration is recorded.
+    """
+
+    def __init__(
+        self,
+        map_fn: Callable[[str], Awaitable[str]],
+        reduce_fn: Callable[[List[str]], Awaitable[str]],
+        chunk_tokens: int = 6000,
+        fan_out: int = 4,
+        target_tokens: int = 6000,
+        max_concurrency: int = 4
+    ):
+        """
+        Initialize the summarizer.
+
+        Args:
+            map_fn: Summarizes one chunk
+            reduce_fn: Merges several partial summaries into one
+            chunk_tokens: Token budget per map chunk
+            fan_out: Partial summaries merged per reduce call (at least 2)
+            target_tokens: Size the partial summaries must fit together
+            max_concurrency: Maximum summarization calls in flight
+        """
+        self.map_fn = map_fn
+        self.reduce_fn = reduce_fn
+        self.chunk_tokens = chunk_tokens
+        self.fan_out = max(2, fan_out)
+        self.target_tokens = target_tokens
+        self.max_concurrency = max_concurrency
+
+    async def condense(self, texts: List[str]) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Condense texts until they fit the target size.
+
+        Args:
+            texts: Input texts, one per source
+
+        Returns:
+            Tuple of (partial summaries, per-level stats with "level", "calls",
+            "input_tokens", "output_tokens" and "seconds")
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def limited(make_call: Callable[[], Awaitable[str]]) -> str:
+            async with semaphore:
+                return await make_call()
+
+        async def run_level(level: int, inputs: List[Any], call: Callable[[Any], Awaitable[str]]) -> List[str]:
+            started = time.perf_counter()
+            outputs = await asyncio.gather(*(limited(lambda item=item: call(item)) for item in inputs))
+            levels.append({
+                "level": level,
+                "calls": len(inputs),
+                "input_tokens": sum(
+                    estimate_tokens(i) if isinstance(i, str) else sum(estimate_tokens(p) for p in i)
+                    for i in inputs
+                ),
+                "output_tokens": sum(estimate_tokens(o) for o in outputs),
+                "seconds": round(time.perf_counter() - started, 3)
+            })
+            return [o for o in outputs if o]
+
+        levels: List[Dict[str, Any]] = []
+        parts = await run_level(0, split_chunks(texts, self.chunk_tokens), self.map_fn)
+
+        level = 1
+        while len(parts) > 1 and sum(estimate_tokens(p) for p in parts) > self.target_tokens:
+            groups = [parts[i:i + self.fan_out] for i in range(0, len(parts), self.fan_out)]
+            parts = await run_level(level, groups, self.reduce_fn)
+            level += 1
+
+        return parts, levels
+
+
+__all__ = ["MapReduceSummarizer", "split_chunks"]
@@ -0,0 +1,170 @@
+"""
+Near Duplicates
+Local MinHash grouping of near-identical statements.
+"""
+
+import random
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Set
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - pure-Python fallback
+    np = None
+
+from .claims import normalize_claim
+
+
+# Mersenne prime for the MinHash permutations; products stay below 2**64
+_PRIME = (1 << 31) - 1
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def text_change(old: str, new: str, shingle_words: int = 3) -> float:
+    """
+    How much a text changed, as the Jaccard distance of its word shingles.
+
+    Args:
+        old: Previous text
+        new: Current text
+        shingle_words: Words per shingle
+
+    Returns:
+        0.0 for the same wording, up to 1.0 for nothing in common
+    """
+    def shingles(text: str) -> Set[str]:
+        words = normalize_claim(text).split()
+        return {" ".join(words[i:i + shingle_words]) for i in range(max(1, len(words) - shingle_words + 1))}
+
+    a, b = shingles(old), shingles(new)
+    union = a | b
+    return 1 - len(a & b) / len(union) if union else 0.0
+
+
+class NearDuplicateGrouper:
+    """
+    Groups statements whose character shingles overlap heavily.
+
+    Each statement gets a MinHash signature; locality-sensitive hashing over
+    bands of the signature proposes candidate pairs, and a candidate pair is
+    grouped when the exact Jaccard similarity of its shingle sets reaches the
+    threshold and both mention the same numbers. Only candidate pairs are
+    compared, so thousands of statements are grouped without comparing all
+    pairs. NumPy is used when installed.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.7,
+        shingle_size: int = 4,
+        num_perm: int = 64,
+        bands: int = 16,
+        seed: int = 1
+    ):
+        """
+        Initialize the grouper.
+
+        Args:
+            threshold: Jaccard similarity at which two statements are grouped
+            shingle_size: Characters per shingle
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must be divisible by bands); more bands
+                find lower-similarity candidates
+            seed: Seed for the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands = bands
+
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+
+    def shingles(self, text: str) -> Set[int]:
+        """Hashed character shingles of a statement's normalized form."""
+        text = normalize_claim(text)
+        k = self.shingle_size
+        if len(text) <= k:
+            return {zlib.crc32(text.encode("utf-8")) % _PRIME}
+        return {zlib.crc32(text[i:i + k].encode("utf-8")) % _PRIME for i in range(len(text) - k + 1)}
+
+    def signatures(self, shingle_sets: List[Set[int]]) -> List[tuple]:
+        """MinHash signature per shingle set."""
+        if np is not None:
+            a = np.array(self._a, dtype=np.uint64)[:, None]
+            b = np.array(self._b, dtype=np.uint64)[:, None]
+            result = []
+            for shingles in shingle_sets:
+                x = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))[None, :]
+                result.append(tuple(((a * x + b) % _PRIME).min(axis=1).tolist()))
+            return result
+        return [
+            tuple(min((a * x + b) % _PRIME for x in shingles) for a, b in zip(self._a, self._b))
+            for shingles in shingle_sets
+        ]
+
+    def group(self, statements: List[str]) -> List[List[int]]:
+        """
+        Group near-duplicate statements.
+
+        Args:
+            statements: Statements to group
+
+        Returns:
+            Groups of statement indices, each in ascending order; groups are
+            ordered by their first member, which serves as representative
+        """
+        shingle_sets = [self.shingles(s) for s in statements]
+        signatures = self.signatures(shingle_sets)
+        numbers = [tuple(sorted(_NUMBER.findall(s))) for s in statements]
+
+        parent = list(range(len(statements)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        def try_union(i: int, j: int) -> bool:
+            root_i, root_j = find(i), find(j)
+            if root_i == root_j:
+                return True
+            # Compare group representatives so groups can't drift through
+            # chains of slightly different statements
+            union = len(shingle_sets[root_i] | shingle_sets[root_j])
+            overlap = len(shingle_sets[root_i] & shingle_sets[root_j])
+            if union and overlap / union >= self.threshold:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+                return True
+            return False
+
+        rows = self.num_perm // self.bands
+        for band in range(self.bands):
+            buckets: Dict[tuple, List[int]] = defaultdict(list)
+            for i, signature in enumerate(signatures):
+                buckets[signature[band * rows:(band + 1) * rows]].append(i)
+            for members in buckets.values():
+                # Statements that differ in a number are different claims
+                by_numbers: Dict[tuple, List[int]] = defaultdict(list)
+                for i in members:
+                    by_numbers[numbers[i]].append(i)
+                for candidates in by_numbers.values():
+                    for position, other in enumerate(candidates[1:], 1):
+                        for earlier in candidates[:position]:
+                            if try_union(earlier, other):
+                                break
+
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for i in range(len(statements)):
+            groups[find(i)].append(i)
+        return sorted(groups.values(), key=lambda g: g[0])
+
+
+__all__ = ["NearDuplicateGrouper", "text_change"]
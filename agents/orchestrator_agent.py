@@ -3,16 +3,23 @@ Orchestrator Agent
 Main coordinator that manages the research workflow and delegates to specialized agents.
 """
 
-import json
-import os
-from typing import Dict, Any
+import asyncio
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
 from google import genai
-from google.genai import types
 
+from config.agent_config import AgentConfig
+from memory_index import normalize_topic
+from source_store import SourceStore
+
+from .client_provider import ClientProvider, get_default_provider
+from .single_flight import SingleFlight, get_default_single_flight
 from .search_agent import LiteratureSearchAgent
 from .summarization_agent import SummarizationAgent
 from .fact_checker_agent import FactCheckerAgent
 from .writer_agent import WriterAgent
+from .workflow import NodeCache, WorkflowGraph, WorkflowNode
+from .near_duplicates import text_change
+from .sources import SourceRecord, format_sources
 
 
 class OrchestratorAgent:
@@ -26,24 +33,45 @@ class OrchestratorAgent:
     4. Synthesizing final results
     """
     
-    def __init__(self, model_name: str = "gemini-2.0-flash"):
+    def __init__(
+        self,
+        model_name: str = "gemini-2.0-flash",
+        client_provider: Optional[ClientProvider] = None,
+        single_flight: Optional[SingleFlight] = None,
+        validation_mode: Optional[str] = None,
+        source_store: Optional[SourceStore] = None
+    ):
         """
         Initialize the Orchestrator Agent and all sub-agents.
         
         Args:
             model_name: The Gemini model to use
+            client_provider: Shared client provider, defaults to the process-wide one
+            single_flight: In-flight job deduplication, defaults to the
+                process-wide group (None when disabled in AgentConfig)
+            validation_mode: "report" to fact-check the summary in one prompt,
+                "claims" to check its claims individually; defaults to
+                AgentConfig.VALIDATION_MODE
+            source_store: Store of sources and per-source summaries shared by
+                the search and summarization agents, defaults to the
+                process-wide one
         """
-        self.client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
+        self.client_provider = client_provider or get_default_provider()
         self.model_name = model_name
+        if single_flight is None and AgentConfig.SINGLE_FLIGHT_ENABLED:
+            single_flight = get_default_single_flight()
+        self.single_flight = single_flight
+        self.validation_mode = validation_mode or AgentConfig.VALIDATION_MODE
         
-        # Initialize specialized agents
-        self.search_agent = LiteratureSearchAgent(model_name)
-        self.summarization_agent = SummarizationAgent(model_name)
-        self.fact_checker_agent = FactCheckerAgent(model_name)
-        self.writer_agent = WriterAgent(model_name)
+        # Initialize specialized agents, all sharing one pooled client
+        self.search_agent = LiteratureSearchAgent(model_name, self.client_provider, source_store)
+        self.summarization_agent = SummarizationAgent(model_name, self.client_provider, source_store)
+        self.fact_checker_agent = FactCheckerAgent(model_name, self.client_provider)
+        self.writer_agent = WriterAgent(model_name, self.client_provider)
         
         # Workflow state
         self.current_research = {}
+        self.workflow_cache = NodeCache()
         
         # System instruction
         self.system_instruction = """
@@ -64,60 +92,281 @@ class OrchestratorAgent:
         Always maintain high research standards.
         """
     
-    def conduct_research(
+    # Stream phase names, the result fields they complete and their streamed text
+    RESULT_PHASES = [
+        ("search", "search_results", None),
+        ("summary", "summary", "summary"),
+        ("validation", "validation", "validation_report"),
+        ("report", "report", "report")
+    ]
+    
+    @property
+    def client(self) -> genai.Client:
+        """The pooled Gemini client shared with all sub-agents."""
+        return self.client_provider.client
+    
+    async def conduct_research_stream_async(
         self, 
         topic: str, 
         depth: str = "medium",
         validate: bool = True,
-        generate_report: bool = True
-    ) -> Dict[str, Any]:
+        generate_report: bool = True,
+        previous: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Conduct a complete research workflow.
+        Conduct a complete research workflow, streaming progress as it happens.
+        
+        Each call builds its own result state, so many research jobs can run
+        concurrently on one event loop with a single orchestrator. If an
+        identical job (same normalized topic and options) is already running
+        in this or another worker process, the call waits for that job and
+        replays its results instead of repeating the API calls.
+        
+        Given the results of an earlier run on the topic, the research is
+        refreshed incrementally: only sources that run didn't have are
+        summarized and merged into its summary, and fact-checking and the
+        report are redone only if the summary changed meaningfully.
         
         Args:
             topic: The research topic
             depth: Research depth (quick, medium, deep)
             validate: Whether to fact-check findings
             generate_report: Whether to generate a full report
+            previous: Results of an earlier run on the same topic to refresh
+                (an exact normalized-topic match, never a similar topic)
             
+        Yields:
+            Event dictionaries with a "phase" (search, summary, validation,
+            report or done) and an "event" type: "chunk" events carry newly
+            generated "text", "complete" events carry the phase "result".
+            The final "done" event's result is the full research results.
+        """
+        if self.single_flight is None:
+            async for event in self._research_pipeline_async(
+                topic, depth, validate, generate_report, previous
+            ):
+                yield event
+            return
+        
+        key = self.single_flight.make_key(
+            " ".join(topic.split()).casefold(), depth, validate, generate_report,
+            self.validation_mode, (previous or {}).get("summary", {}).get("summary")
+        )
+        flight, shared = await self.single_flight.acquire(key)
+        
+        if flight is None:
+            print(f"\n🔗 Joined in-flight research on: {topic}")
+            for phase, field, text_field in self.RESULT_PHASES:
+                if field not in shared:
+                    continue
+                if text_field:
+                    yield {"phase": phase, "event": "chunk", "text": shared[field][text_field]}
+                yield {"phase": phase, "event": "complete", "result": shared[field]}
+            self.current_research = shared
+            yield {"phase": "done", "event": "complete", "result": shared}
+            return
+        
+        published = False
+        try:
+            async for event in self._research_pipeline_async(
+                topic, depth, validate, generate_report, previous
+            ):
+                if event["phase"] == "done":
+                    flight.publish(event["result"])
+                    published = True
+                yield event
+        except BaseException as e:
+            if not published:
+                flight.fail(e)
+            raise
+    
+    async def _summary_input_async(self, search_results: Dict[str, Any]) -> tuple:
+        """
+        Material the summary is written from.
+        
+        The summary is always written from the search text (the sources'
+        own listing when only some sources are given). Structured results
+        are also summarized source by source, reusing stored summaries, for
+        the per-source summaries kept with the summary.
+        
         Returns:
-            Dictionary containing research results
+            Tuple of (content, per-source summaries or None)
+        """
+        sources = search_results.get("sources")
+        content = search_results.get("search_results")
+        if not sources:
+            return content, None
+        if content is None:
+            content = format_sources([SourceRecord.from_dict(s) for s in sources])
+        
+        result = await self.summarization_agent.summarize_sources_async(sources)
+        if result["reused"]:
+            print(f"✓ Reused {result['reused']} stored source summaries")
+        return content, result["source_summaries"]
+    
+    @staticmethod
+    def _source_delta(
+        topic: str,
+        search_results: Dict[str, Any],
+        previous: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Split a search's sources into those an earlier run had and new ones.
+        
+        Returns:
+            Dictionary with the earlier run's "previous_sources" and the
+            "new_sources", or None when the runs can't be compared (no earlier
+            run, an earlier run on another topic, or either lacks structured
+            sources) and research starts over
         """
+        if not previous or "summary" not in previous:
+            return None
+        previous_topic = previous.get("search_results", {}).get("topic")
+        if previous_topic is not None and normalize_topic(previous_topic) != normalize_topic(topic):
+            print(f"⚠ Earlier results are for '{previous_topic}', researching from scratch")
+            return None
+        old_sources = previous.get("search_results", {}).get("sources")
+        found = search_results.get("sources")
+        if not old_sources or not found:
+            return None
+        
+        def identity(source: Dict[str, Any]) -> str:
+            return SourceStore.key(source) or source.get("title", "").casefold()
+        
+        seen = {identity(s) for s in old_sources}
+        return {
+            "previous_sources": old_sources,
+            "new_sources": [s for s in found if identity(s) not in seen]
+        }
+    
+    async def _research_pipeline_async(
+        self,
+        topic: str,
+        depth: str,
+        validate: bool,
+        generate_report: bool,
+        previous: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run the four research phases, yielding stream events."""
+        research = {}
+        
         print(f"\n🔬 Starting research on: {topic}")
         print("=" * 60)
         
         # Step 1: Literature Search
         print("\n📚 Phase 1: Literature Search")
         num_sources = {"quick": 3, "medium": 5, "deep": 10}.get(depth, 5)
-        search_results = self.search_agent.search(topic, num_sources)
+        search_results = await self.search_agent.search_async(topic, num_sources)
         print(f"✓ Found {num_sources} sources")
         
+        # Incremental refresh: keep the earlier sources and add the new ones
+        delta = self._source_delta(topic, search_results, previous)
+        if delta is not None:
+            sources = delta["previous_sources"] + delta["new_sources"]
+            search_results = {
+                **search_results,
+                "search_results": format_sources([SourceRecord.from_dict(s) for s in sources]),
+                "sources": sources,
+                "new_sources": delta["new_sources"]
+            }
+            research["incremental"] = {
+                "previous_sources": len(delta["previous_sources"]),
+                "new_sources": len(delta["new_sources"]),
+                "summary_change": 0.0,
+                "reused": []
+            }
+            print(f"✓ {len(delta['new_sources'])} new sources since the last run")
+        
         # Store search results
-        self.current_research["search_results"] = search_results
+        research["search_results"] = search_results
+        yield {"phase": "search", "event": "complete", "result": search_results}
         
         # Step 2: Summarization
         print("\n📝 Phase 2: Analyzing and Summarizing")
-        summary = self.summarization_agent.summarize(
-            search_results["search_results"],
-            focus=topic
-        )
-        print("✓ Analysis complete")
+        if delta is not None and not delta["new_sources"]:
+            summary = previous["summary"]
+            research["incremental"]["reused"].append("summary")
+            yield {"phase": "summary", "event": "chunk", "text": summary["summary"]}
+        else:
+            if delta is not None:
+                # Summarize only the new sources and merge them into the old summary
+                content, source_summaries = await self._summary_input_async(
+                    {"sources": delta["new_sources"]}
+                )
+                stream = self.summarization_agent.merge_summary_stream_async(
+                    previous["summary"]["summary"],
+                    content,
+                    focus=topic
+                )
+            else:
+                content, source_summaries = await self._summary_input_async(search_results)
+                stream = self.summarization_agent.summarize_stream_async(content, focus=topic)
+            chunks = []
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield {"phase": "summary", "event": "chunk", "text": chunk}
+            summary = {
+                "summary": "".join(chunks),
+                "source_length": len(content),
+                "focus": topic
+            }
+            if source_summaries is not None:
+                if delta is not None:
+                    source_summaries = previous["summary"].get("source_summaries", []) + source_summaries
+                summary["source_summaries"] = source_summaries
+        print("\n✓ Analysis complete")
+        
+        # Later phases are redone only if the summary changed meaningfully
+        changed = True
+        if delta is not None:
+            change = text_change(previous["summary"]["summary"], summary["summary"])
+            research["incremental"]["summary_change"] = round(change, 3)
+            changed = change >= AgentConfig.INCREMENTAL_MIN_CHANGE
         
         # Store summary
-        self.current_research["summary"] = summary
+        research["summary"] = summary
+        yield {"phase": "summary", "event": "complete", "result": summary}
         
         # Step 3: Fact-Checking (if enabled)
         if validate:
             print("\n✓ Phase 3: Fact-Checking")
-            validation = self.fact_checker_agent.validate_content(
-                summary["summary"],
-                topic
-            )
-            print("✓ Validation complete")
-            self.current_research["validation"] = validation
+            if not changed and "validation" in previous:
+                print("✓ Summary essentially unchanged, keeping previous validation")
+                validation = previous["validation"]
+                research["incremental"]["reused"].append("validation")
+                yield {"phase": "validation", "event": "chunk", "text": validation["validation_report"]}
+            elif self.validation_mode == "claims":
+                validation = await self.fact_checker_agent.validate_claims_async(
+                    summary["summary"],
+                    topic
+                )
+                yield {"phase": "validation", "event": "chunk", "text": validation["validation_report"]}
+            else:
+                chunks = []
+                async for chunk in self.fact_checker_agent.validate_content_stream_async(
+                    summary["summary"],
+                    topic
+                ):
+                    chunks.append(chunk)
+                    yield {"phase": "validation", "event": "chunk", "text": chunk}
+                validation = {
+                    "content_validated": True,
+                    "topic": topic,
+                    "validation_report": "".join(chunks)
+                }
+            print("\n✓ Validation complete")
+            research["validation"] = validation
+            yield {"phase": "validation", "event": "complete", "result": validation}
         
         # Step 4: Generate Report (if enabled)
-        if generate_report:
+        if generate_report and not changed and "report" in previous and validate == ("validation" in previous):
+            print("\n✍️ Phase 4: Summary essentially unchanged, keeping previous report")
+            report = previous["report"]
+            research["incremental"]["reused"].append("report")
+            research["report"] = report
+            yield {"phase": "report", "event": "chunk", "text": report["report"]}
+            yield {"phase": "report", "event": "complete", "result": report}
+        elif generate_report:
             print("\n✍️ Phase 4: Writing Report")
             
             # Prepare research data for writer
@@ -130,18 +379,91 @@ class OrchestratorAgent:
             if validate:
                 research_data["validation"] = validation["validation_report"]
             
-            report = self.writer_agent.write_report(
+            chunks = []
+            prompt_stats = {}
+            async for chunk in self.writer_agent.write_report_stream_async(
                 topic,
                 research_data,
-                style="academic"
-            )
-            print(f"✓ Report complete ({report['word_count']} words)")
-            self.current_research["report"] = report
+                style="academic",
+                prompt_stats=prompt_stats
+            ):
+                chunks.append(chunk)
+                yield {"phase": "report", "event": "chunk", "text": chunk}
+            report_text = "".join(chunks)
+            report = {
+                "topic": topic,
+                "report": report_text,
+                "style": "academic",
+                "word_count": len(report_text.split()),
+                "prompt_stats": prompt_stats
+            }
+            print(f"\n✓ Report complete ({report['word_count']} words, "
+                  f"{prompt_stats['tokens_saved']} prompt tokens saved)")
+            research["report"] = report
+            yield {"phase": "report", "event": "complete", "result": report}
         
         print("\n" + "=" * 60)
         print("✅ Research Complete!")
         
-        return self.current_research
+        self.current_research = research
+        yield {"phase": "done", "event": "complete", "result": research}
+    
+    def conduct_research_stream(
+        self, 
+        topic: str, 
+        depth: str = "medium",
+        validate: bool = True,
+        generate_report: bool = True,
+        previous: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Blocking wrapper around conduct_research_stream_async()."""
+        return self.client_provider.iter_sync(
+            self.conduct_research_stream_async(topic, depth, validate, generate_report, previous)
+        )
+    
+    async def conduct_research_async(
+        self, 
+        topic: str, 
+        depth: str = "medium",
+        validate: bool = True,
+        generate_report: bool = True,
+        previous: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Conduct a complete research workflow.
+        
+        Args:
+            topic: The research topic
+            depth: Research depth (quick, medium, deep)
+            validate: Whether to fact-check findings
+            generate_report: Whether to generate a full report
+            previous: Results of an earlier run on the same topic to refresh
+                (an exact normalized-topic match, never a similar topic)
+                incrementally
+            
+        Returns:
+            Dictionary containing research results
+        """
+        results = {}
+        async for event in self.conduct_research_stream_async(
+            topic, depth, validate, generate_report, previous
+        ):
+            if event["phase"] == "done":
+                results = event["result"]
+        return results
+    
+    def conduct_research(
+        self, 
+        topic: str, 
+        depth: str = "medium",
+        validate: bool = True,
+        generate_report: bool = True,
+        previous: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Blocking wrapper around conduct_research_async()."""
+        return self.client_provider.run_sync(
+            self.conduct_research_async(topic, depth, validate, generate_report, previous)
+        )
     
     def quick_research(self, topic: str) -> str:
         """
@@ -179,12 +501,22 @@ class OrchestratorAgent:
             generate_report=True
         )
     
-    def research_and_compare(self, topics: list[str]) -> Dict[str, Any]:
+    async def research_and_compare_async(
+        self,
+        topics: list[str],
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
-        Research multiple topics and compare findings.
+        Research multiple topics concurrently and compare findings.
+        
+        Topics are researched independently with their own result state; a
+        failing topic is recorded in ``errors`` and the comparison is built
+        from the topics that succeeded.
         
         Args:
             topics: List of research topics
+            max_concurrency: Maximum topics researched at once
+                (defaults to AgentConfig.MAX_PARALLEL_TOPICS)
             
         Returns:
             Comparative analysis
@@ -192,36 +524,132 @@ class OrchestratorAgent:
         print(f"\n🔬 Comparative Research: {len(topics)} topics")
         print("=" * 60)
         
-        all_results = {}
-        summaries = []
+        semaphore = asyncio.Semaphore(max_concurrency or AgentConfig.MAX_PARALLEL_TOPICS)
+        
+        async def research_topic(i: int, topic: str) -> Dict[str, Any]:
+            async with semaphore:
+                print(f"\n📚 Researching topic {i}/{len(topics)}: {topic}")
+                return await self.conduct_research_async(
+                    topic,
+                    depth="medium",
+                    validate=False,
+                    generate_report=False
+                )
         
         # Research each topic
-        for i, topic in enumerate(topics, 1):
-            print(f"\n📚 Researching topic {i}/{len(topics)}: {topic}")
-            results = self.conduct_research(
-                topic,
-                depth="medium",
-                validate=False,
-                generate_report=False
-            )
-            all_results[topic] = results
-            summaries.append(results["summary"]["summary"])
+        outcomes = await asyncio.gather(
+            *(research_topic(i, topic) for i, topic in enumerate(topics, 1)),
+            return_exceptions=True
+        )
+        
+        all_results = {}
+        summaries = []
+        errors = {}
+        for topic, outcome in zip(topics, outcomes):
+            if isinstance(outcome, BaseException):
+                # Includes a topic's CancelledError, which is not an Exception
+                print(f"⚠️ Research on '{topic}' failed: {outcome!r}")
+                errors[topic] = str(outcome) or type(outcome).__name__
+                continue
+            all_results[topic] = outcome
+            summaries.append(outcome["summary"]["summary"])
         
         # Synthesize comparison
-        print("\n🔄 Synthesizing comparison...")
-        comparison_topic = " vs ".join(topics)
-        synthesis = self.summarization_agent.synthesize_multiple(
-            summaries,
-            comparison_topic
-        )
+        synthesis = None
+        if summaries:
+            print("\n🔄 Synthesizing comparison...")
+            comparison_topic = " vs ".join(all_results)
+            synthesis = await self.summarization_agent.synthesize_multiple_async(
+                summaries,
+                comparison_topic
+            )
         
         return {
             "topics": topics,
             "individual_results": all_results,
-            "comparison": synthesis
+            "comparison": synthesis,
+            "errors": errors
         }
     
-    def custom_workflow(
+    def research_and_compare(
+        self,
+        topics: list[str],
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Blocking wrapper around research_and_compare_async()."""
+        return self.client_provider.run_sync(
+            self.research_and_compare_async(topics, max_concurrency)
+        )
+    
+    def build_workflow(self, workflow_steps: list[str]) -> WorkflowGraph:
+        """
+        Build the workflow graph for a list of steps.
+        
+        Each step names the outputs it consumes, so validation and the report
+        draft both start as soon as the summary exists. Steps whose inputs are
+        not part of the workflow are skipped, except the report, which is
+        written from whichever of the search and summary the workflow has.
+        
+        Args:
+            workflow_steps: List of steps (search, summarize, validate, write)
+            
+        Returns:
+            Workflow graph taking the initial value "topic"
+        """
+        async def search(topic):
+            print("\n📚 Searching...")
+            return await self.search_agent.search_async(topic)
+        
+        async def summarize(search):
+            print("\n📝 Summarizing...")
+            content, source_summaries = await self._summary_input_async(search)
+            if content:
+                summary = await self.summarization_agent.summarize_async(content)
+                if source_summaries is not None:
+                    summary["source_summaries"] = source_summaries
+                return summary
+        
+        async def validate(topic, summarize):
+            print("\n✓ Validating...")
+            content = summarize.get("summary", "")
+            if content and self.validation_mode == "claims":
+                return await self.fact_checker_agent.validate_claims_async(content, topic)
+            if content:
+                return await self.fact_checker_agent.validate_content_async(content, topic)
+        
+        async def write(topic, search, summarize):
+            print("\n✍️ Writing...")
+            search, summarize = search or {}, summarize or {}
+            research_data = {
+                "findings": summarize.get("summary", ""),
+                "sources": search.get("search_results", ""),
+                "synthesis": summarize.get("summary", "")
+            }
+            return await self.writer_agent.write_report_async(topic, research_data)
+        
+        # Cached outputs expire like the agents' responses do, so
+        # search-grounded steps are rerun once their results are stale
+        ttl = AgentConfig.RESPONSE_CACHE_TTL_SECONDS
+        available = {
+            "search": WorkflowNode("search", search, ["topic"], ttl_seconds=ttl.get("search")),
+            "summarize": WorkflowNode("summarize", summarize, ["search"], ttl_seconds=ttl.get("summarize")),
+            "validate": WorkflowNode(
+                "validate", validate, ["topic", "summarize"], ttl_seconds=ttl.get("fact_check")
+            ),
+            "write": WorkflowNode(
+                "write", write, ["topic"], ttl_seconds=ttl.get("write"), optional=["search", "summarize"]
+            )
+        }
+        
+        graph = WorkflowGraph()
+        for step in dict.fromkeys(workflow_steps):
+            if step in available:
+                graph.add_node(available[step])
+            else:
+                print(f"Warning: Unknown workflow step '{step}' ignored")
+        return graph
+    
+    async def custom_workflow_async(
         self,
         topic: str,
         workflow_steps: list[str]
@@ -229,51 +657,48 @@ class OrchestratorAgent:
         """
         Execute a custom research workflow.
         
+        Independent steps run concurrently, and steps whose inputs are
+        unchanged since an earlier run are served from the workflow cache.
+        
         Args:
             topic: Research topic
             workflow_steps: List of steps (search, summarize, validate, write)
             
         Returns:
-            Results from custom workflow
+            Results from custom workflow, with per-step errors, skipped and
+            cached steps and timings
         """
-        results = {"topic": topic, "steps": {}}
-        
         print(f"\n🔬 Custom Workflow: {topic}")
         print(f"Steps: {', '.join(workflow_steps)}")
         print("=" * 60)
         
-        for step in workflow_steps:
-            if step == "search":
-                print("\n📚 Searching...")
-                results["steps"]["search"] = self.search_agent.search(topic)
-                
-            elif step == "summarize":
-                print("\n📝 Summarizing...")
-                content = results["steps"].get("search", {}).get("search_results", "")
-                if content:
-                    results["steps"]["summarize"] = self.summarization_agent.summarize(content)
-                    
-            elif step == "validate":
-                print("\n✓ Validating...")
-                content = results["steps"].get("summarize", {}).get("summary", "")
-                if content:
-                    results["steps"]["validate"] = self.fact_checker_agent.validate_content(
-                        content, topic
-                    )
-                    
-            elif step == "write":
-                print("\n✍️ Writing...")
-                research_data = {
-                    "findings": results["steps"].get("summarize", {}).get("summary", ""),
-                    "sources": results["steps"].get("search", {}).get("search_results", ""),
-                    "synthesis": results["steps"].get("summarize", {}).get("summary", "")
-                }
-                results["steps"]["write"] = self.writer_agent.write_report(
-                    topic, research_data
-                )
+        run = await self.build_workflow(workflow_steps).run(
+            {"topic": topic},
+            cache=self.workflow_cache
+        )
+        
+        for step, error in run["errors"].items():
+            print(f"\n❌ Step '{step}' failed: {error}")
         
         print("\n✅ Custom workflow complete!")
-        return results
+        return {
+            "topic": topic,
+            "steps": run["outputs"],
+            "errors": run["errors"],
+            "skipped": run["skipped"],
+            "cached": run["cached"],
+            "timings": run["timings"]
+        }
+    
+    def custom_workflow(
+        self,
+        topic: str,
+        workflow_steps: list[str]
+    ) -> Dict[str, Any]:
+        """Blocking wrapper around custom_workflow_async()."""
+        return self.client_provider.run_sync(
+            self.custom_workflow_async(topic, workflow_steps)
+        )
     
     def get_current_state(self) -> Dict[str, Any]:
         """Get the current research state."""
@@ -282,4 +707,5 @@ class OrchestratorAgent:
     def reset_state(self):
         """Reset the research state."""
         self.current_research = {}
+        self.workflow_cache.clear()
         print("🔄 Research state reset")
@@ -0,0 +1,152 @@
+"""
+Prompt Budget
+Prompt assembly that removes duplicate material and fits a token budget.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+
+from .call_policy import estimate_tokens
+
+
+# Paragraphs shorter than this (headings, separators) are never deduplicated
+MIN_DEDUP_PARAGRAPH_CHARS = 40
+
+
+@dataclass
+class PromptSection:
+    """A named block of prompt material; lower priority is trimmed first."""
+
+    name: str
+    text: str
+    priority: int
+
+
+def _paragraphs(text: str) -> List[str]:
+    """Split text into paragraphs at blank lines."""
+    return [p for p in re.split(r"\n\s*\n", text or "") if p.strip()]
+
+
+def _normalize(text: str) -> str:
+    """Whitespace- and case-insensitive form used for duplicate detection."""
+    return " ".join(text.split()).casefold()
+
+
+def dedupe_sections(sections: List[PromptSection]) -> List[PromptSection]:
+    """
+    Remove repeated material across sections.
+
+    Sections are visited from highest to lowest priority; any paragraph
+    already seen in a more valuable section is dropped, and sections left
+    empty are removed.
+
+    Args:
+        sections: Sections in prompt order
+
+    Returns:
+        Deduplicated sections in the original order
+    """
+    seen = set()
+    kept = {}
+    for section in sorted(sections, key=lambda s: -s.priority):
+        original = _paragraphs(section.text)
+        paragraphs = []
+        for paragraph in original:
+            key = _normalize(paragraph)
+            if len(key) >= MIN_DEDUP_PARAGRAPH_CHARS:
+                if key in seen:
+                    continue
+                seen.add(key)
+            paragraphs.append(paragraph)
+        if len(paragraphs) == len(original):
+            # Untouched sections keep their exact text so it stays cacheable
+            kept[id(section)] = section
+        elif paragraphs:
+            kept[id(section)] = PromptSection(section.name, "\n\n".join(paragraphs), section.priority)
+    return [kept[id(s)] for s in sections if id(s) in kept]
+
+
+def fit_to_budget(
+    sections: List[PromptSection],
+    budget_tokens: int,
+    count_tokens: Callable[[str], int] = estimate_tokens
+) -> List[PromptSection]:
+    """
+    Trim the lowest-priority sections until the total fits the budget.
+
+    Trailing paragraphs are removed first, then the whole section; the
+    highest-priority section is only ever shortened, never dropped.
+
+    Args:
+        sections: Sections in prompt order
+        budget_tokens: Token budget for all sections together
+        count_tokens: Token counter
+
+    Returns:
+        Sections that fit the budget, in the original order
+    """
+    paragraphs = {id(s): _paragraphs(s.text) for s in sections}
+    counts = {id(s): len(paragraphs[id(s)]) for s in sections}
+    total = sum(count_tokens(s.text) for s in sections)
+    by_priority = sorted(sections, key=lambda s: s.priority)
+
+    for section in by_priority:
+        if total <= budget_tokens:
+            break
+        is_last = section is by_priority[-1]
+        parts = paragraphs[id(section)]
+        while parts and total > budget_tokens and (len(parts) > 1 or not is_last):
+            removed = parts.pop()
+            total -= count_tokens(removed)
+
+    result = []
+    for section in sections:
+        parts = paragraphs[id(section)]
+        if len(parts) == counts[id(section)]:
+            result.append(section)
+        elif parts:
+            result.append(PromptSection(section.name, "\n\n".join(parts), section.priority))
+    return result
+
+
+def assemble_sections(
+    sections: List[PromptSection],
+    budget_tokens: int,
+    count_tokens: Callable[[str], int] = estimate_tokens
+) -> Tuple[List[PromptSection], Dict[str, int]]:
+    """
+    Deduplicate sections and fit them to a token budget.
+
+    Args:
+        sections: Sections in prompt order
+        budget_tokens: Token budget for all sections together (0 for no limit)
+        count_tokens: Token counter
+
+    Returns:
+        Tuple of (final sections, stats with input/output token counts and savings)
+    """
+    original_tokens = sum(count_tokens(s.text) for s in sections)
+
+    deduped = dedupe_sections(sections)
+    deduped_tokens = sum(count_tokens(s.text) for s in deduped)
+
+    final = fit_to_budget(deduped, budget_tokens, count_tokens) if budget_tokens else deduped
+    final_tokens = sum(count_tokens(s.text) for s in final)
+
+    return final, {
+        "original_tokens": original_tokens,
+        "final_tokens": final_tokens,
+        "tokens_saved": original_tokens - final_tokens,
+        "duplicate_tokens_removed": original_tokens - deduped_tokens,
+        "trimmed_tokens": deduped_tokens - final_tokens,
+        "budget_tokens": budget_tokens
+    }
+
+
+__all__ = [
+    "PromptSection",
+    "assemble_sections",
+    "dedupe_sections",
+    "fit_to_budget"
+]
@@ -0,0 +1,210 @@
+"""
+Response Cache
+Persistent, content-addressed cache for Gemini responses shared by all agents.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of model responses.
+
+    Entries are keyed by a hash of everything that determines a response
+    (model, system instruction, prompt, temperature, tools, ...). Each entry
+    carries its own expiry, and the cache is kept under a byte budget by
+    evicting the least recently used entries. SQLite's WAL mode and busy
+    timeout make it safe to share between threads and processes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the Response Cache.
+
+        Args:
+            path: Path to the SQLite database file
+            max_bytes: Total payload size kept before LRU eviction
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        """Create cache tables if they don't exist."""
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                agent TEXT,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0)"
+        )
+
+    @staticmethod
+    def make_key(model: str, contents: Any, config: Any) -> str:
+        """
+        Build the content address for a generation request.
+
+        Args:
+            model: Model name
+            contents: The prompt contents
+            config: GenerateContentConfig (system instruction, temperature, tools, ...)
+
+        Returns:
+            Hex SHA-256 digest of the request
+        """
+        if hasattr(config, "model_dump"):
+            config = config.model_dump(mode="json", exclude_none=True)
+        if hasattr(contents, "model_dump"):
+            contents = contents.model_dump(mode="json", exclude_none=True)
+        material = json.dumps(
+            {"model": model, "contents": contents, "config": config},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _count(self, conn: sqlite3.Connection, name: str):
+        """Increment a hit/miss counter, in-process and persisted."""
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + 1)
+        conn.execute("UPDATE counters SET value = value + 1 WHERE name = ?", (name,))
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached payload.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            The stored payload, or None on a miss or expired entry
+        """
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT payload, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+
+        if row is None or row[1] <= now:
+            if row is not None:
+                conn.execute("DELETE FROM responses WHERE key = ? AND expires_at <= ?", (key, now))
+            self._count(conn, "misses")
+            return None
+
+        conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+        self._count(conn, "hits")
+        return row[0]
+
+    def put(self, key: str, payload: str, ttl_seconds: float, agent: str = None):
+        """
+        Store a payload and evict old entries if over budget.
+
+        Args:
+            key: Cache key from make_key()
+            payload: Serialized response
+            ttl_seconds: How long the entry stays valid
+            agent: Name of the agent that produced it
+        """
+        if ttl_seconds <= 0:
+            return
+
+        conn = self._connect()
+        now = time.time()
+        size = len(payload.encode("utf-8"))
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO responses
+                    (key, agent, payload, size, created_at, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, agent, payload, size, now, now + ttl_seconds, now)
+            )
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Drop least recently used entries until the cache fits max_bytes."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        freed = 0
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            doomed.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics for this process and across all processes."""
+        conn = self._connect()
+        entries, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        counters = dict(conn.execute("SELECT name, value FROM counters"))
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": counters.get("hits", 0),
+            "total_misses": counters.get("misses", 0),
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes
+        }
+
+    def clear(self):
+        """Remove every cached response."""
+        self._connect().execute("DELETE FROM responses")
+
+
+__all__ = ["ResponseCache"]
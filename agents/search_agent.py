@@ -3,23 +3,40 @@ Literature Search Agent
 Searches for research papers, articles, and academic content using Google Search tool.
 """
 
-from google import genai
-from google.genai import types
-import os
+import asyncio
+import sqlite3
+from typing import Optional
 
+from config.agent_config import AgentConfig
+from source_store import SourceStore, get_default_source_store
 
-class LiteratureSearchAgent:
+from .base_agent import BaseAgent
+from .client_provider import ClientProvider
+from .sources import SourceRecord, attach_grounding, format_sources, parse_source_records
+
+
+class LiteratureSearchAgent(BaseAgent):
     """Agent responsible for finding relevant research papers and articles."""
     
-    def __init__(self, model_name: str = "gemini-2.0-flash"):
+    agent_type = "search"
+    
+    def __init__(
+        self,
+        model_name: str = "gemini-2.0-flash",
+        client_provider: Optional[ClientProvider] = None,
+        source_store: Optional[SourceStore] = None
+    ):
         """
         Initialize the Literature Search Agent.
         
         Args:
             model_name: The Gemini model to use for this agent
+            client_provider: Shared client provider, defaults to the process-wide one
+            source_store: Store that found sources are recorded in, defaults
+                to the process-wide one (None when disabled in AgentConfig)
         """
-        self.client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
-        self.model_name = model_name
+        super().__init__(model_name, client_provider)
+        self.source_store = source_store or get_default_source_store()
         
         # System instruction for the search agent
         self.system_instruction = """
@@ -36,17 +53,44 @@ class LiteratureSearchAgent:
         Always use the Google Search tool to find information.
         """
     
-    def search(self, topic: str, num_sources: int = 5) -> dict:
+    async def search_async(
+        self,
+        topic: str,
+        num_sources: int = 5,
+        structured: Optional[bool] = None
+    ) -> dict:
         """
         Search for literature on a given topic.
         
+        In structured mode the model is asked for a JSON array of sources,
+        which is parsed into source records with the grounding URLs the search
+        tool reported; "search_results" then holds a compact listing of those
+        records instead of the raw response. Records are merged with what the
+        source store already knows about them and marked "known" if an
+        earlier search found them. If the response holds no usable
+        JSON, the raw text is returned as in free-form mode.
+        
         Args:
             topic: The research topic to search for
             num_sources: Number of sources to find
+            structured: Return typed source records, defaults to
+                AgentConfig.STRUCTURED_SEARCH
             
         Returns:
             Dictionary containing search results with sources
         """
+        if structured is None:
+            structured = AgentConfig.STRUCTURED_SEARCH
+        
+        if structured:
+            output_format = """
+        Respond with only a JSON array, one object per source, with the keys
+        "title", "authors" (list of names), "date", "url" and "relevance"
+        (one or two sentences). Use null for unknown values.
+        """
+        else:
+            output_format = ""
+        
         prompt = f"""
         Search for academic papers and credible articles about: {topic}
         
@@ -58,25 +102,41 @@ class LiteratureSearchAgent:
         - Brief summary of relevance
         
         Focus on recent publications (last 5 years) and peer-reviewed content.
-        """
+        {output_format}"""
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.4,
-                tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+        response = await self._generate_async(
+            prompt,
+            temperature=0.4,
+            tools=self._search_tools()
         )
         
-        return {
+        result = {
             "topic": topic,
             "search_results": response.text,
             "num_sources": num_sources
         }
+        
+        if structured:
+            records = parse_source_records(response.text)
+            grounding_urls = attach_grounding(records, response.text, response)
+            sources = [record.to_dict() for record in records]
+            if self.source_store is not None and sources:
+                try:
+                    sources = await asyncio.to_thread(self.source_store.record_sources, sources, topic)
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not record sources: {e}")
+            if sources:
+                result["search_results"] = format_sources([SourceRecord.from_dict(s) for s in sources])
+            result["sources"] = sources
+            result["grounding_urls"] = grounding_urls
+        
+        return result
     
-    def targeted_search(self, query: str) -> str:
+    def search(self, topic: str, num_sources: int = 5, structured: Optional[bool] = None) -> dict:
+        """Blocking wrapper around search_async()."""
+        return self._run_sync(self.search_async(topic, num_sources, structured))
+    
+    async def targeted_search_async(self, query: str) -> str:
         """
         Perform a targeted search for specific information.
         
@@ -86,14 +146,14 @@ class LiteratureSearchAgent:
         Returns:
             Search results as text
         """
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=query,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.3,
-                tools=[types.Tool(google_search=types.GoogleSearch())]
-            )
+        response = await self._generate_async(
+            query,
+            temperature=0.3,
+            tools=self._search_tools()
         )
         
         return response.text
+    
+    def targeted_search(self, query: str) -> str:
+        """Blocking wrapper around targeted_search_async()."""
+        return self._run_sync(self.targeted_search_async(query))
@@ -0,0 +1,338 @@
+"""
+Single Flight
+Coalesces identical in-flight research jobs within and across processes.
+"""
+
+import asyncio
+import concurrent.futures
+import copy
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from config.agent_config import AgentConfig
+
+
+T = TypeVar("T")
+
+
+class FlightAbandoned(Exception):
+    """The leading job went away without producing a result."""
+
+
+class Flight:
+    """
+    One caller's handle on a coalesced job.
+
+    The leader runs the job and must call publish() or fail(); followers
+    call wait() to receive the leader's result.
+    """
+
+    def __init__(
+        self,
+        group: "SingleFlight",
+        key: str,
+        leader: bool,
+        future: Optional[concurrent.futures.Future] = None,
+        lease_id: Optional[str] = None
+    ):
+        self.group = group
+        self.key = key
+        self.leader = leader
+        self.future = future
+        self.lease_id = lease_id
+
+    async def wait(self) -> Any:
+        """
+        Wait for the leader's result.
+
+        Returns:
+            A private copy of the leader's result
+        """
+        if self.future is not None:
+            result = await asyncio.wrap_future(self.future)
+            return copy.deepcopy(result)
+        return await self.group._wait_for_lease(self.key, self.lease_id)
+
+    def publish(self, result: Any):
+        """Hand the leader's result to every follower."""
+        self.group._finish(self, result=result)
+
+    def fail(self, error: BaseException):
+        """Hand the leader's error to every follower."""
+        self.group._finish(self, error=error)
+
+
+class SingleFlight:
+    """
+    In-flight deduplication keyed by an arbitrary string.
+
+    Within a process, followers attach to the leader's future. Across
+    processes, the leader holds a lease file in a shared directory and writes
+    its result next to it; followers in other processes poll for that result.
+    A lease whose owner died or overran its lease time is taken over.
+    """
+
+    def __init__(
+        self,
+        lease_dir: Optional[str] = None,
+        lease_seconds: float = 1800,
+        poll_interval: float = 0.5,
+        result_ttl_seconds: float = 300
+    ):
+        """
+        Initialize Single Flight.
+
+        Args:
+            lease_dir: Directory for cross-process lease and result files,
+                None to coalesce within this process only
+            lease_seconds: How long a lease stays valid without its result
+            poll_interval: How often followers in other processes poll, in seconds
+            result_ttl_seconds: How long result files are kept for late followers
+        """
+        self.lease_dir = lease_dir
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.result_ttl_seconds = result_ttl_seconds
+
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+        if lease_dir:
+            os.makedirs(lease_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Build a stable key from JSON-serializable parts."""
+        material = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def acquire(self, key: str) -> Tuple[Optional[Flight], Any]:
+        """
+        Join the flight for a key.
+
+        Args:
+            key: Job key from make_key()
+
+        Returns:
+            ``(flight, None)`` if the caller leads and must run the job, or
+            ``(None, result)`` with the result of a job that was already running
+        """
+        while True:
+            flight = self._join(key)
+            if flight.leader:
+                return flight, None
+            try:
+                return None, await flight.wait()
+            except FlightAbandoned:
+                continue
+
+    async def run(self, key: str, make_call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a job unless an identical one is in flight, then share its result.
+
+        Args:
+            key: Job key from make_key()
+            make_call: Factory returning the job's awaitable
+
+        Returns:
+            The job's result
+        """
+        flight, result = await self.acquire(key)
+        if flight is None:
+            return result
+        try:
+            result = await make_call()
+        except BaseException as e:
+            flight.fail(e)
+            raise
+        flight.publish(result)
+        return result
+
+    def _join(self, key: str) -> Flight:
+        """Become the leader for a key, or a follower of the current leader."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return Flight(self, key, leader=False, future=future)
+
+            lease_id = None
+            if self.lease_dir:
+                lease_id, holder = self._try_lease(key)
+                if lease_id is None:
+                    return Flight(self, key, leader=False, lease_id=holder["id"])
+
+            self._inflight[key] = concurrent.futures.Future()
+            return Flight(self, key, leader=True, future=self._inflight[key], lease_id=lease_id)
+
+    def _finish(self, flight: Flight, result: Any = None, error: BaseException = None):
+        """Resolve a leader's flight and release its lease."""
+        with self._lock:
+            self._inflight.pop(flight.key, None)
+
+        if error is None:
+            flight.future.set_result(result)
+        elif isinstance(error, Exception):
+            flight.future.set_exception(error)
+        else:
+            # Cancelled or closed leaders don't decide the outcome for followers
+            flight.future.set_exception(FlightAbandoned())
+
+        if flight.lease_id is not None:
+            if error is None or isinstance(error, Exception):
+                self._write_result(flight.key, flight.lease_id, result, error)
+            self._release_lease(flight.key, flight.lease_id)
+
+    def _lease_path(self, key: str) -> str:
+        return os.path.join(self.lease_dir, f"{key}.lease")
+
+    def _result_path(self, key: str, lease_id: str) -> str:
+        return os.path.join(self.lease_dir, f"{key}.{lease_id}.result.json")
+
+    def _read_lease(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read a lease file, None if it doesn't exist."""
+        try:
+            with open(self._lease_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Still being written; a lease left unreadable for long is stale
+            try:
+                expires_at = os.path.getmtime(self._lease_path(key)) + 10
+            except OSError:
+                expires_at = 0
+            return {"id": None, "pid": None, "expires_at": expires_at}
+
+    @staticmethod
+    def _pid_alive(pid: Optional[int]) -> bool:
+        """Best-effort check that a lease owner is still running."""
+        if not pid or os.name == "nt":
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _lease_valid(self, lease: Dict[str, Any]) -> bool:
+        return lease["expires_at"] > time.time() and self._pid_alive(lease.get("pid"))
+
+    def _try_lease(self, key: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Try to take the lease for a key.
+
+        Returns:
+            ``(lease_id, None)`` when taken, or ``(None, holder_lease)``
+        """
+        path = self._lease_path(key)
+        for _ in range(2):
+            lease = {
+                "id": uuid.uuid4().hex,
+                "pid": os.getpid(),
+                "expires_at": time.time() + self.lease_seconds
+            }
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                holder = self._read_lease(key)
+                if holder is not None and self._lease_valid(holder):
+                    return None, holder
+                # Stale lease: remove it and race for a fresh one
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(lease, f)
+            return lease["id"], None
+
+        holder = self._read_lease(key)
+        return None, holder or {"id": None}
+
+    def _release_lease(self, key: str, lease_id: str):
+        """Remove a lease if it is still ours."""
+        lease = self._read_lease(key)
+        if lease is not None and lease.get("id") == lease_id:
+            try:
+                os.remove(self._lease_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _write_result(self, key: str, lease_id: str, result: Any, error: Optional[BaseException]):
+        """Write a leader's outcome for followers in other processes."""
+        payload = {"result": result} if error is None else {"error": str(error)}
+        path = self._result_path(key, lease_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not share in-flight result: {e}")
+        self._sweep_results()
+
+    def _sweep_results(self):
+        """Delete result files older than the result TTL."""
+        cutoff = time.time() - self.result_ttl_seconds
+        for path in glob.glob(os.path.join(self.lease_dir, "*.result.json")):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    async def _wait_for_lease(self, key: str, lease_id: Optional[str]) -> Any:
+        """Poll for the result of a lease held by another process."""
+        while True:
+            if lease_id is not None:
+                try:
+                    with open(self._result_path(key, lease_id), "r", encoding="utf-8") as f:
+                        payload = json.load(f)
+                except (OSError, ValueError):
+                    payload = None
+                if payload is not None:
+                    if "error" in payload:
+                        raise RuntimeError(payload["error"])
+                    return payload["result"]
+
+            lease = self._read_lease(key)
+            if lease is None or (lease.get("id") is not None and lease["id"] != lease_id):
+                # Released or replaced: give the result file one last look
+                if lease_id is not None and os.path.exists(self._result_path(key, lease_id)):
+                    continue
+                raise FlightAbandoned()
+            if not self._lease_valid(lease):
+                raise FlightAbandoned()
+            if lease_id is None:
+                lease_id = lease.get("id")
+
+            await asyncio.sleep(self.poll_interval)
+
+
+_default_single_flight: Optional[SingleFlight] = None
+_default_single_flight_lock = threading.Lock()
+
+
+def get_default_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group configured from AgentConfig."""
+    global _default_single_flight
+    if _default_single_flight is None:
+        with _default_single_flight_lock:
+            if _default_single_flight is None:
+                _default_single_flight = SingleFlight(
+                    lease_dir=AgentConfig.SINGLE_FLIGHT_DIR or None,
+                    lease_seconds=AgentConfig.SINGLE_FLIGHT_LEASE_SECONDS
+                )
+    return _default_single_flight
+
+
+__all__ = ["SingleFlight", "Flight", "FlightAbandoned", "get_default_single_flight"]
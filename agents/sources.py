@@ -0,0 +1,206 @@
+"""
+Sources
+Typed source records parsed from structured search responses.
+"""
+
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from source_store import canonical_url
+
+
+@dataclass
+class SourceRecord:
+    """One source found by the search agent."""
+
+    title: str
+    url: Optional[str] = None
+    authors: List[str] = field(default_factory=list)
+    date: Optional[str] = None
+    relevance: str = ""
+    grounding_urls: List[str] = field(default_factory=list)
+    # Parts of the search response the search tool grounded on web pages
+    # while describing this source
+    content: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SourceRecord":
+        """Build a record from loosely shaped model output or a stored dict."""
+        authors = data.get("authors") or []
+        if isinstance(authors, str):
+            authors = [a.strip() for a in re.split(r",|;| and ", authors) if a.strip()]
+        return cls(
+            title=str(data.get("title") or "").strip(),
+            url=(str(data["url"]).strip() or None) if data.get("url") else None,
+            authors=[str(a) for a in authors],
+            date=str(data["date"]) if data.get("date") else None,
+            relevance=str(data.get("relevance") or data.get("summary") or "").strip(),
+            grounding_urls=list(data.get("grounding_urls") or []),
+            content=str(data.get("content") or "")
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dictionary for JSON results and storage."""
+        return asdict(self)
+
+
+def extract_json(text: str) -> Any:
+    """Find the JSON value in a response that may wrap it in prose or fences."""
+    text = re.sub(r"```(?:json)?", "", text or "")
+    for opener, closer in (("[", "]"), ("{", "}")):
+        start, end = text.find(opener), text.rfind(closer)
+        if start != -1 and end > start:
+            try:
+                return json.loads(text[start:end + 1])
+            except ValueError:
+                continue
+    return None
+
+
+def parse_source_records(text: str) -> List[SourceRecord]:
+    """
+    Parse source records from a response asked to return a JSON array.
+
+    Args:
+        text: Model response text
+
+    Returns:
+        Records with a title, deduplicated by canonical URL (empty if the
+        response held no usable JSON)
+    """
+    payload = extract_json(text)
+    if isinstance(payload, dict):
+        payload = payload.get("sources") or payload.get("results") or []
+    if not isinstance(payload, list):
+        return []
+
+    records = []
+    seen = set()
+    for item in payload:
+        if not isinstance(item, dict):
+            continue
+        record = SourceRecord.from_dict(item)
+        if not record.title:
+            continue
+        key = canonical_url(record.url) or record.title.casefold()
+        if key in seen:
+            continue
+        seen.add(key)
+        records.append(record)
+    return records
+
+
+def grounding_chunks(response: Any) -> List[Dict[str, Optional[str]]]:
+    """
+    Web sources the search tool grounded a response on.
+
+    Returns:
+        ``{"url", "title"}`` per grounding chunk, in chunk order
+    """
+    candidates = getattr(response, "candidates", None) or []
+    metadata = getattr(candidates[0], "grounding_metadata", None) if candidates else None
+    chunks = []
+    for chunk in getattr(metadata, "grounding_chunks", None) or []:
+        web = getattr(chunk, "web", None)
+        chunks.append({"url": getattr(web, "uri", None), "title": getattr(web, "title", None)})
+    return chunks
+
+
+def attach_grounding(records: List[SourceRecord], text: str, response: Any) -> List[str]:
+    """
+    Attach grounding URLs to the records whose part of the response they support.
+
+    Each record spans the response from its title to the next record's
+    title; a grounding support whose segment starts inside that span adds its
+    chunk URLs to the record, and its segment text to the record's
+    "content". Records without a URL of their own take their first
+    grounding URL.
+
+    Args:
+        records: Records parsed from the response text
+        text: The response text
+        response: The response carrying grounding metadata
+
+    Returns:
+        Every grounding URL of the response, in chunk order
+    """
+    chunks = grounding_chunks(response)
+    urls = [c["url"] for c in chunks if c["url"]]
+    candidates = getattr(response, "candidates", None) or []
+    metadata = getattr(candidates[0], "grounding_metadata", None) if candidates else None
+    supports = getattr(metadata, "grounding_supports", None) or []
+
+    # Segment offsets are byte offsets into the response text
+    encoded = (text or "").encode("utf-8")
+    starts = []
+    for index, record in enumerate(records):
+        position = encoded.find(json.dumps(record.title, ensure_ascii=False)[1:-1].encode("utf-8"))
+        if position != -1:
+            starts.append((position, index))
+    starts.sort()
+
+    for support in supports:
+        segment = getattr(support, "segment", None)
+        offset = getattr(segment, "start_index", None) or 0
+        owner = None
+        for position, index in starts:
+            if position > offset:
+                break
+            owner = index
+        if owner is None:
+            continue
+        record = records[owner]
+        grounded = False
+        for chunk_index in getattr(support, "grounding_chunk_indices", None) or []:
+            if chunk_index < len(chunks):
+                grounded = True
+                url = chunks[chunk_index]["url"]
+                if url and url not in record.grounding_urls:
+                    record.grounding_urls.append(url)
+        segment_text = getattr(segment, "text", None)
+        if segment_text is None:
+            end = getattr(segment, "end_index", None) or offset
+            segment_text = encoded[offset:end].decode("utf-8", errors="ignore")
+        segment_text = segment_text.strip()
+        if grounded and segment_text and segment_text not in record.content:
+            record.content = f"{record.content} {segment_text}".strip()
+
+    for record in records:
+        if not record.url and record.grounding_urls:
+            record.url = record.grounding_urls[0]
+    return urls
+
+
+def format_sources(records: List[SourceRecord]) -> str:
+    """
+    Compact text listing of sources for later prompts.
+
+    Args:
+        records: Source records
+
+    Returns:
+        One numbered entry per source with its citation line and relevance
+    """
+    entries = []
+    for i, record in enumerate(records, 1):
+        citation = record.title
+        if record.authors:
+            citation += f" — {', '.join(record.authors)}"
+        if record.date:
+            citation += f" ({record.date})"
+        if record.url:
+            citation += f" {record.url}"
+        entries.append(f"{i}. {citation}" + (f"\n   {record.relevance}" if record.relevance else ""))
+    return "\n".join(entries)
+
+
+__all__ = [
+    "SourceRecord",
+    "attach_grounding",
+    "extract_json",
+    "format_sources",
+    "grounding_chunks",
+    "parse_source_records"
+]
@@ -3,23 +3,42 @@ Summarization Agent
 Analyzes and synthesizes research findings from multiple sources.
 """
 
-from google import genai
-from google.genai import types
-import os
+import asyncio
+import sqlite3
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
 
+from config.agent_config import AgentConfig
+from source_store import SourceStore, get_default_source_store
 
-class SummarizationAgent:
+from .base_agent import BaseAgent
+from .call_policy import estimate_tokens
+from .client_provider import ClientProvider
+from .map_reduce import MapReduceSummarizer
+from .sources import extract_json
+
+
+class SummarizationAgent(BaseAgent):
     """Agent responsible for analyzing and summarizing research content."""
     
-    def __init__(self, model_name: str = "gemini-2.0-flash"):
+    agent_type = "summarize"
+    
+    def __init__(
+        self,
+        model_name: str = "gemini-2.0-flash",
+        client_provider: Optional[ClientProvider] = None,
+        source_store: Optional[SourceStore] = None
+    ):
         """
         Initialize the Summarization Agent.
         
         Args:
             model_name: The Gemini model to use for this agent
+            client_provider: Shared client provider, defaults to the process-wide one
+            source_store: Store of per-source summaries to reuse, defaults to
+                the process-wide one (None when disabled in AgentConfig)
         """
-        self.client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
-        self.model_name = model_name
+        super().__init__(model_name, client_provider)
+        self.source_store = source_store or get_default_source_store()
         
         # System instruction for the summarization agent
         self.system_instruction = """
@@ -37,10 +56,84 @@ class SummarizationAgent:
         Always be concise, accurate, and cite sources when possible.
         """
     
-    def summarize(self, content: str, focus: str = None) -> dict:
+    def _summarize_prompt(self, content: str, focus: str = None) -> str:
+        """Build the summarization prompt."""
+        focus_instruction = f"\nFocus specifically on: {focus}" if focus else ""
+        
+        return f"""
+        Analyze and summarize the following research content:
+        
+        {content}
+        {focus_instruction}
+        
+        Provide:
+        1. Executive Summary (2-3 sentences)
+        2. Key Findings (bullet points)
+        3. Important Themes
+        4. Notable Insights or Gaps
+        """
+    
+    async def _condense_async(self, texts: List[str], focus: str = None) -> Tuple[List[str], list]:
+        """
+        Map-reduce texts that are too large for one prompt.
+        
+        Args:
+            texts: Input texts, one per source
+            focus: Optional focus area kept by every partial summary
+            
+        Returns:
+            Tuple of (texts or condensed partial summaries, per-level stats;
+            empty when the input already fit)
+        """
+        if sum(estimate_tokens(t) for t in texts) <= AgentConfig.SUMMARY_TARGET_TOKENS:
+            return texts, []
+        
+        focus_instruction = f" Keep everything relevant to: {focus}." if focus else ""
+        
+        async def map_chunk(chunk: str) -> str:
+            prompt = f"""
+            Extract the key findings, data, claims and sources from this part of a
+            larger body of research material.{focus_instruction} Be concise.
+            
+            {chunk}
+            """
+            response = await self._generate_async(prompt, temperature=0.3)
+            return response.text or ""
+        
+        async def reduce_group(parts: List[str]) -> str:
+            combined = "\n\n---\n\n".join(parts)
+            prompt = f"""
+            Merge these partial research notes into one concise set of notes,
+            removing repetition but keeping every distinct finding, figure and
+            source.{focus_instruction}
+            
+            {combined}
+            """
+            response = await self._generate_async(prompt, temperature=0.3)
+            return response.text or ""
+        
+        engine = MapReduceSummarizer(
+            map_chunk,
+            reduce_group,
+            chunk_tokens=AgentConfig.SUMMARY_CHUNK_TOKENS,
+            fan_out=AgentConfig.SUMMARY_REDUCE_FAN_OUT,
+            target_tokens=AgentConfig.SUMMARY_TARGET_TOKENS,
+            max_concurrency=AgentConfig.MAX_PARALLEL_SUMMARY_CHUNKS
+        )
+        parts, levels = await engine.condense(texts)
+        for stats in levels:
+            print(f"✓ Map-reduce level {stats['level']}: {stats['calls']} calls, "
+                  f"{stats['input_tokens']} → {stats['output_tokens']} tokens in {stats['seconds']}s")
+        return parts, levels
+    
+    async def summarize_async(self, content: str, focus: str = None) -> dict:
         """
         Summarize research content.
         
+        Content larger than AgentConfig.SUMMARY_TARGET_TOKENS is first
+        condensed chunk by chunk (map-reduce) and the summary is written from
+        the condensed notes.
+        
         Args:
             content: The content to summarize
             focus: Optional focus area for the summary
@@ -48,40 +141,209 @@ class SummarizationAgent:
         Returns:
             Dictionary containing the summary and key points
         """
+        parts, levels = await self._condense_async([content], focus)
+        material = "\n\n".join(parts)
+        prompt = self._summarize_prompt(material, focus)
+        
+        response = await self._generate_async(prompt, temperature=0.3, shared_context=material)
+        
+        result = {
+            "summary": response.text,
+            "source_length": len(content),
+            "focus": focus
+        }
+        if levels:
+            result["map_reduce_levels"] = levels
+        return result
+    
+    def summarize(self, content: str, focus: str = None) -> dict:
+        """Blocking wrapper around summarize_async()."""
+        return self._run_sync(self.summarize_async(content, focus))
+    
+    async def summarize_stream_async(self, content: str, focus: str = None) -> AsyncIterator[str]:
+        """
+        Stream a summary of research content as it is generated.
+        
+        Large content is condensed first, as in summarize_async().
+        
+        Args:
+            content: The content to summarize
+            focus: Optional focus area for the summary
+            
+        Yields:
+            Text chunks of the summary
+        """
+        parts, _ = await self._condense_async([content], focus)
+        material = "\n\n".join(parts)
+        prompt = self._summarize_prompt(material, focus)
+        
+        async for chunk in self._generate_stream_async(
+            prompt,
+            temperature=0.3,
+            shared_context=material
+        ):
+            yield chunk
+    
+    def summarize_stream(self, content: str, focus: str = None) -> Iterator[str]:
+        """Blocking wrapper around summarize_stream_async()."""
+        return self._iter_sync(self.summarize_stream_async(content, focus))
+    
+    def _merge_prompt(self, previous_summary: str, new_material: str, focus: str = None) -> str:
+        """Build the prompt that merges new findings into an existing summary."""
         focus_instruction = f"\nFocus specifically on: {focus}" if focus else ""
         
-        prompt = f"""
-        Analyze and summarize the following research content:
+        return f"""
+        Update this existing research summary with findings from newly found sources.
         
-        {content}
+        EXISTING SUMMARY:
+        {previous_summary}
+        
+        NEW SOURCES:
+        {new_material}
         {focus_instruction}
         
-        Provide:
-        1. Executive Summary (2-3 sentences)
-        2. Key Findings (bullet points)
-        3. Important Themes
-        4. Notable Insights or Gaps
+        Keep the same structure (Executive Summary, Key Findings, Important Themes,
+        Notable Insights or Gaps). Leave passages that are still accurate word for
+        word, and only add, revise or remove what the new sources change.
         """
+    
+    async def merge_summary_async(self, previous_summary: str, new_material: str, focus: str = None) -> dict:
+        """
+        Merge findings from new sources into an existing summary.
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.3
-            )
-        )
+        Args:
+            previous_summary: Summary from an earlier run
+            new_material: Summaries of the sources found since
+            focus: Optional focus area for the summary
+            
+        Returns:
+            Dictionary containing the updated summary
+        """
+        prompt = self._merge_prompt(previous_summary, new_material, focus)
+        
+        response = await self._generate_async(prompt, temperature=0.3)
         
         return {
             "summary": response.text,
-            "source_length": len(content),
+            "source_length": len(new_material),
             "focus": focus
         }
     
-    def synthesize_multiple(self, sources: list[str], topic: str) -> dict:
+    def merge_summary(self, previous_summary: str, new_material: str, focus: str = None) -> dict:
+        """Blocking wrapper around merge_summary_async()."""
+        return self._run_sync(self.merge_summary_async(previous_summary, new_material, focus))
+    
+    async def merge_summary_stream_async(
+        self,
+        previous_summary: str,
+        new_material: str,
+        focus: str = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream an updated summary as it is generated.
+        
+        Args:
+            previous_summary: Summary from an earlier run
+            new_material: Summaries of the sources found since
+            focus: Optional focus area for the summary
+            
+        Yields:
+            Text chunks of the updated summary
+        """
+        prompt = self._merge_prompt(previous_summary, new_material, focus)
+        
+        async for chunk in self._generate_stream_async(prompt, temperature=0.3):
+            yield chunk
+    
+    async def summarize_sources_async(self, sources: list[dict]) -> dict:
+        """
+        Summarize each source individually, reusing stored summaries.
+        
+        Only sources carrying "content" (the search text grounded on web
+        pages about them) are summarized, from that text alone; the others
+        keep the relevance note the search gave them, so nothing is written
+        about a source that wasn't grounded. Sources the source store
+        already has an unexpired summary of are not sent to the model; the
+        rest are summarized together in one request and their summaries stored.
+        
+        Args:
+            sources: Source record dictionaries from a structured search
+            
+        Returns:
+            Dictionary with "source_summaries" (title, url and summary per
+            source, in order) and the number of summaries "reused" and "generated"
+        """
+        stored = {}
+        if self.source_store is not None:
+            try:
+                stored = await asyncio.to_thread(self.source_store.get_summaries, sources, self.model_name)
+            except sqlite3.Error as e:
+                print(f"Warning: Source summary lookup failed: {e}")
+        
+        summaries = [stored.get(SourceStore.key(s)) for s in sources]
+        reused = sum(summary is not None for summary in summaries)
+        missing = [i for i, summary in enumerate(summaries) if summary is None and sources[i].get("content")]
+        for i, summary in enumerate(summaries):
+            if summary is None and i not in missing:
+                summaries[i] = sources[i].get("relevance", "")
+        
+        if missing:
+            max_chars = AgentConfig.SOURCE_SUMMARY_MAX_CHARS
+            listing = "\n\n".join(
+                f"{n}. {sources[i].get('title', '')}"
+                + (f" ({sources[i]['url']})" if sources[i].get("url") else "")
+                + f"\n{sources[i]['content'][:max_chars]}"
+                for n, i in enumerate(missing, 1)
+            )
+            prompt = f"""
+            Summarize each of these research sources in 2-3 sentences, covering its
+            key findings and contribution. Use only the text given for each source.
+            
+            {listing}
+            
+            Respond with only a JSON object mapping each source number to its summary.
+            """
+            
+            response = await self._generate_async(prompt, temperature=0.3)
+            
+            generated = extract_json(response.text)
+            generated = generated if isinstance(generated, dict) else {}
+            new_summaries = []
+            for n, i in enumerate(missing, 1):
+                summary = generated.get(str(n)) or generated.get(n)
+                if isinstance(summary, str) and summary.strip():
+                    summaries[i] = summary.strip()
+                    new_summaries.append((sources[i], summaries[i]))
+                else:
+                    # Not stored, so the next search tries again
+                    summaries[i] = sources[i].get("relevance", "")
+            
+            if self.source_store is not None and new_summaries:
+                try:
+                    await asyncio.to_thread(self.source_store.put_summaries, new_summaries, self.model_name)
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not store source summaries: {e}")
+        
+        return {
+            "source_summaries": [
+                {"title": s.get("title", ""), "url": s.get("url"), "summary": summary}
+                for s, summary in zip(sources, summaries)
+            ],
+            "reused": reused,
+            "generated": len(missing)
+        }
+    
+    def summarize_sources(self, sources: list[dict]) -> dict:
+        """Blocking wrapper around summarize_sources_async()."""
+        return self._run_sync(self.summarize_sources_async(sources))
+    
+    async def synthesize_multiple_async(self, sources: list[str], topic: str) -> dict:
         """
         Synthesize information from multiple sources.
         
+        Sources too large for one prompt together are condensed source by
+        source first (map-reduce), so no chunk mixes two sources.
+        
         Args:
             sources: List of source texts
             topic: The research topic
@@ -89,7 +351,8 @@ class SummarizationAgent:
         Returns:
             Dictionary containing synthesized analysis
         """
-        combined = "\n\n---SOURCE SEPARATOR---\n\n".join(sources)
+        parts, levels = await self._condense_async(sources, topic)
+        combined = "\n\n---SOURCE SEPARATOR---\n\n".join(parts)
         
         prompt = f"""
         Synthesize the following research sources about '{topic}':
@@ -104,17 +367,17 @@ class SummarizationAgent:
         5. Identifies research gaps
         """
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.4
-            )
-        )
+        response = await self._generate_async(prompt, temperature=0.4)
         
-        return {
+        result = {
             "synthesis": response.text,
             "num_sources": len(sources),
             "topic": topic
         }
+        if levels:
+            result["map_reduce_levels"] = levels
+        return result
+    
+    def synthesize_multiple(self, sources: list[str], topic: str) -> dict:
+        """Blocking wrapper around synthesize_multiple_async()."""
+        return self._run_sync(self.synthesize_multiple_async(sources, topic))
@@ -0,0 +1,279 @@
+"""
+Workflow Engine
+Declarative workflow graphs whose independent steps run concurrently.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+
+class WorkflowNode:
+    """A workflow step: an async callable and the named inputs it consumes."""
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[..., Awaitable[Any]],
+        inputs: Iterable[str] = (),
+        cacheable: bool = True,
+        version: str = "1",
+        ttl_seconds: Optional[float] = None,
+        optional: Iterable[str] = ()
+    ):
+        """
+        Initialize a workflow node.
+
+        Args:
+            name: Unique step name; also the name its output is published under
+            run: Coroutine function called with each input as a keyword argument
+            inputs: Names of the steps or initial values this step needs
+            cacheable: Whether the output may be reused for identical inputs
+            version: Bump to invalidate cached outputs after changing the step
+            ttl_seconds: How long a cached output stays valid, None for as
+                long as it stays in the cache
+            optional: Inputs this step uses when they are produced; waited
+                for if they are part of the graph, passed as None otherwise
+                (not in the graph, failed or skipped)
+        """
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.cacheable = cacheable
+        self.version = version
+        self.ttl_seconds = ttl_seconds
+        self.optional = list(optional)
+
+
+class NodeCache:
+    """
+    Bounded, thread-safe LRU of node outputs keyed by node and input hash.
+
+    Outputs stored with a TTL expire, so steps that depend on the outside
+    world (web search) are rerun once their output is stale.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Initialize the node cache.
+
+        Args:
+            max_entries: Number of node outputs kept before evicting the oldest
+        """
+        self.max_entries = max_entries
+        # key -> (output, monotonic expiry time or None)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(node: WorkflowNode, inputs: Dict[str, Any]) -> str:
+        """Hash a node's identity together with the values of its inputs."""
+        material = json.dumps(
+            [node.name, node.version, inputs],
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any:
+        """Get a cached, unexpired output, or None."""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            value, expires = self._entries[key]
+            if expires is not None and time.monotonic() >= expires:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """
+        Store an output, evicting the least recently used beyond the bound.
+
+        Args:
+            key: Key from make_key()
+            value: Node output
+            ttl_seconds: Seconds the output stays valid, None for no expiry
+        """
+        expires = time.monotonic() + ttl_seconds if ttl_seconds is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached output."""
+        with self._lock:
+            self._entries.clear()
+
+
+class WorkflowGraph:
+    """
+    A set of workflow nodes connected by their named inputs.
+
+    The scheduler starts every node as soon as all of its inputs exist (and
+    its optional inputs exist or never will), so independent branches run
+    concurrently. A node whose input values are
+    unchanged since a previous run is served from the node cache instead of
+    running again. When a node fails, the nodes depending on it are skipped
+    and the rest of the graph keeps going.
+    """
+
+    def __init__(self, nodes: Iterable[WorkflowNode] = ()):
+        """
+        Initialize the workflow graph.
+
+        Args:
+            nodes: Initial nodes
+        """
+        self.nodes: Dict[str, WorkflowNode] = {}
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: WorkflowNode) -> "WorkflowGraph":
+        """Add a node; names must be unique."""
+        if node.name in self.nodes:
+            raise ValueError(f"Duplicate workflow step: {node.name}")
+        self.nodes[node.name] = node
+        return self
+
+    def add(
+        self,
+        name: str,
+        run: Callable[..., Awaitable[Any]],
+        inputs: Iterable[str] = (),
+        cacheable: bool = True,
+        ttl_seconds: Optional[float] = None,
+        optional: Iterable[str] = ()
+    ) -> "WorkflowGraph":
+        """Create and add a node."""
+        return self.add_node(
+            WorkflowNode(name, run, inputs, cacheable, ttl_seconds=ttl_seconds, optional=optional)
+        )
+
+    def _check(self, initial: Dict[str, Any]):
+        """Reject graphs with cycles."""
+        visiting, done = set(), set(initial)
+
+        def visit(name: str, path: List[str]):
+            if name in done or name not in self.nodes:
+                return
+            if name in visiting:
+                raise ValueError(f"Workflow cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dependency in self.nodes[name].inputs + self.nodes[name].optional:
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.nodes:
+            visit(name, [])
+
+    async def run(
+        self,
+        initial: Optional[Dict[str, Any]] = None,
+        cache: Optional[NodeCache] = None,
+        max_concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the graph.
+
+        Args:
+            initial: Values available to nodes before any step runs (e.g. the topic)
+            cache: Node cache used to skip steps with unchanged inputs
+            max_concurrency: Maximum steps running at once
+
+        Returns:
+            Dictionary with step "outputs", per-step "errors", "skipped" steps
+            with the reason, "cached" step names and per-step "timings"
+        """
+        values = dict(initial or {})
+        self._check(values)
+
+        outputs: Dict[str, Any] = {}
+        errors: Dict[str, str] = {}
+        skipped: Dict[str, str] = {}
+        cached: List[str] = []
+        timings: Dict[str, float] = {}
+
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        pending = dict(self.nodes)
+        running: Dict[asyncio.Task, str] = {}
+
+        async def execute(node: WorkflowNode, inputs: Dict[str, Any]) -> Any:
+            key = NodeCache.make_key(node, inputs) if cache is not None and node.cacheable else None
+            if key is not None:
+                hit = cache.get(key)
+                if hit is not None:
+                    cached.append(node.name)
+                    return hit
+            started = time.perf_counter()
+            if semaphore is not None:
+                async with semaphore:
+                    result = await node.run(**inputs)
+            else:
+                result = await node.run(**inputs)
+            timings[node.name] = time.perf_counter() - started
+            if key is not None and result is not None:
+                cache.put(key, result, node.ttl_seconds)
+            return result
+
+        while pending or running:
+            # Skip steps whose inputs can never be produced
+            for name, node in list(pending.items()):
+                missing = [
+                    i for i in node.inputs
+                    if i not in values and i not in pending and i not in running.values()
+                ]
+                if missing:
+                    reason = ", ".join(
+                        f"{i} failed" if i in errors else f"{i} skipped" if i in skipped
+                        else f"{i} not in workflow"
+                        for i in missing
+                    )
+                    skipped[name] = reason
+                    del pending[name]
+
+            # Start every step whose inputs are all available and whose
+            # optional inputs are available or will never be produced
+            for name, node in list(pending.items()):
+                waiting = any(i in pending or i in running.values() for i in node.optional)
+                if all(i in values for i in node.inputs) and not waiting:
+                    inputs = {i: values.get(i) for i in node.inputs + node.optional}
+                    running[asyncio.ensure_future(execute(node, inputs))] = name
+                    del pending[name]
+
+            if not running:
+                continue
+
+            finished, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                name = running.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    errors[name] = str(e)
+                    continue
+                if result is None:
+                    skipped[name] = "no output"
+                    continue
+                values[name] = result
+                outputs[name] = result
+
+        return {
+            "outputs": outputs,
+            "errors": errors,
+            "skipped": skipped,
+            "cached": cached,
+            "timings": timings
+        }
+
+
+__all__ = ["WorkflowNode", "WorkflowGraph", "NodeCache"]
@@ -3,23 +3,32 @@ Writer Agent
 Generates research reports and documents with proper citations.
 """
 
-from google import genai
-from google.genai import types
-import os
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
 
+from config.agent_config import AgentConfig
+from .base_agent import BaseAgent
+from .client_provider import ClientProvider
+from .prompt_budget import PromptSection, assemble_sections
 
-class WriterAgent:
+
+class WriterAgent(BaseAgent):
     """Agent responsible for writing research reports and documents."""
     
-    def __init__(self, model_name: str = "gemini-2.0-flash"):
+    agent_type = "write"
+    
+    def __init__(
+        self,
+        model_name: str = "gemini-2.0-flash",
+        client_provider: Optional[ClientProvider] = None
+    ):
         """
         Initialize the Writer Agent.
         
         Args:
             model_name: The Gemini model to use for this agent
+            client_provider: Shared client provider, defaults to the process-wide one
         """
-        self.client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
-        self.model_name = model_name
+        super().__init__(model_name, client_provider)
         
         # System instruction for the writer agent
         self.system_instruction = """
@@ -37,22 +46,33 @@ class WriterAgent:
         Always write in a clear, professional academic style with proper attribution.
         """
     
-    def write_report(self, topic: str, research_data: dict, style: str = "academic") -> dict:
+    def _report_prompt(
+        self,
+        topic: str,
+        research_data: dict,
+        style: str
+    ) -> Tuple[str, Dict[str, int], Optional[str]]:
         """
-        Write a complete research report.
+        Build the report-writing prompt.
+        
+        Research materials are deduplicated (findings and synthesis are often
+        the same text) and trimmed to the writer's input token budget, lowest
+        value first: synthesis, then raw sources, then findings.
         
-        Args:
-            topic: The research topic
-            research_data: Dictionary containing research findings, summaries, etc.
-            style: Writing style (academic, technical, accessible)
-            
         Returns:
-            Dictionary containing the written report
+            Tuple of (prompt, prompt assembly stats including tokens saved,
+            the sources text if it was kept, which may be a cached context)
         """
-        # Extract data from research_data
-        findings = research_data.get("findings", "")
-        sources = research_data.get("sources", "")
-        synthesis = research_data.get("synthesis", "")
+        sections, stats = assemble_sections(
+            [
+                PromptSection("FINDINGS", research_data.get("findings", ""), priority=3),
+                PromptSection("SOURCES", research_data.get("sources", ""), priority=2),
+                PromptSection("SYNTHESIS", research_data.get("synthesis", ""), priority=1)
+            ],
+            AgentConfig.PROMPT_INPUT_BUDGET_TOKENS.get(self.agent_type, 0)
+        )
+        materials = "\n\n".join(f"{s.name}:\n{s.text}" for s in sections)
+        sources = next((s.text for s in sections if s.name == "SOURCES"), None)
         
         prompt = f"""
         Write a comprehensive research report on: {topic}
@@ -61,14 +81,7 @@ class WriterAgent:
         
         Use the following research materials:
         
-        FINDINGS:
-        {findings}
-        
-        SOURCES:
-        {sources}
-        
-        SYNTHESIS:
-        {synthesis}
+{materials}
         
         Structure the report with:
         1. Title
@@ -82,24 +95,79 @@ class WriterAgent:
         
         Make it comprehensive, well-cited, and engaging.
         """
+        return prompt, stats, sources
+    
+    async def write_report_async(self, topic: str, research_data: dict, style: str = "academic") -> dict:
+        """
+        Write a complete research report.
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.5
-            )
-        )
+        Args:
+            topic: The research topic
+            research_data: Dictionary containing research findings, summaries, etc.
+            style: Writing style (academic, technical, accessible)
+            
+        Returns:
+            Dictionary containing the written report
+        """
+        prompt, prompt_stats, sources = self._report_prompt(topic, research_data, style)
+        
+        response = await self._generate_async(prompt, temperature=0.5, shared_context=sources)
         
         return {
             "topic": topic,
             "report": response.text,
             "style": style,
-            "word_count": len(response.text.split())
+            "word_count": len(response.text.split()),
+            "prompt_stats": prompt_stats
         }
     
-    def write_section(self, section_type: str, content: str, context: str = "") -> str:
+    def write_report(self, topic: str, research_data: dict, style: str = "academic") -> dict:
+        """Blocking wrapper around write_report_async()."""
+        return self._run_sync(self.write_report_async(topic, research_data, style))
+    
+    async def write_report_stream_async(
+        self,
+        topic: str,
+        research_data: dict,
+        style: str = "academic",
+        prompt_stats: Optional[dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a complete research report as it is generated.
+        
+        Args:
+            topic: The research topic
+            research_data: Dictionary containing research findings, summaries, etc.
+            style: Writing style (academic, technical, accessible)
+            prompt_stats: Optional dictionary filled with prompt assembly stats
+            
+        Yields:
+            Text chunks of the report
+        """
+        prompt, stats, sources = self._report_prompt(topic, research_data, style)
+        if prompt_stats is not None:
+            prompt_stats.update(stats)
+        
+        async for chunk in self._generate_stream_async(
+            prompt,
+            temperature=0.5,
+            shared_context=sources
+        ):
+            yield chunk
+    
+    def write_report_stream(
+        self,
+        topic: str,
+        research_data: dict,
+        style: str = "academic",
+        prompt_stats: Optional[dict] = None
+    ) -> Iterator[str]:
+        """Blocking wrapper around write_report_stream_async()."""
+        return self._iter_sync(
+            self.write_report_stream_async(topic, research_data, style, prompt_stats)
+        )
+    
+    async def write_section_async(self, section_type: str, content: str, context: str = "") -> str:
         """
         Write a specific section of a research document.
         
@@ -121,18 +189,15 @@ class WriterAgent:
         Make it well-structured, clear, and appropriate for an academic paper.
         """
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.5
-            )
-        )
+        response = await self._generate_async(prompt, temperature=0.5)
         
         return response.text
     
-    def create_summary(self, full_report: str, length: str = "medium") -> dict:
+    def write_section(self, section_type: str, content: str, context: str = "") -> str:
+        """Blocking wrapper around write_section_async()."""
+        return self._run_sync(self.write_section_async(section_type, content, context))
+    
+    async def create_summary_async(self, full_report: str, length: str = "medium") -> dict:
         """
         Create an executive summary of a report.
         
@@ -163,14 +228,7 @@ class WriterAgent:
         4. Maintain accuracy
         """
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.4
-            )
-        )
+        response = await self._generate_async(prompt, temperature=0.4)
         
         return {
             "summary": response.text,
@@ -178,7 +236,11 @@ class WriterAgent:
             "target_words": target_words
         }
     
-    def format_citations(self, sources: list[dict], style: str = "APA") -> str:
+    def create_summary(self, full_report: str, length: str = "medium") -> dict:
+        """Blocking wrapper around create_summary_async()."""
+        return self._run_sync(self.create_summary_async(full_report, length))
+    
+    async def format_citations_async(self, sources: list[dict], style: str = "APA") -> str:
         """
         Format citations in a specific style.
         
@@ -199,13 +261,10 @@ class WriterAgent:
         Provide a properly formatted reference list.
         """
         
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                temperature=0.1
-            )
-        )
+        response = await self._generate_async(prompt, temperature=0.1)
         
         return response.text
+    
+    def format_citations(self, sources: list[dict], style: str = "APA") -> str:
+        """Blocking wrapper around format_citations_async()."""
+        return self._run_sync(self.format_citations_async(sources, style))
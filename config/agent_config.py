@@ -28,22 +28,128 @@ class AgentConfig:
     QUICK_RESEARCH_SOURCES = 3
     MEDIUM_RESEARCH_SOURCES = 5
     DEEP_RESEARCH_SOURCES = 10
+    # Search returns typed source records (title, authors, date, URL, relevance)
+    # and passes a compact listing to later phases instead of the raw response
+    STRUCTURED_SEARCH = os.getenv("STRUCTURED_SEARCH", "true").lower() != "false"
+    
+    # Concurrency Settings
+    MAX_PARALLEL_TOPICS = 4  # Topics researched at once in comparative research
+    MAX_PARALLEL_CLAIM_CHECKS = 4  # Claims fact-checked at once in claim validation
+    MAX_PARALLEL_SUMMARY_CHUNKS = 4  # Chunks summarized at once in map-reduce summaries
+    
+    # Map-reduce Summarization (inputs larger than the target are condensed first)
+    SUMMARY_CHUNK_TOKENS = 6000  # Tokens per map chunk
+    SUMMARY_REDUCE_FAN_OUT = 4  # Partial summaries merged per reduce call
+    SUMMARY_TARGET_TOKENS = 8000  # Largest input summarized in a single prompt
+    
+    # Incremental Re-research (refreshing a stored topic only processes new sources)
+    INCREMENTAL_RESEARCH = os.getenv("INCREMENTAL_RESEARCH", "true").lower() != "false"
+    # Validation and report are redone only if the merged summary changed this much
+    # (Jaccard distance of word shingles, 0-1)
+    INCREMENTAL_MIN_CHANGE = 0.15
+    
+    # Validation Settings
+    # "report" checks the summary in one grounded prompt, "claims" checks
+    # extracted claims individually and merges the verdicts
+    VALIDATION_MODE = os.getenv("VALIDATION_MODE", "report")
+    MAX_CLAIMS_PER_VALIDATION = 12
+    # Statements at least this similar (shingle Jaccard) are cross-referenced once
+    CROSS_REFERENCE_SIMILARITY = 0.7
+    CROSS_REFERENCE_BATCH_SIZE = 40  # Distinct statements per cross-reference prompt
+    
+    # In-flight Deduplication (identical concurrent research jobs share one run)
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() != "false"
+    # Shared directory for cross-process leases, empty for in-process only
+    SINGLE_FLIGHT_DIR = os.getenv("SINGLE_FLIGHT_DIR", os.path.join(".cache", "inflight"))
+    SINGLE_FLIGHT_LEASE_SECONDS = 1800
     
     # Memory Settings
     MEMORY_STORAGE_PATH = os.getenv("MEMORY_STORAGE_PATH", "memory_bank.json")
-    MAX_HISTORY_ITEMS = 100
+    # "sqlite" (WAL database) or "jsonl" (append-only log); a ".json" storage path
+    # gets the backend's extension and an existing JSON bank is migrated into it
+    MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "sqlite")
+    MEMORY_LOG_COMPACT_RATIO = 0.5  # JSONL log is rewritten once this share is superseded
+    MEMORY_LOG_COMPACT_MIN_BYTES = 1024 * 1024
+    # Stored results are split into content-addressed blobs compressed with
+    # "zlib" (fast) or "lzma" (smaller)
+    MEMORY_BLOB_CODEC = os.getenv("MEMORY_BLOB_CODEC", "zlib")
+    MEMORY_RESULTS_CACHE_SIZE = 32  # Topics whose full results stay loaded (LRU)
+    # Earlier research is suggested for a topic with the same content words at
+    # least this similar (hashed n-gram cosine, 0-1); only exact topics are reused
+    TOPIC_MATCH_THRESHOLD = 0.85
+    # Sources and per-source summaries shared across topics and depths
+    SOURCE_STORE_ENABLED = os.getenv("SOURCE_STORE_ENABLED", "true").lower() != "false"
+    SOURCE_STORE_PATH = os.getenv("SOURCE_STORE_PATH", "source_store.sqlite3")
+    # Per-source summaries are only written from the grounded search text about a source
+    SOURCE_SUMMARY_TTL_SECONDS = 7 * 24 * 3600
+    SOURCE_SUMMARY_MAX_CHARS = 6000  # Content per source sent for its summary
+    # Retention (0 = unlimited): older sessions are folded into per-day counts, and
+    # topics whose sessions are all gone keep their counts but not their results
+    MAX_HISTORY_ITEMS = int(os.getenv("MAX_HISTORY_ITEMS", "100"))
+    MEMORY_MAX_AGE_DAYS = float(os.getenv("MEMORY_MAX_AGE_DAYS", "0"))
+    MEMORY_MAX_RESULTS_BYTES = 256 * 1024 * 1024  # Oldest topics' results dropped beyond this
+    # Retention and compaction run in a background thread this often; 0 runs them after each store
+    MEMORY_MAINTENANCE_INTERVAL_SECONDS = 60
     
     # Output Settings
     OUTPUT_DIR = os.getenv("OUTPUT_DIR", "outputs")
     REPORT_FORMAT = "txt"  # or "md", "pdf"
     
     # Session Settings
-    SESSION_TIMEOUT_MINUTES = 30
+    SESSION_TIMEOUT_MINUTES = 30  # Idle sessions are evicted after this (0 = never)
+    SESSION_MAX_HISTORY = 200  # Most recent history entries kept per session
+    # Ended sessions are written here as compressed JSON, "" drops them on eviction
+    SESSION_SPILL_DIR = os.getenv("SESSION_SPILL_DIR", "")
     AUTO_SAVE = True
     
     # API Settings
     API_RETRY_ATTEMPTS = 3
     API_TIMEOUT_SECONDS = 30
+    # Per-call deadlines for agents producing long outputs (streams: per chunk)
+    API_TIMEOUT_SECONDS_BY_AGENT = {
+        "summarize": 90,
+        "fact_check": 90,
+        "write": 180
+    }
+    API_RETRY_BASE_DELAY_SECONDS = 1.0
+    API_RETRY_MAX_DELAY_SECONDS = 60.0
+    
+    # Client-side Rate Limits (process-wide, 0 disables)
+    API_REQUESTS_PER_MINUTE = int(os.getenv("API_REQUESTS_PER_MINUTE", "60"))
+    API_TOKENS_PER_MINUTE = int(os.getenv("API_TOKENS_PER_MINUTE", "1000000"))
+    
+    # HTTP Connection Pool Settings (shared by all agents)
+    HTTP_TIMEOUT_SECONDS = 120  # Transport timeout, long enough for full reports
+    HTTP_MAX_CONNECTIONS = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS = 10
+    HTTP_KEEPALIVE_EXPIRY_SECONDS = 300
+    
+    # Prompt Input Budgets (estimated input tokens per phase, 0 for no limit)
+    PROMPT_INPUT_BUDGET_TOKENS = {
+        "write": 12000
+    }
+    
+    # Response Cache Settings
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() != "false"
+    RESPONSE_CACHE_PATH = os.getenv(
+        "RESPONSE_CACHE_PATH", os.path.join(".cache", "responses.sqlite3")
+    )
+    RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    RESPONSE_CACHE_TTL_SECONDS = {
+        "search": 6 * 3600,  # Search-grounded, results go stale quickly
+        "fact_check": 6 * 3600,  # Search-grounded
+        "summarize": 7 * 24 * 3600,  # Pure function of the prompt
+        "write": 7 * 24 * 3600,
+        "claim_verdict": 24 * 3600  # Per normalized claim, shared across topics
+    }
+    
+    # Context Caching (long repeated prompt prefixes cached server-side)
+    CONTEXT_CACHE_ENABLED = os.getenv("CONTEXT_CACHE_ENABLED", "true").lower() != "false"
+    CONTEXT_CACHE_TTL_SECONDS = 3600
+    CONTEXT_CACHE_MIN_TOKENS = 4096  # Smaller prefixes are always sent inline
+    
+    # Per-model generation defaults, e.g. {"gemini-2.0-flash": {"max_output_tokens": 8192}}
+    MODEL_SETTINGS: Dict[str, Dict[str, Any]] = {}
     
     @classmethod
     def get_model(cls) -> str:
@@ -68,11 +174,32 @@ class AgentConfig:
             },
             "memory": {
                 "storage_path": cls.MEMORY_STORAGE_PATH,
-                "max_history": cls.MAX_HISTORY_ITEMS
+                "backend": cls.MEMORY_BACKEND,
+                "max_history": cls.MAX_HISTORY_ITEMS,
+                "max_age_days": cls.MEMORY_MAX_AGE_DAYS,
+                "max_results_bytes": cls.MEMORY_MAX_RESULTS_BYTES
             },
             "output": {
                 "directory": cls.OUTPUT_DIR,
                 "format": cls.REPORT_FORMAT
+            },
+            "response_cache": {
+                "enabled": cls.RESPONSE_CACHE_ENABLED,
+                "path": cls.RESPONSE_CACHE_PATH,
+                "max_bytes": cls.RESPONSE_CACHE_MAX_BYTES,
+                "ttl_seconds": cls.RESPONSE_CACHE_TTL_SECONDS
+            },
+            "api": {
+                "retry_attempts": cls.API_RETRY_ATTEMPTS,
+                "timeout_seconds": cls.API_TIMEOUT_SECONDS,
+                "requests_per_minute": cls.API_REQUESTS_PER_MINUTE,
+                "tokens_per_minute": cls.API_TOKENS_PER_MINUTE
+            },
+            "http": {
+                "timeout_seconds": cls.HTTP_TIMEOUT_SECONDS,
+                "max_connections": cls.HTTP_MAX_CONNECTIONS,
+                "max_keepalive_connections": cls.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                "keepalive_expiry_seconds": cls.HTTP_KEEPALIVE_EXPIRY_SECONDS
             }
         }
     
@@ -9,6 +9,7 @@ Track: Agents for Good (Education)
 import os
 import json
 from agents import OrchestratorAgent
+from config.agent_config import AgentConfig
 from memory_manager import ResearchMemoryManager
 
 
@@ -171,6 +172,14 @@ def example_comparative_research():
     
     results = orchestrator.research_and_compare(topics)
     
+    for topic, error in results["errors"].items():
+        print(f"\n  Skipped '{topic}': {error}")
+    
+    if results["comparison"] is None:
+        print("\n No topics could be researched, nothing to compare.")
+        memory_manager.end_research_session()
+        return
+    
     print("\n Comparison Synthesis:")
     print("-" * 70)
     print(results["comparison"]["synthesis"])
@@ -197,7 +206,11 @@ def example_custom_workflow():
     results = orchestrator.custom_workflow(topic, workflow)
     
     print("\n Custom Workflow Complete!")
-    print(f"Executed steps: {', '.join(workflow)}")
+    print(f"Executed steps: {', '.join(results['steps'])}")
+    if results["cached"]:
+        print(f"Reused from cache: {', '.join(results['cached'])}")
+    for step, reason in results["skipped"].items():
+        print(f"Skipped {step}: {reason}")
 
 
 def example_memory_retrieval():
@@ -226,6 +239,13 @@ def example_memory_retrieval():
     print(f"   Unique topics: {stats['unique_topics']}")
     if stats['most_researched']:
         print(f"   Most researched: {stats['most_researched']}")
+    for item in stats['top_topics'][1:]:
+        print(f"      then: {item['topic']} ({item['research_count']}x)")
+    
+    metrics = memory_manager.memory_bank.get_storage_metrics()
+    print(f"   Stored sessions: {metrics['history_items']} (older: {metrics['pruned_sessions']})")
+    if metrics['storage_bytes'] is not None:
+        print(f"   Storage size: {metrics['storage_bytes'] / 1024:.1f} KB (loaded in {metrics['load_seconds']}s)")
 
 
 def interactive_mode():
@@ -251,21 +271,41 @@ def interactive_mode():
         # Check if topic was researched before
         previous = memory_manager.retrieve_previous_research(topic)
         if previous:
-            print(f"\n Found previous research on this topic!")
+            print(f"\n Found previous research on '{topic}'!")
             use_previous = input("Use previous results? (y/n): ").strip().lower()
             if use_previous == 'y':
                 print_results_summary(previous)
                 continue
+        else:
+            match = memory_manager.suggest_similar_research(topic)
+            if match:
+                print(
+                    f"\n Similar earlier research: '{match['topic']}' "
+                    f"(similarity {match['score']:.2f}, {match['age_days']} days old)"
+                )
+                show_match = input("Show it instead of researching? (y/n): ").strip().lower()
+                if show_match == 'y':
+                    print_results_summary(memory_manager.retrieve_previous_research(match['topic']) or {})
+                    continue
         
         # Conduct research
         depth = input("Research depth (quick/medium/deep) [medium]: ").strip() or "medium"
         
-        results = orchestrator.conduct_research(
+        # Stream tokens to the terminal as each phase is generated; a topic
+        # researched before is refreshed with only what changed since
+        results = {}
+        for event in orchestrator.conduct_research_stream(
             topic,
             depth=depth,
             validate=(depth in ["medium", "deep"]),
-            generate_report=(depth == "deep")
-        )
+            generate_report=(depth == "deep"),
+            # Only research on the same topic seeds a refresh, never a suggestion
+            previous=previous if AgentConfig.INCREMENTAL_RESEARCH else None
+        ):
+            if event["event"] == "chunk":
+                print(event["text"], end="", flush=True)
+            elif event["phase"] == "done":
+                results = event["result"]
         
         # Save results
         memory_manager.save_research_to_session(topic, results)
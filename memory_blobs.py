@@ -0,0 +1,187 @@
+"""
+Memory Blobs
+Content-addressed, compressed storage of research results.
+"""
+
+import hashlib
+import json
+import lzma
+import os
+import zlib
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+# One-byte prefix of a stored blob naming its compression
+CODECS = {"zlib": b"z", "lzma": b"x"}
+
+# Strings at least this long are stored as blobs of their own
+BLOB_MIN_CHARS = 256
+
+_BLOB_KEY = "$blob"
+
+
+def blob_hash(data: bytes) -> str:
+    """Content address of uncompressed blob data."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def compress(data: bytes, codec: str = "zlib") -> bytes:
+    """Compress blob data, prefixed with its codec marker."""
+    if codec == "lzma":
+        return CODECS["lzma"] + lzma.compress(data, preset=6)
+    return CODECS["zlib"] + zlib.compress(data, 6)
+
+
+def decompress(blob: bytes) -> bytes:
+    """Decompress blob data written by compress()."""
+    marker, payload = blob[:1], blob[1:]
+    if marker == CODECS["lzma"]:
+        return lzma.decompress(payload)
+    if marker == CODECS["zlib"]:
+        return zlib.decompress(payload)
+    raise ValueError(f"Unknown blob codec marker {marker!r}")
+
+
+def pack_results(results: Any, min_chars: int = BLOB_MIN_CHARS) -> Tuple[str, Dict[str, bytes]]:
+    """
+    Split research results into content-addressed blobs.
+
+    Every string of at least ``min_chars`` becomes a blob of its own and is
+    replaced by a reference, so the same search results or report text is
+    stored once however many topics, sessions and fields hold it. The
+    remaining structure is the root blob.
+
+    Args:
+        results: JSON-serializable research results
+        min_chars: Shortest string stored as its own blob
+
+    Returns:
+        Tuple of (root blob hash, uncompressed data by hash of every blob
+        the results need, root included)
+    """
+    blobs: Dict[str, bytes] = {}
+
+    def walk(value: Any) -> Any:
+        if isinstance(value, str) and len(value) >= min_chars:
+            data = value.encode("utf-8")
+            key = blob_hash(data)
+            blobs[key] = data
+            return {_BLOB_KEY: key}
+        if isinstance(value, dict):
+            return {str(k): walk(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [walk(v) for v in value]
+        return value
+
+    root = json.dumps(walk(results), ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    root_key = blob_hash(root)
+    blobs[root_key] = root
+    return root_key, blobs
+
+
+def unpack_results(root_key: str, read: Callable[[str], bytes]) -> Any:
+    """
+    Reassemble research results from their blobs.
+
+    Args:
+        root_key: Root blob hash returned by pack_results()
+        read: Returns the uncompressed data of a blob by hash
+
+    Returns:
+        The research results
+    """
+    def walk(value: Any) -> Any:
+        if isinstance(value, dict):
+            if len(value) == 1 and _BLOB_KEY in value:
+                return read(value[_BLOB_KEY]).decode("utf-8")
+            return {k: walk(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [walk(v) for v in value]
+        return value
+
+    return walk(json.loads(read(root_key)))
+
+
+class FileBlobStore:
+    """
+    Directory of compressed blobs, one file per content hash.
+
+    Files are written to a temporary name and renamed into place, so a blob
+    file is either complete or absent.
+    """
+
+    def __init__(self, directory: str, codec: str = "zlib"):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Directory holding the blob files
+            codec: "zlib" or "lzma"
+        """
+        self.directory = directory
+        self.codec = codec
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def has(self, key: str) -> bool:
+        """Whether a blob is stored."""
+        return os.path.exists(self._path(key))
+
+    def put(self, key: str, data: bytes) -> int:
+        """
+        Store a blob unless it is already stored.
+
+        Returns:
+            Bytes written to disk, 0 if the blob was already stored
+        """
+        path = self._path(key)
+        if os.path.exists(path):
+            return 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        blob = compress(data, self.codec)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return len(blob)
+
+    def get(self, key: str) -> bytes:
+        """Uncompressed data of a stored blob."""
+        with open(self._path(key), "rb") as f:
+            return decompress(f.read())
+
+    def delete(self, key: str):
+        """Remove a blob if it is stored."""
+        path = self._path(key)
+        try:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+        except OSError:
+            # Already removed, or other blobs share the directory
+            pass
+
+    def keys(self) -> Iterator[str]:
+        """Hashes of every stored blob."""
+        for prefix in os.listdir(self.directory):
+            subdirectory = os.path.join(self.directory, prefix)
+            if os.path.isdir(subdirectory):
+                for name in os.listdir(subdirectory):
+                    if not name.endswith(".tmp"):
+                        yield name
+
+    def size(self, key: str) -> int:
+        """Bytes a stored blob takes on disk."""
+        return os.path.getsize(self._path(key))
+
+
+__all__ = [
+    "FileBlobStore",
+    "blob_hash",
+    "compress",
+    "decompress",
+    "pack_results",
+    "unpack_results"
+]
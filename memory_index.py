@@ -0,0 +1,450 @@
+"""
+Memory Index
+Local indexes over the memory bank: ranked full-text search of research
+sessions, similarity lookup of research topics and running statistics.
+"""
+
+import heapq
+import math
+import re
+import unicodedata
+import zlib
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+_TOKEN = re.compile(r"\w+")
+
+# Words that don't change what a topic is about
+_STOPWORDS = frozenset(
+    "a about an and as at by for from in into of on or over the to towards under vs versus with".split()
+)
+
+# Relevance weight of a match in each indexed field
+FIELD_WEIGHTS = {"topic": 4.0, "summary": 2.0, "report": 1.0}
+
+TimeBound = Union[str, date, datetime, None]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens of a text."""
+    return _TOKEN.findall((text or "").casefold())
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Canonical form of a research topic.
+
+    Unicode forms, case, surrounding punctuation and whitespace differences
+    are ignored, so "Impact of AI on education" and "impact of AI on
+    Education " are the same topic.
+    """
+    text = unicodedata.normalize("NFKC", topic or "").casefold()
+    return " ".join(text.split()).strip(" .,;:!?\"'")
+
+
+def content_words(topic: str) -> frozenset:
+    """
+    Words that determine what a topic is about.
+
+    Stopwords are dropped and a plural "s" is stripped, so "impact of AI on
+    education systems" and "AI education system impact" have the same words.
+    """
+    return frozenset(
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in tokenize(normalize_topic(topic))
+        if word not in _STOPWORDS
+    )
+
+
+def timestamp_bound(value: TimeBound) -> Optional[str]:
+    """ISO form of a date-range bound, comparable with stored timestamps."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def fts_query(query: str = "", phrase: str = None) -> Optional[str]:
+    """
+    SQLite FTS5 MATCH expression for a keyword query and an exact phrase.
+
+    Every keyword must match the start of a word (so "educ" finds
+    "education"), and the phrase must appear verbatim.
+
+    Returns:
+        The expression, or None if there is nothing to match
+    """
+    parts = [f'"{token}"*' for token in tokenize(query)]
+    phrase_tokens = tokenize(phrase)
+    if phrase_tokens:
+        parts.append('"' + " ".join(phrase_tokens) + '"')
+    return " AND ".join(parts) or None
+
+
+def make_snippet(fields: Sequence[str], terms: Sequence[str], width: int = 160) -> str:
+    """
+    Excerpt around the first query term found in the given fields.
+
+    Matched words are wrapped in [brackets]; without a match the start of
+    the first non-empty field is returned.
+    """
+    for text in fields:
+        if not text:
+            continue
+        folded = text.casefold()
+        positions = [m.start() for term in terms for m in [re.search(rf"\b{re.escape(term)}", folded)] if m]
+        if not positions:
+            continue
+        start = max(0, min(positions) - width // 3)
+        excerpt = text[start:start + width]
+        for term in terms:
+            excerpt = re.sub(rf"\b({re.escape(term)}\w*)", r"[\1]", excerpt, flags=re.IGNORECASE)
+        return ("..." if start else "") + excerpt + ("..." if start + width < len(text) else "")
+    first = next((t for t in fields if t), "")
+    return first[:width] + ("..." if len(first) > width else "")
+
+
+class InvertedIndex:
+    """
+    In-process positional inverted index of research sessions.
+
+    Each document (one research session) is indexed over its topic, summary
+    and report fields and kept up to date as sessions are stored. Queries
+    match keyword prefixes and exact phrases, filter by timestamp, and rank
+    with BM25 over field-weighted term frequencies.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize the index.
+
+        Args:
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        # token -> doc id -> [(field, position)]
+        self._postings: Dict[str, Dict[int, List[Tuple[str, int]]]] = defaultdict(dict)
+        self._vocabulary: List[str] = []
+        self._docs: Dict[int, Dict] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: int, timestamp: str, fields: Dict[str, str]):
+        """
+        Index a document, replacing what was indexed under the same id.
+
+        Args:
+            doc_id: Document id
+            timestamp: ISO timestamp used by date-range filters
+            fields: Text per field name in FIELD_WEIGHTS
+        """
+        self.remove(doc_id)
+        tokens = set()
+        length = 0
+        for field, text in fields.items():
+            for position, token in enumerate(tokenize(text)):
+                postings = self._postings.get(token)
+                if postings is None:
+                    insort(self._vocabulary, token)
+                    postings = self._postings[token]
+                postings.setdefault(doc_id, []).append((field, position))
+                tokens.add(token)
+                length += 1
+        self._docs[doc_id] = {"timestamp": timestamp or "", "tokens": tokens, "length": length}
+        self._total_length += length
+
+    def remove(self, doc_id: int):
+        """Drop a document from the index."""
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self._total_length -= doc["length"]
+        for token in doc["tokens"]:
+            postings = self._postings[token]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary.pop(bisect_left(self._vocabulary, token))
+
+    def clear(self):
+        """Drop every document."""
+        self._postings.clear()
+        self._vocabulary = []
+        self._docs.clear()
+        self._total_length = 0
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Indexed tokens starting with ``prefix``."""
+        start = bisect_left(self._vocabulary, prefix)
+        end = start
+        while end < len(self._vocabulary) and self._vocabulary[end].startswith(prefix):
+            end += 1
+        return self._vocabulary[start:end]
+
+    def _has_phrase(self, doc_id: int, phrase: List[str]) -> bool:
+        """Whether the phrase tokens appear consecutively in one field."""
+        starts = set(self._postings[phrase[0]][doc_id])
+        for offset, token in enumerate(phrase[1:], 1):
+            following = {(f, p - offset) for f, p in self._postings[token][doc_id]}
+            starts &= following
+            if not starts:
+                return False
+        return bool(starts)
+
+    def search(
+        self,
+        query: str = "",
+        phrase: str = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        limit: int = 20
+    ) -> List[Tuple[int, float]]:
+        """
+        Find documents matching every keyword prefix and the phrase.
+
+        Args:
+            query: Keywords, each matching the start of a word
+            phrase: Exact phrase that must appear
+            since: Earliest timestamp (inclusive)
+            until: Latest timestamp (exclusive)
+            limit: Maximum results
+
+        Returns:
+            (doc id, score) pairs, best first; without keywords or phrase,
+            the most recent documents in the date range with score 0
+        """
+        since, until = timestamp_bound(since), timestamp_bound(until)
+
+        def in_range(doc_id: int) -> bool:
+            timestamp = self._docs[doc_id]["timestamp"]
+            return (since is None or timestamp >= since) and (until is None or timestamp < until)
+
+        phrase_tokens = tokenize(phrase)
+        # Each keyword becomes the set of indexed tokens it is a prefix of
+        groups = [self._expand(term) for term in tokenize(query)]
+        groups += [[token] if token in self._postings else [] for token in phrase_tokens]
+        if not groups:
+            recent = sorted((d for d in self._docs if in_range(d)), reverse=True)
+            return [(d, 0.0) for d in recent[:limit]]
+        if not all(groups):
+            return []
+
+        group_docs = []
+        for group in groups:
+            docs = set()
+            for token in group:
+                docs.update(self._postings[token])
+            group_docs.append(docs)
+
+        candidates = set.intersection(*sorted(group_docs, key=len))
+
+        total = len(self._docs)
+        average_length = self._total_length / total if total else 0.0
+        scored = []
+        for doc_id in candidates:
+            if not in_range(doc_id):
+                continue
+            if phrase_tokens and not self._has_phrase(doc_id, phrase_tokens):
+                continue
+            length_norm = 1 - self.b + self.b * self._docs[doc_id]["length"] / (average_length or 1)
+            score = 0.0
+            for group, docs in zip(groups, group_docs):
+                frequency = len(docs)
+                idf = math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+                weighted_tf = sum(
+                    FIELD_WEIGHTS.get(field, 1.0)
+                    for token in group
+                    for field, _ in self._postings[token].get(doc_id, ())
+                )
+                score += idf * weighted_tf * (self.k1 + 1) / (weighted_tf + self.k1 * length_norm)
+            scored.append((doc_id, score))
+        return heapq.nlargest(limit, scored, key=lambda item: (item[1], item[0]))
+
+
+class TopicIndex:
+    """
+    Local vector index of research topics for similarity lookup.
+
+    Each normalized topic becomes a sparse, L2-normalized vector of hashed
+    character n-grams and words; the closest stored topic is found by cosine
+    similarity, scoring only the topics that share a feature with the query.
+    Character n-grams score different words with shared stems highly
+    ("aquaculture" / "agriculture"), so a candidate only matches when it has
+    the same content words (see content_words()). Each normalized topic maps
+    to the last raw topic stored under it.
+    """
+
+    def __init__(self, ngram: int = 3, dimensions: int = 1 << 20):
+        """
+        Initialize the index.
+
+        Args:
+            ngram: Characters per n-gram
+            dimensions: Size of the hashed feature space
+        """
+        self.ngram = ngram
+        self.dimensions = dimensions
+        self._vectors: Dict[str, Dict[int, float]] = {}
+        self._topics: Dict[str, str] = {}
+        self._words: Dict[str, frozenset] = {}
+        self._postings: Dict[int, set] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def vector(self, topic: str) -> Dict[int, float]:
+        """Hashed n-gram vector of a topic's normalized form."""
+        text = normalize_topic(topic)
+        padded = f" {text} "
+        features = [padded[i:i + self.ngram] for i in range(max(1, len(padded) - self.ngram + 1))]
+        features += [f"w:{word}" for word in tokenize(text)]
+
+        counts: Dict[int, float] = defaultdict(float)
+        for feature in features:
+            counts[zlib.crc32(feature.encode("utf-8")) % self.dimensions] += 1.0
+        weights = {f: 1.0 + math.log(c) for f, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {f: w / norm for f, w in weights.items()}
+
+    def add(self, topic: str):
+        """Index a topic."""
+        key = normalize_topic(topic)
+        if key not in self._vectors:
+            vector = self.vector(key)
+            self._vectors[key] = vector
+            self._words[key] = content_words(key)
+            for feature in vector:
+                self._postings[feature].add(key)
+        self._topics[key] = topic
+
+    def clear(self):
+        """Drop every topic."""
+        self._vectors.clear()
+        self._topics.clear()
+        self._words.clear()
+        self._postings.clear()
+
+    def lookup(self, topic: str) -> Optional[str]:
+        """Stored raw topic with the same normalized form, None if there is none."""
+        return self._topics.get(normalize_topic(topic))
+
+    def best_match(self, topic: str, threshold: float = 0.0) -> Optional[Tuple[str, float]]:
+        """
+        Closest stored topic with the same content words.
+
+        Args:
+            topic: Topic to look up
+            threshold: Lowest cosine similarity accepted (0-1)
+
+        Returns:
+            (stored raw topic, similarity), or None if nothing reaches the threshold
+        """
+        key = normalize_topic(topic)
+        if key in self._topics:
+            return self._topics[key], 1.0
+
+        scores: Dict[str, float] = defaultdict(float)
+        for feature, weight in self.vector(key).items():
+            for candidate in self._postings.get(feature, ()):
+                scores[candidate] += weight * self._vectors[candidate][feature]
+        words = content_words(key)
+        for candidate, score in sorted(scores.items(), key=lambda item: item[1], reverse=True):
+            if score < threshold:
+                return None
+            if self._words[candidate] == words:
+                return self._topics[candidate], min(1.0, score)
+        return None
+
+
+class ResearchCounters:
+    """
+    Running research statistics, updated in constant time per session.
+
+    Keeps the total session count, the session count per topic, topics
+    bucketed by their count (with the distinct counts kept sorted, so the
+    most researched topics are read off the top buckets) and session counts
+    per day.
+    """
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.total = 0
+        self._counts: Dict[str, int] = {}
+        # research count -> topics with that count, in the order they reached it
+        self._buckets: Dict[int, Dict[str, None]] = defaultdict(dict)
+        self._levels: List[int] = []
+        self._daily: Counter = Counter()
+
+    def _move(self, topic: str, old: int, new: int):
+        """Move a topic from the ``old`` count bucket to the ``new`` one."""
+        if old:
+            bucket = self._buckets[old]
+            bucket.pop(topic, None)
+            if not bucket:
+                del self._buckets[old]
+                self._levels.pop(bisect_left(self._levels, old))
+        if new:
+            if new not in self._buckets:
+                insort(self._levels, new)
+            self._buckets[new][topic] = None
+            self._counts[topic] = new
+        else:
+            self._counts.pop(topic, None)
+
+    def set_topic(self, topic: str, count: int):
+        """Set a topic's research count without counting a session."""
+        self._move(topic, self._counts.get(topic, 0), count)
+
+    def add_day(self, timestamp: str, sessions: int = 1):
+        """Count sessions on a day without attributing them to a topic."""
+        self.total += sessions
+        self._daily[(timestamp or "")[:10]] += sessions
+
+    def clear(self):
+        """Reset every counter."""
+        self.__init__()
+
+    @property
+    def unique_topics(self) -> int:
+        return len(self._counts)
+
+    def top(self, k: int = 5) -> List[Tuple[str, int]]:
+        """The ``k`` most researched topics with their counts, most first."""
+        result = []
+        for level in reversed(self._levels):
+            for topic in self._buckets[level]:
+                result.append((topic, level))
+                if len(result) >= k:
+                    return result
+        return result
+
+    def sessions_on(self, day: str) -> int:
+        """Session count of one day ("YYYY-MM-DD")."""
+        return self._daily.get(day, 0)
+
+    def daily(self, days: int = None) -> Dict[str, int]:
+        """Session counts per day ("YYYY-MM-DD"), oldest first, optionally only the last ``days``."""
+        keys = sorted(k for k in self._daily if k)
+        if days:
+            keys = keys[-days:]
+        return {k: self._daily[k] for k in keys}
+
+
+__all__ = [
+    "InvertedIndex",
+    "ResearchCounters",
+    "TopicIndex",
+    "content_words",
+    "fts_query",
+    "make_snippet",
+    "normalize_topic",
+    "timestamp_bound",
+    "tokenize"
+]
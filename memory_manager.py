@@ -5,45 +5,247 @@ Implements session management and memory bank for context persistence.
 
 import json
 import os
-from datetime import datetime
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
 
+from config.agent_config import AgentConfig
+from memory_blobs import compress, decompress
+from memory_index import ResearchCounters, TopicIndex
+from memory_storage import MemoryStorage, create_memory_storage, empty_memory, migrate_json_memory
+
 
 class MemoryBank:
     """
     Long-term memory storage for research context and findings.
     
-    Stores and retrieves research history across sessions.
+    Stores and retrieves research history across sessions. Storage is
+    pluggable (SQLite or an append-only JSONL log, see memory_storage), so
+    each store is a single write however large the bank has grown.
+    History and topic records are loaded up front; full results are read
+    from storage only when retrieved, through a bounded LRU cache.
+    
+    Several processes can share one bank: storage serializes their writes,
+    and each read first picks up what other processes stored since.
+    
+    History is bounded by count, age and bytes of stored results (see
+    AgentConfig.MAX_HISTORY_ITEMS); sessions beyond the limits still count
+    in the statistics. Retention and storage compaction run in a background
+    thread, so neither stores nor reads wait for them.
     """
     
-    def __init__(self, storage_path: str = "memory_bank.json"):
+    def __init__(
+        self,
+        storage_path: str = "memory_bank.json",
+        backend: str = None,
+        storage: MemoryStorage = None,
+        results_cache_size: int = None,
+        maintenance_interval: float = None
+    ):
         """
         Initialize the Memory Bank.
         
         Args:
-            storage_path: Path to the memory storage file
+            storage_path: Path to the memory storage file; an existing
+                whole-file JSON bank at this path is migrated automatically
+            backend: "sqlite" or "jsonl", defaults to AgentConfig.MEMORY_BACKEND
+            storage: Storage backend to use instead of creating one
+            results_cache_size: Topics whose results are kept in memory,
+                defaults to AgentConfig.MEMORY_RESULTS_CACHE_SIZE
+            maintenance_interval: Seconds between background retention and
+                compaction runs, 0 to run them after each store; defaults to
+                AgentConfig.MEMORY_MAINTENANCE_INTERVAL_SECONDS
         """
         self.storage_path = storage_path
-        self.memory = self._load_memory()
+        self.results_cache_size = (
+            AgentConfig.MEMORY_RESULTS_CACHE_SIZE if results_cache_size is None else results_cache_size
+        )
+        self._results_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._results_lock = threading.Lock()
+        self._lock = threading.RLock()
+        self.max_history_items = AgentConfig.MAX_HISTORY_ITEMS
+        self.max_age_days = AgentConfig.MEMORY_MAX_AGE_DAYS
+        self.max_results_bytes = AgentConfig.MEMORY_MAX_RESULTS_BYTES
+        self.metrics: Dict[str, Any] = {
+            "load_seconds": 0.0,
+            "entries_removed": 0,
+            "topics_tombstoned": 0,
+            "last_retention": None,
+            "compactions": 0,
+            "last_compaction": None
+        }
+        self.storage = storage or create_memory_storage(storage_path, backend)
+        try:
+            if migrate_json_memory(storage_path, self.storage):
+                print(f" Migrated memory bank '{storage_path}' to {type(self.storage).__name__}")
+        except Exception as e:
+            print(f"Warning: Could not migrate memory bank: {e}")
+        # Similarity index of stored topics, most recently researched last
+        self.topic_index = TopicIndex()
+        # Statistics are maintained as sessions are stored, not recomputed
+        self.counters = ResearchCounters()
+        self._reload()
+        
+        self.maintenance_interval = (
+            AgentConfig.MEMORY_MAINTENANCE_INTERVAL_SECONDS if maintenance_interval is None else maintenance_interval
+        )
+        self._maintenance_lock = threading.Lock()
+        self._stop_maintenance = threading.Event()
+        if self.maintenance_interval > 0:
+            threading.Thread(target=self._maintenance_loop, name="memory-maintenance", daemon=True).start()
     
     def _load_memory(self) -> Dict[str, Any]:
-        """Load memory from storage file."""
-        if os.path.exists(self.storage_path):
+        """Load memory from storage."""
+        try:
+            return self.storage.load()
+        except Exception as e:
+            print(f"Warning: Could not load memory bank: {e}")
+            return empty_memory()
+    
+    def _reload(self):
+        """Rebuild the in-memory view, indexes and counters from storage."""
+        with self._lock:
+            started = time.perf_counter()
+            self.memory = self._load_memory()
+            self.metrics["load_seconds"] = round(time.perf_counter() - started, 4)
+            self.topic_index.clear()
+            for topic, record in sorted(
+                self.memory["topics"].items(), key=lambda item: item[1].get("last_researched", "")
+            ):
+                if not record.get("tombstone"):
+                    self.topic_index.add(topic)
+            self.counters.clear()
+            # Sessions removed by retention still count, by day
+            for day, sessions in self.memory.get("pruned_sessions", {}).items():
+                self.counters.add_day(day, sessions)
+            for entry in self.memory["research_history"]:
+                self.counters.add_day(entry.get("timestamp", ""))
+            for topic, record in self.memory["topics"].items():
+                self.counters.set_topic(topic, record.get("research_count", 0))
+        with self._results_lock:
+            self._results_cache.clear()
+    
+    def _apply(self, changes: Dict[str, Any]):
+        """Apply stored history entries and topic records to the in-memory view."""
+        with self._lock:
+            for entry in changes.get("history", []):
+                self.memory["research_history"].append(entry)
+                self.counters.add_day(entry.get("timestamp", ""))
+            for topic, record in changes.get("topics", {}).items():
+                self.memory["topics"][topic] = record
+                if not record.get("tombstone"):
+                    self.topic_index.add(topic)
+                self.counters.set_topic(topic, record.get("research_count", 0))
+        with self._results_lock:
+            for topic in changes.get("topics", {}):
+                self._results_cache.pop(topic, None)
+    
+    def _refresh(self):
+        """Pick up what was stored (by any process) since the last refresh."""
+        with self._lock:
             try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                changes = self.storage.refresh()
             except Exception as e:
-                print(f"Warning: Could not load memory bank: {e}")
-                return {"research_history": [], "topics": {}}
-        return {"research_history": [], "topics": {}}
+                print(f"Warning: Could not refresh memory bank: {e}")
+                return
+            if changes is None:
+                return
+            if changes.get("reset"):
+                self._reload()
+            else:
+                self._apply(changes)
     
-    def _save_memory(self):
-        """Save memory to storage file."""
+    def _cache_results(self, topic: str, results: Dict[str, Any]):
+        """Keep a topic's results in the LRU cache, evicting the oldest."""
+        with self._results_lock:
+            self._results_cache[topic] = results
+            self._results_cache.move_to_end(topic)
+            while len(self._results_cache) > self.results_cache_size:
+                self._results_cache.popitem(last=False)
+    
+    def _get_results(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Results of a stored topic, from the cache or read from storage."""
+        with self._results_lock:
+            if topic in self._results_cache:
+                self._results_cache.move_to_end(topic)
+                return self._results_cache[topic]
         try:
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(self.memory, f, indent=2, ensure_ascii=False)
+            results = self.storage.load_results(topic)
         except Exception as e:
-            print(f"Warning: Could not save memory bank: {e}")
+            print(f"Warning: Could not load research results: {e}")
+            return None
+        if results is not None:
+            self._cache_results(topic, results)
+        return results
+    
+    def _needs_retention(self) -> bool:
+        """
+        Whether stored history or results exceed a retention limit.
+        
+        Count and byte limits are allowed 10% slack, so retention (which
+        rewrites a JSONL log) runs once per batch of stores rather than
+        after every one.
+        """
+        with self._lock:
+            history = self.memory["research_history"]
+            if self.max_history_items and len(history) > self.max_history_items * 1.1:
+                return True
+            if self.max_age_days and history:
+                cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+                if history[0].get("timestamp", "") < cutoff or any(
+                    record.get("last_researched", "") < cutoff
+                    for record in self.memory["topics"].values() if not record.get("tombstone")
+                ):
+                    return True
+        return (
+            bool(self.max_results_bytes)
+            and self.storage.blob_stats()["stored_bytes"] > self.max_results_bytes * 1.1
+        )
+    
+    def maintain(self) -> Dict[str, Any]:
+        """
+        Apply the retention limits and compact storage, where needed.
+        
+        Runs in the background thread (or after each store); storage keeps
+        serving reads meanwhile.
+        
+        Returns:
+            Dictionary with "entries_removed", "topics_tombstoned" and "compacted"
+        """
+        done = {"entries_removed": 0, "topics_tombstoned": 0, "compacted": False}
+        with self._maintenance_lock:
+            self._refresh()
+            if self._needs_retention():
+                done.update(self.storage.apply_retention(
+                    self.max_history_items, self.max_age_days, self.max_results_bytes
+                ))
+                self.metrics["entries_removed"] += done["entries_removed"]
+                self.metrics["topics_tombstoned"] += done["topics_tombstoned"]
+                self.metrics["last_retention"] = datetime.now().isoformat()
+                self._refresh()
+            if self.storage.needs_compaction():
+                self.storage.compact()
+                done["compacted"] = True
+                self.metrics["compactions"] += 1
+                self.metrics["last_compaction"] = datetime.now().isoformat()
+        return done
+    
+    def _maintenance_loop(self):
+        """Run maintain() until close(), starting right away."""
+        while True:
+            try:
+                self.maintain()
+            except Exception as e:
+                print(f"Warning: Memory bank maintenance failed: {e}")
+            if self._stop_maintenance.wait(self.maintenance_interval):
+                return
+    
+    def close(self):
+        """Stop the background maintenance thread."""
+        self._stop_maintenance.set()
     
     def store_research(self, topic: str, results: Dict[str, Any]):
         """
@@ -60,33 +262,84 @@ class MemoryBank:
             "has_validation": "validation" in results,
             "has_report": "report" in results
         }
-        
-        # Add to research history
-        self.memory["research_history"].append(entry)
-        
-        # Store detailed results by topic
-        self.memory["topics"][topic] = {
+        record = {
             "last_researched": datetime.now().isoformat(),
-            "results": results,
             "research_count": self.memory["topics"].get(topic, {}).get("research_count", 0) + 1
         }
         
-        self._save_memory()
+        try:
+            # The view is updated from storage, which counts sessions other
+            # processes stored meanwhile
+            self.storage.append_research(entry, topic, record, results)
+            self._refresh()
+        except Exception as e:
+            print(f"Warning: Could not save memory bank: {e}")
+            self._apply({"history": [entry], "topics": {topic: record}})
+        self._cache_results(topic, results)
+        if self.maintenance_interval <= 0:
+            try:
+                self.maintain()
+            except Exception as e:
+                print(f"Warning: Memory bank maintenance failed: {e}")
         print(f" Stored research on '{topic}' in memory bank")
     
     def retrieve_research(self, topic: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve previous research on a topic.
         
+        Topics are compared in normalized form, so case and whitespace
+        differences still find the stored research.
+        
         Args:
             topic: Topic to retrieve
             
         Returns:
             Previous research results or None
         """
+        self._refresh()
         if topic in self.memory["topics"]:
-            return self.memory["topics"][topic]["results"]
-        return None
+            return self._get_results(topic)
+        stored = self.topic_index.lookup(topic)
+        return self._get_results(stored) if stored in self.memory["topics"] else None
+    
+    def suggest_similar_topic(self, topic: str, threshold: float = None) -> Optional[Dict[str, Any]]:
+        """
+        Suggest a stored topic that may be a rewording of a topic.
+        
+        Only a suggestion: the match is not the same topic unless its score
+        is 1.0, so callers confirm it (e.g. ask the user) before retrieving
+        its research with retrieve_research(match["topic"]).
+        
+        Args:
+            topic: Topic to look up
+            threshold: Lowest similarity accepted (0-1), defaults to
+                AgentConfig.TOPIC_MATCH_THRESHOLD
+            
+        Returns:
+            Dictionary with the matched "topic", similarity "score",
+            "last_researched" and "age_days", or None
+        """
+        if threshold is None:
+            threshold = AgentConfig.TOPIC_MATCH_THRESHOLD
+        self._refresh()
+        match = self.topic_index.best_match(topic, threshold)
+        if match is None or match[0] not in self.memory["topics"]:
+            return None
+        
+        matched_topic, score = match
+        record = self.memory["topics"][matched_topic]
+        age_days = None
+        try:
+            age = datetime.now() - datetime.fromisoformat(record["last_researched"])
+            age_days = round(age.total_seconds() / 86400, 2)
+        except (KeyError, TypeError, ValueError):
+            pass
+        return {
+            "topic": matched_topic,
+            "score": round(score, 3),
+            "last_researched": record.get("last_researched"),
+            "age_days": age_days
+        }
     
     def get_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -98,18 +351,40 @@ class MemoryBank:
         Returns:
             List of recent research entries
         """
+        self._refresh()
         return self.memory["research_history"][-limit:]
     
-    def search_memory(self, keyword: str) -> List[Dict[str, Any]]:
+    def search_memory(
+        self,
+        keyword: str = "",
+        phrase: str = None,
+        since: Any = None,
+        until: Any = None,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
         """
-        Search memory for topics containing keyword.
+        Search memory for research sessions matching keywords.
+        
+        Topics, summaries and the latest report of each topic are searched
+        through the storage's full-text index; every keyword must match the
+        start of a word.
         
         Args:
-            keyword: Keyword to search for
+            keyword: Keywords to search for
+            phrase: Exact phrase that must appear
+            since: Earliest session timestamp (inclusive), ISO string or datetime
+            until: Latest session timestamp (exclusive), ISO string or datetime
+            limit: Maximum number of entries to return
             
         Returns:
-            List of matching entries
+            List of matching entries, best first, each with "score" and "snippet"
         """
+        self._refresh()
+        try:
+            return self.storage.search(keyword, phrase=phrase, since=since, until=until, limit=limit)
+        except Exception as e:
+            print(f"Warning: Memory search index unavailable, scanning topics: {e}")
+        
         keyword_lower = keyword.lower()
         matches = []
         
@@ -117,24 +392,90 @@ class MemoryBank:
             if keyword_lower in entry["topic"].lower():
                 matches.append(entry)
         
-        return matches
+        return matches[:limit]
     
-    def get_statistics(self) -> Dict[str, Any]:
-        """Get memory bank statistics."""
+    def get_statistics(self, top_k: int = 5) -> Dict[str, Any]:
+        """
+        Get memory bank statistics.
+        
+        Args:
+            top_k: Number of most researched topics to list
+            
+        Returns:
+            Dictionary with "total_research_sessions", "unique_topics",
+            "most_researched", "top_topics" ([{"topic", "research_count"}])
+            and "sessions_today"
+        """
+        self._refresh()
+        top = self.counters.top(max(1, top_k))
         return {
-            "total_research_sessions": len(self.memory["research_history"]),
-            "unique_topics": len(self.memory["topics"]),
-            "most_researched": max(
-                self.memory["topics"].items(),
-                key=lambda x: x[1]["research_count"],
-                default=(None, {"research_count": 0})
-            )[0] if self.memory["topics"] else None
+            "total_research_sessions": self.counters.total,
+            "unique_topics": self.counters.unique_topics,
+            "most_researched": top[0][0] if top else None,
+            "top_topics": [{"topic": t, "research_count": c} for t, c in top[:top_k]],
+            "sessions_today": self.counters.sessions_on(datetime.now().date().isoformat())
         }
     
+    def get_daily_counts(self, days: int = 30) -> Dict[str, int]:
+        """
+        Get research sessions per day.
+        
+        Args:
+            days: Number of most recent days with sessions to return
+            
+        Returns:
+            Session count by date ("YYYY-MM-DD"), oldest first
+        """
+        self._refresh()
+        return self.counters.daily(days)
+    
+    def get_storage_metrics(self) -> Dict[str, Any]:
+        """
+        Get storage size and maintenance metrics.
+        
+        Returns:
+            Dictionary with "backend", "load_seconds" (last full load),
+            "storage_bytes", "history_items", "topics", "tombstones",
+            "pruned_sessions", "entries_removed" and "topics_tombstoned"
+            (by this process's retention runs), "last_retention",
+            "compactions" and "last_compaction"
+        """
+        self._refresh()
+        try:
+            storage_bytes = self.storage.disk_bytes()
+        except Exception as e:
+            print(f"Warning: Could not measure memory bank storage: {e}")
+            storage_bytes = None
+        with self._lock:
+            topics = self.memory["topics"]
+            return {
+                "backend": type(self.storage).__name__,
+                "load_seconds": self.metrics["load_seconds"],
+                "storage_bytes": storage_bytes,
+                "history_items": len(self.memory["research_history"]),
+                "topics": len(topics),
+                "tombstones": sum(1 for record in topics.values() if record.get("tombstone")),
+                "pruned_sessions": sum(self.memory.get("pruned_sessions", {}).values()),
+                "entries_removed": self.metrics["entries_removed"],
+                "topics_tombstoned": self.metrics["topics_tombstoned"],
+                "last_retention": self.metrics["last_retention"],
+                "compactions": self.metrics["compactions"],
+                "last_compaction": self.metrics["last_compaction"]
+            }
+    
     def clear_memory(self):
         """Clear all memory."""
-        self.memory = {"research_history": [], "topics": {}}
-        self._save_memory()
+        try:
+            self.storage.clear()
+            self._reload()
+        except Exception as e:
+            print(f"Warning: Could not clear memory bank: {e}")
+            with self._lock:
+                self.memory = empty_memory()
+                self.topic_index.clear()
+                self.counters.clear()
+            with self._results_lock:
+                self._results_cache.clear()
         print("️ Memory bank cleared")
 
 
@@ -143,12 +484,117 @@ class InMemorySessionService:
     Session service for managing research sessions.
     
     Maintains state within a single session and coordinates with Memory Bank.
+    Sessions idle for longer than the timeout are evicted, and each keeps
+    only its most recent history entries, so memory use stays bounded in a
+    long-running process. Ended and evicted sessions can be spilled to disk
+    as compressed JSON and are loaded back when asked for.
     """
     
-    def __init__(self):
-        """Initialize the session service."""
+    def __init__(
+        self,
+        timeout_minutes: float = None,
+        max_history: int = None,
+        spill_dir: str = None
+    ):
+        """
+        Initialize the session service.
+        
+        Args:
+            timeout_minutes: Idle minutes after which a session is evicted,
+                0 to keep sessions; defaults to AgentConfig.SESSION_TIMEOUT_MINUTES
+            max_history: History entries kept per session, defaults to
+                AgentConfig.SESSION_MAX_HISTORY
+            spill_dir: Directory ended sessions are written to, "" to drop
+                them on eviction; defaults to AgentConfig.SESSION_SPILL_DIR
+        """
         self.sessions = {}
         self.current_session_id = None
+        self.timeout_seconds = 60 * (
+            AgentConfig.SESSION_TIMEOUT_MINUTES if timeout_minutes is None else timeout_minutes
+        )
+        self.max_history = AgentConfig.SESSION_MAX_HISTORY if max_history is None else max_history
+        self.spill_dir = AgentConfig.SESSION_SPILL_DIR if spill_dir is None else spill_dir
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+        # Session IDs by last activity (monotonic seconds), least recent first
+        self._last_active: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def _touch(self, session_id: str):
+        """Mark a session as active now."""
+        self._last_active[session_id] = time.monotonic()
+        self._last_active.move_to_end(session_id)
+    
+    def _spill_path(self, session_id: str) -> str:
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)
+        return os.path.join(self.spill_dir, f"{name}.json.z")
+    
+    def _spill(self, session: Dict[str, Any]):
+        """Write a session to the spill directory."""
+        data = json.dumps(
+            {**session, "history": list(session["history"])}, ensure_ascii=False, default=str
+        ).encode("utf-8")
+        path = self._spill_path(session["id"])
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(compress(data))
+        os.replace(temp_path, path)
+    
+    def _unspill(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Load a spilled session back into memory, None if there is none."""
+        if not self.spill_dir:
+            return None
+        try:
+            with open(self._spill_path(session_id), "rb") as f:
+                session = json.loads(decompress(f.read()))
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Warning: Could not load spilled session: {e}")
+            return None
+        if session.get("id") != session_id:
+            return None
+        session["history"] = deque(session.get("history", []), maxlen=self.max_history or None)
+        self.sessions[session_id] = session
+        self._touch(session_id)
+        return session
+    
+    def _evict(self, session_id: str):
+        """Drop a session from memory, spilling it to disk if enabled."""
+        session = self.sessions.pop(session_id, None)
+        self._last_active.pop(session_id, None)
+        if session_id == self.current_session_id:
+            self.current_session_id = None
+        if session is None or not self.spill_dir:
+            return
+        session.setdefault("ended_at", datetime.now().isoformat())
+        try:
+            self._spill(session)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not spill session {session_id}: {e}")
+    
+    def _evict_expired(self):
+        """Evict sessions idle for longer than the timeout."""
+        if not self.timeout_seconds:
+            return
+        deadline = time.monotonic() - self.timeout_seconds
+        while self._last_active:
+            session_id, last_active = next(iter(self._last_active.items()))
+            if last_active > deadline:
+                break
+            self._evict(session_id)
+    
+    def _lookup(self, session_id: str = None) -> Optional[Dict[str, Any]]:
+        """Session by ID (current if None), loaded back from disk if spilled."""
+        self._evict_expired()
+        if session_id is None:
+            session_id = self.current_session_id
+        if not session_id:
+            return None
+        session = self.sessions.get(session_id)
+        if session is None:
+            return self._unspill(session_id)
+        self._touch(session_id)
+        return session
     
     def create_session(self, session_id: str = None) -> str:
         """
@@ -163,14 +609,16 @@ class InMemorySessionService:
         if session_id is None:
             session_id = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        self.sessions[session_id] = {
-            "id": session_id,
-            "created_at": datetime.now().isoformat(),
-            "state": {},
-            "history": []
-        }
-        
-        self.current_session_id = session_id
+        with self._lock:
+            self._evict_expired()
+            self.sessions[session_id] = {
+                "id": session_id,
+                "created_at": datetime.now().isoformat(),
+                "state": {},
+                "history": deque(maxlen=self.max_history or None)
+            }
+            self._touch(session_id)
+            self.current_session_id = session_id
         print(f" Created session: {session_id}")
         return session_id
     
@@ -182,12 +630,13 @@ class InMemorySessionService:
             session_id: Session ID, uses current if not provided
             
         Returns:
-            Session data or None
+            Copy of the session data (history as a list) or None
         """
-        if session_id is None:
-            session_id = self.current_session_id
-        
-        return self.sessions.get(session_id)
+        with self._lock:
+            session = self._lookup(session_id)
+            if session is None:
+                return None
+            return {**session, "history": list(session["history"])}
     
     def update_session_state(self, key: str, value: Any, session_id: str = None):
         """
@@ -198,15 +647,14 @@ class InMemorySessionService:
             value: State value
             session_id: Session ID, uses current if not provided
         """
-        if session_id is None:
-            session_id = self.current_session_id
-        
-        if session_id and session_id in self.sessions:
-            self.sessions[session_id]["state"][key] = value
-            self.sessions[session_id]["history"].append({
-                "timestamp": datetime.now().isoformat(),
-                "action": f"Updated {key}"
-            })
+        with self._lock:
+            session = self._lookup(session_id)
+            if session is not None:
+                session["state"][key] = value
+                session["history"].append({
+                    "timestamp": datetime.now().isoformat(),
+                    "action": f"Updated {key}"
+                })
     
     def get_session_state(self, session_id: str = None) -> Dict[str, Any]:
         """
@@ -218,34 +666,37 @@ class InMemorySessionService:
         Returns:
             Session state dictionary
         """
-        if session_id is None:
-            session_id = self.current_session_id
-        
-        if session_id and session_id in self.sessions:
-            return self.sessions[session_id]["state"]
-        
-        return {}
+        with self._lock:
+            session = self._lookup(session_id)
+        return session["state"] if session is not None else {}
     
     def end_session(self, session_id: str = None):
         """
         End a session.
         
+        With a spill directory the session moves to disk right away;
+        otherwise it stays in memory until the idle timeout.
+        
         Args:
             session_id: Session ID, uses current if not provided
         """
-        if session_id is None:
-            session_id = self.current_session_id
-        
-        if session_id and session_id in self.sessions:
-            self.sessions[session_id]["ended_at"] = datetime.now().isoformat()
-            print(f" Ended session: {session_id}")
+        with self._lock:
+            session = self._lookup(session_id)
+            if session is None:
+                return
+            session["ended_at"] = datetime.now().isoformat()
+            print(f" Ended session: {session['id']}")
             
-            if session_id == self.current_session_id:
+            if session["id"] == self.current_session_id:
                 self.current_session_id = None
+            if self.spill_dir:
+                self._evict(session["id"])
     
     def list_sessions(self) -> List[str]:
-        """List all session IDs."""
-        return list(self.sessions.keys())
+        """List the IDs of the sessions held in memory (not evicted ones)."""
+        with self._lock:
+            self._evict_expired()
+            return list(self.sessions.keys())
     
     def get_session_history(self, session_id: str = None) -> List[Dict[str, Any]]:
         """
@@ -255,15 +706,11 @@ class InMemorySessionService:
             session_id: Session ID, uses current if not provided
             
         Returns:
-            List of history entries
+            List of the most recent history entries
         """
-        if session_id is None:
-            session_id = self.current_session_id
-        
-        if session_id and session_id in self.sessions:
-            return self.sessions[session_id]["history"]
-        
-        return []
+        with self._lock:
+            session = self._lookup(session_id)
+            return list(session["history"]) if session is not None else []
 
 
 class ResearchMemoryManager:
@@ -296,6 +743,17 @@ class ResearchMemoryManager:
         self.current_session = session_id
         return session_id
     
+    def _resolve_session(self) -> Optional[str]:
+        """
+        ID of the current session, recreated if it was evicted while idle.
+        
+        Returns:
+            Session ID, or None if no session was started
+        """
+        if self.current_session and self.session_service.get_session(self.current_session) is None:
+            self.session_service.create_session(self.current_session)
+        return self.current_session
+    
     def save_research_to_session(self, topic: str, results: Dict[str, Any]):
         """
         Save research results to current session and memory bank.
@@ -305,8 +763,9 @@ class ResearchMemoryManager:
             results: Research results
         """
         # Save to session
-        self.session_service.update_session_state("last_topic", topic)
-        self.session_service.update_session_state("last_results", results)
+        session_id = self._resolve_session()
+        self.session_service.update_session_state("last_topic", topic, session_id)
+        self.session_service.update_session_state("last_results", results, session_id)
         
         # Save to long-term memory
         self.memory_bank.store_research(topic, results)
@@ -316,13 +775,28 @@ class ResearchMemoryManager:
         Retrieve previous research from memory bank.
         
         Args:
-            topic: Topic to retrieve
+            topic: Topic to retrieve (compared in normalized form)
             
         Returns:
             Previous research or None
         """
         return self.memory_bank.retrieve_research(topic)
     
+    def suggest_similar_research(self, topic: str, threshold: float = None) -> Optional[Dict[str, Any]]:
+        """
+        Suggest earlier research on a topic that may be a rewording of this one.
+        
+        Args:
+            topic: Topic to look up
+            threshold: Lowest topic similarity accepted (0-1), defaults to
+                AgentConfig.TOPIC_MATCH_THRESHOLD
+            
+        Returns:
+            {"topic", "score", "last_researched", "age_days"} of the
+            suggested stored topic, or None
+        """
+        return self.memory_bank.suggest_similar_topic(topic, threshold)
+    
     def get_research_context(self) -> Dict[str, Any]:
         """
         Get current research context from session and memory.
@@ -330,7 +804,7 @@ class ResearchMemoryManager:
         Returns:
             Research context dictionary
         """
-        session_state = self.session_service.get_session_state()
+        session_state = self.session_service.get_session_state(self._resolve_session())
         history = self.memory_bank.get_history(limit=5)
         
         return {
@@ -0,0 +1,1340 @@
+"""
+Memory Storage
+Storage backends for the memory bank: SQLite (WAL) and an append-only JSONL log.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+from config.agent_config import AgentConfig
+from memory_blobs import FileBlobStore, compress, decompress, pack_results, unpack_results
+from memory_index import InvertedIndex, TimeBound, fts_query, make_snippet, timestamp_bound, tokenize
+
+
+def empty_memory() -> Dict[str, Any]:
+    """The memory bank contents of a new bank."""
+    return {"research_history": [], "topics": {}, "pruned_sessions": {}}
+
+
+def tombstone_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact record of a topic whose results were dropped by retention."""
+    return {
+        "last_researched": record.get("last_researched", ""),
+        "research_count": record.get("research_count", 0),
+        "tombstone": True
+    }
+
+
+def plan_retention(
+    history: List[Dict[str, Any]],
+    topics: Dict[str, Dict[str, Any]],
+    topic_blobs: Dict[str, List[str]],
+    blob_sizes: Dict[str, int],
+    max_items: int = None,
+    max_age_days: float = None,
+    max_bytes: int = None,
+    now: datetime = None
+) -> Tuple[List[int], Set[str]]:
+    """
+    Decide what the retention limits remove.
+
+    History entries beyond the newest ``max_items`` or older than
+    ``max_age_days`` are pruned. A topic none of whose sessions remain, or
+    last researched before the age limit, becomes a tombstone; then the
+    least recently researched topics become tombstones until their results
+    blobs fit ``max_bytes``. A falsy limit is not applied.
+
+    Args:
+        history: History entries, oldest first
+        topics: Topic records by topic
+        topic_blobs: Blob hashes each topic's results refer to
+        blob_sizes: Stored bytes of each blob (only needed with max_bytes)
+        max_items: Most history entries kept
+        max_age_days: Oldest history entry kept, in days
+        max_bytes: Most bytes of stored results kept
+        now: Current time, for the age limit
+
+    Returns:
+        Tuple of (indices of the history entries to prune, ascending;
+        topics to turn into tombstones)
+    """
+    cutoff = None
+    if max_age_days:
+        cutoff = ((now or datetime.now()) - timedelta(days=max_age_days)).isoformat()
+    first_kept = max(0, len(history) - max_items) if max_items else 0
+    pruned = [
+        i for i, entry in enumerate(history)
+        if i < first_kept or (cutoff and entry.get("timestamp", "") < cutoff)
+    ]
+
+    live = {topic for topic, record in topics.items() if not record.get("tombstone")}
+    tombstones = set()
+    if max_items or cutoff:
+        pruned_set = set(pruned)
+        kept = {e.get("topic") for i, e in enumerate(history) if i not in pruned_set}
+        for topic in live:
+            if topic not in kept or (cutoff and topics[topic].get("last_researched", "") < cutoff):
+                tombstones.add(topic)
+        live -= tombstones
+
+    if max_bytes:
+        refs = Counter(key for topic in live for key in set(topic_blobs.get(topic, ())))
+        total = sum(blob_sizes.get(key, 0) for key in refs)
+        for topic in sorted(live, key=lambda t: topics[t].get("last_researched", "")):
+            if total <= max_bytes:
+                break
+            tombstones.add(topic)
+            for key in set(topic_blobs.get(topic, ())):
+                refs[key] -= 1
+                if not refs[key]:
+                    total -= blob_sizes.get(key, 0)
+    return pruned, tombstones
+
+
+def report_text(results: Dict[str, Any]) -> str:
+    """Body of the report in stored research results, "" without one."""
+    report = (results or {}).get("report")
+    if isinstance(report, dict):
+        report = report.get("report")
+    return report if isinstance(report, str) else ""
+
+
+class MemoryStorage:
+    """
+    Interface of memory bank storage backends.
+
+    A backend persists research history entries, per-topic records and
+    each topic's latest results. Storing one research session is a single
+    write whose cost doesn't depend on how much is already stored. Results
+    are kept apart from the records and only read when asked for, so
+    loading a bank doesn't grow with the size of the stored results.
+    """
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the stored history and topic records, without their results.
+
+        Returns:
+            Dictionary with "research_history", "topics" and
+            "pruned_sessions" (sessions removed by retention, by day)
+        """
+        raise NotImplementedError
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """
+        Pick up what other processes stored since the last load() or refresh().
+
+        Cheap when nothing changed, so it can run before every read.
+
+        Returns:
+            None if nothing changed; {"reset": True} if the storage was
+            cleared or rewritten and must be loaded again; otherwise
+            {"history": new history entries, "topics": changed topic records}
+            (including what this process stored itself)
+        """
+        raise NotImplementedError
+
+    def load_results(self, topic: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the stored results of a topic.
+
+        Args:
+            topic: Research topic, as stored
+
+        Returns:
+            The results, or None if the topic has none
+        """
+        raise NotImplementedError
+
+    def append_research(
+        self,
+        entry: Dict[str, Any],
+        topic: str,
+        record: Dict[str, Any],
+        results: Dict[str, Any]
+    ):
+        """
+        Persist one research session.
+
+        The stored research count is incremented from what is on disk, so
+        concurrent writers don't lose each other's counts.
+
+        Args:
+            entry: Research history entry
+            topic: Research topic
+            record: Topic record replacing the stored one
+            results: Research results replacing the topic's stored results
+        """
+        raise NotImplementedError
+
+    def import_memory(self, memory: Dict[str, Any], only_if_empty: bool = False) -> bool:
+        """
+        Persist a whole memory dict at once (used for migration).
+
+        Args:
+            memory: Memory bank contents in the former JSON layout, with
+                each topic's "results" inside its record
+            only_if_empty: Import only if nothing is stored yet, checked
+                under the same lock or transaction as the import
+
+        Returns:
+            True if the memory was imported
+        """
+        raise NotImplementedError
+
+    def search(
+        self,
+        query: str = "",
+        phrase: str = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """
+        Ranked full-text search over topics, summaries and report bodies.
+
+        A topic's report is matched only on its latest session, since
+        earlier reports are no longer stored.
+
+        Args:
+            query: Keywords, each matching the start of a word
+            phrase: Exact phrase that must appear
+            since: Earliest session timestamp (inclusive), ISO string or datetime
+            until: Latest session timestamp (exclusive), ISO string or datetime
+            limit: Maximum results
+
+        Returns:
+            Matching history entries, best first, each with "score" and
+            "snippet"; without keywords or phrase, the most recent sessions
+            in the date range
+        """
+        raise NotImplementedError
+
+    def blob_stats(self) -> Dict[str, int]:
+        """Number of stored result blobs and the bytes they take on disk."""
+        raise NotImplementedError
+
+    def disk_bytes(self) -> int:
+        """Bytes the storage takes on disk, results included."""
+        raise NotImplementedError
+
+    def apply_retention(
+        self,
+        max_items: int = None,
+        max_age_days: float = None,
+        max_bytes: int = None
+    ) -> Dict[str, int]:
+        """
+        Remove what the retention limits exclude, see plan_retention().
+
+        Pruned history entries are folded into per-day session counts, and
+        tombstoned topics keep their record (research count and last
+        researched) while their results are released, so statistics are
+        unchanged. Other processes reload when they next refresh.
+
+        Args:
+            max_items: Most history entries kept
+            max_age_days: Oldest history entry kept, in days
+            max_bytes: Most bytes of stored results kept
+
+        Returns:
+            Dictionary with "entries_removed" and "topics_tombstoned"
+        """
+        raise NotImplementedError
+
+    def needs_compaction(self) -> bool:
+        """Whether compact() would reclaim enough space to be worth running."""
+        return False
+
+    def compact(self):
+        """Rewrite the storage to reclaim the space of removed data."""
+
+    def is_empty(self) -> bool:
+        """Whether nothing has been stored yet."""
+        raise NotImplementedError
+
+    def clear(self):
+        """Remove everything stored."""
+        raise NotImplementedError
+
+
+class SQLiteMemoryStorage(MemoryStorage):
+    """
+    SQLite-backed memory storage.
+
+    History entries and topic records are rows, so storing a session
+    inserts one history row and upserts one topic row in one transaction.
+    Results are stored as compressed, content-addressed blobs with
+    reference counts, so text shared by topics is stored once and a blob
+    is deleted as soon as no topic refers to it. An FTS5 table indexes
+    every session for full-text search. WAL mode keeps readers from
+    blocking on the writer, and a crash leaves the last committed state
+    intact. Every write transaction bumps a generation counter, so
+    processes sharing the database cheaply tell when to refresh. Space
+    freed by retention is reclaimed with VACUUM once free pages make up
+    ``vacuum_ratio`` of the file.
+    """
+
+    def __init__(
+        self,
+        path: str = "memory_bank.sqlite3",
+        codec: str = "zlib",
+        vacuum_ratio: float = 0.25,
+        vacuum_min_bytes: int = 1024 * 1024
+    ):
+        """
+        Initialize the storage.
+
+        Args:
+            path: Path to the SQLite database file
+            codec: Blob compression, "zlib" or "lzma"
+            vacuum_ratio: Share of free pages that triggers compaction
+            vacuum_min_bytes: Smallest database that is compacted
+        """
+        self.path = path
+        self.codec = codec
+        self.vacuum_ratio = vacuum_ratio
+        self.vacuum_min_bytes = vacuum_min_bytes
+        self._local = threading.local()
+        # What load()/refresh() last saw: generation, clear epoch, history row
+        self._generation = None
+        self._epoch = None
+        self._last_id = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        """Create storage tables if they don't exist."""
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS research_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                topic TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                entry TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS topics (
+                topic TEXT PRIMARY KEY,
+                last_researched TEXT NOT NULL,
+                research_count INTEGER NOT NULL,
+                results_ref TEXT,
+                blob_refs TEXT,
+                tombstone INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                hash TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                raw_size INTEGER NOT NULL,
+                refs INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0), ('epoch', 0)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS pruned_sessions (day TEXT PRIMARY KEY, sessions INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_topic ON research_history (topic, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_history_timestamp ON research_history (timestamp)")
+        conn.execute(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS research_fts USING fts5(
+                topic, summary, report, tokenize = 'unicode61 remove_diacritics 2'
+            )
+            """
+        )
+
+    def _rebuild_index(self, conn: sqlite3.Connection):
+        """Index every stored session, with each topic's latest report."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM research_fts")
+            conn.execute(
+                """
+                INSERT INTO research_fts (rowid, topic, summary, report)
+                SELECT id, topic, json_extract(entry, '$.summary'), '' FROM research_history
+                """
+            )
+            for (topic,) in conn.execute("SELECT topic FROM topics").fetchall():
+                conn.execute(
+                    """
+                    UPDATE research_fts SET report = ?
+                    WHERE rowid = (SELECT MAX(id) FROM research_history WHERE topic = ?)
+                    """,
+                    (report_text(self._read_results(conn, topic)), topic)
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, epoch: bool = False):
+        """Advance the generation (and the clear epoch) inside a write transaction."""
+        keys = ("generation", "epoch") if epoch else ("generation",)
+        conn.execute(
+            f"UPDATE meta SET value = value + 1 WHERE key IN ({', '.join('?' * len(keys))})", keys
+        )
+
+    @staticmethod
+    def _versions(conn: sqlite3.Connection) -> tuple:
+        values = dict(conn.execute("SELECT key, value FROM meta WHERE key IN ('generation', 'epoch')"))
+        return values.get("generation", 0), values.get("epoch", 0)
+
+    @staticmethod
+    def _topic_records(conn: sqlite3.Connection, topics: List[str] = None) -> Dict[str, Dict[str, Any]]:
+        query = "SELECT topic, last_researched, research_count, tombstone FROM topics"
+        params: List[str] = []
+        if topics is not None:
+            query += f" WHERE topic IN ({', '.join('?' * len(topics))})"
+            params = list(topics)
+        records = {}
+        for topic, last_researched, count, tombstone in conn.execute(query, params):
+            record = {"last_researched": last_researched, "research_count": count}
+            records[topic] = tombstone_record(record) if tombstone else record
+        return records
+
+    def load(self) -> Dict[str, Any]:
+        """Load the stored history and topic records."""
+        conn = self._connect()
+        memory = empty_memory()
+        # One read transaction, so the history and topics are a consistent snapshot
+        conn.execute("BEGIN")
+        try:
+            self._generation, self._epoch = self._versions(conn)
+            rows = conn.execute("SELECT id, entry FROM research_history ORDER BY id").fetchall()
+            memory["research_history"] = [json.loads(entry) for _, entry in rows]
+            memory["topics"] = self._topic_records(conn)
+            memory["pruned_sessions"] = dict(conn.execute("SELECT day, sessions FROM pruned_sessions"))
+        finally:
+            conn.execute("COMMIT")
+        self._last_id = rows[-1][0] if rows else 0
+        return memory
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """Pick up what was stored since the last load() or refresh()."""
+        conn = self._connect()
+        generation, epoch = self._versions(conn)
+        if generation == self._generation:
+            return None
+        if epoch != self._epoch:
+            return {"reset": True}
+
+        conn.execute("BEGIN")
+        try:
+            self._generation, _ = self._versions(conn)
+            rows = conn.execute(
+                "SELECT id, topic, entry FROM research_history WHERE id > ? ORDER BY id", (self._last_id,)
+            ).fetchall()
+            topics = self._topic_records(conn, sorted({topic for _, topic, _ in rows}))
+        finally:
+            conn.execute("COMMIT")
+        if rows:
+            self._last_id = rows[-1][0]
+        return {"history": [json.loads(entry) for _, _, entry in rows], "topics": topics}
+
+    @staticmethod
+    def _read_blob(conn: sqlite3.Connection, key: str) -> bytes:
+        row = conn.execute("SELECT data FROM blobs WHERE hash = ?", (key,)).fetchone()
+        if row is None:
+            raise KeyError(f"Missing memory blob {key}")
+        return decompress(row[0])
+
+    def _read_results(self, conn: sqlite3.Connection, topic: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute("SELECT results_ref FROM topics WHERE topic = ?", (topic,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return unpack_results(row[0], lambda key: self._read_blob(conn, key))
+
+    def load_results(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Read the stored results of a topic."""
+        conn = self._connect()
+        # One read transaction, so the blobs can't change between reads
+        conn.execute("BEGIN")
+        try:
+            return self._read_results(conn, topic)
+        finally:
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, entry: Dict[str, Any], topic: str, report: str = ""):
+        """Insert a history row and index it, moving the topic's report to it."""
+        previous = conn.execute(
+            "SELECT MAX(id) FROM research_history WHERE topic = ?", (topic,)
+        ).fetchone()[0]
+        cursor = conn.execute(
+            "INSERT INTO research_history (topic, timestamp, entry) VALUES (?, ?, ?)",
+            (topic, entry.get("timestamp", ""), json.dumps(entry, ensure_ascii=False))
+        )
+        conn.execute(
+            "INSERT INTO research_fts (rowid, topic, summary, report) VALUES (?, ?, ?, ?)",
+            (cursor.lastrowid, topic, entry.get("summary", ""), report)
+        )
+        if previous is not None:
+            conn.execute("UPDATE research_fts SET report = '' WHERE rowid = ?", (previous,))
+
+    def _put_results(self, conn: sqlite3.Connection, topic: str, results: Optional[Dict[str, Any]]):
+        """
+        Point a topic at the blobs of its new results, adjusting reference counts.
+
+        With ``results`` None the topic becomes a tombstone without results.
+        """
+        root, blobs = pack_results(results) if results is not None else (None, {})
+        row = conn.execute("SELECT blob_refs FROM topics WHERE topic = ?", (topic,)).fetchone()
+        old_refs = set(json.loads(row[0])) if row and row[0] else set()
+        new_refs = set(blobs)
+
+        for key in new_refs - old_refs:
+            updated = conn.execute("UPDATE blobs SET refs = refs + 1 WHERE hash = ?", (key,)).rowcount
+            if not updated:
+                conn.execute(
+                    "INSERT INTO blobs (hash, data, raw_size, refs) VALUES (?, ?, ?, 1)",
+                    (key, compress(blobs[key], self.codec), len(blobs[key]))
+                )
+        for key in old_refs - new_refs:
+            conn.execute("UPDATE blobs SET refs = refs - 1 WHERE hash = ?", (key,))
+        if old_refs - new_refs:
+            conn.execute("DELETE FROM blobs WHERE refs <= 0")
+
+        conn.execute(
+            "UPDATE topics SET results_ref = ?, blob_refs = ?, tombstone = ? WHERE topic = ?",
+            (root, json.dumps(sorted(new_refs)), int(results is None), topic)
+        )
+
+    def _put_topic(
+        self,
+        conn: sqlite3.Connection,
+        topic: str,
+        record: Dict[str, Any],
+        results: Dict[str, Any],
+        increment: bool = True
+    ):
+        """Upsert a topic record and its results, incrementing or setting its count."""
+        count = "topics.research_count + 1" if increment else "excluded.research_count"
+        conn.execute(
+            f"""
+            INSERT INTO topics (topic, last_researched, research_count)
+            VALUES (?, ?, ?)
+            ON CONFLICT (topic) DO UPDATE SET
+                last_researched = excluded.last_researched,
+                research_count = {count}
+            """,
+            (topic, record["last_researched"], 1 if increment else record["research_count"])
+        )
+        self._put_results(conn, topic, results)
+
+    def append_research(
+        self,
+        entry: Dict[str, Any],
+        topic: str,
+        record: Dict[str, Any],
+        results: Dict[str, Any]
+    ):
+        """Persist one research session, see MemoryStorage.append_research()."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._insert(conn, entry, topic, report_text(results))
+            self._put_topic(conn, topic, record, results)
+            self._bump(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def import_memory(self, memory: Dict[str, Any], only_if_empty: bool = False) -> bool:
+        """Persist a whole memory dict at once, see MemoryStorage.import_memory()."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if only_if_empty and not self._is_empty(conn):
+                conn.execute("ROLLBACK")
+                return False
+            for entry in memory.get("research_history", []):
+                self._insert(conn, entry, entry.get("topic", ""))
+            for topic, record in memory.get("topics", {}).items():
+                self._put_topic(conn, topic, record, record.get("results", {}), increment=False)
+            self._bump(conn, epoch=True)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._rebuild_index(conn)
+        return True
+
+    def search(
+        self,
+        query: str = "",
+        phrase: str = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Ranked full-text search, see MemoryStorage.search()."""
+        conn = self._connect()
+        conditions, params = [], []
+        since, until = timestamp_bound(since), timestamp_bound(until)
+        if since:
+            conditions.append("h.timestamp >= ?")
+            params.append(since)
+        if until:
+            conditions.append("h.timestamp < ?")
+            params.append(until)
+
+        match = fts_query(query, phrase)
+        if match is None:
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            rows = conn.execute(
+                f"""
+                SELECT h.entry, 0.0, substr(json_extract(h.entry, '$.summary'), 1, 160)
+                FROM research_history h {where}
+                ORDER BY h.id DESC LIMIT ?
+                """,
+                [*params, limit]
+            )
+        else:
+            rows = conn.execute(
+                f"""
+                SELECT h.entry, -bm25(research_fts, 4.0, 2.0, 1.0),
+                       snippet(research_fts, -1, '[', ']', '...', 24)
+                FROM research_fts JOIN research_history h ON h.id = research_fts.rowid
+                WHERE research_fts MATCH ? {''.join(f' AND {c}' for c in conditions)}
+                ORDER BY bm25(research_fts, 4.0, 2.0, 1.0) LIMIT ?
+                """,
+                [match, *params, limit]
+            )
+        return [
+            {**json.loads(entry), "score": score, "snippet": snippet or ""}
+            for entry, score, snippet in rows
+        ]
+
+    def blob_stats(self) -> Dict[str, int]:
+        """Number of stored result blobs and the bytes they take on disk."""
+        count, stored, raw = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0), COALESCE(SUM(raw_size), 0) FROM blobs"
+        ).fetchone()
+        return {"blobs": count, "stored_bytes": stored, "raw_bytes": raw}
+
+    def disk_bytes(self) -> int:
+        """Bytes the database and its write-ahead log take on disk."""
+        return sum(
+            os.path.getsize(path) for path in (self.path, f"{self.path}-wal") if os.path.exists(path)
+        )
+
+    def apply_retention(
+        self,
+        max_items: int = None,
+        max_age_days: float = None,
+        max_bytes: int = None
+    ) -> Dict[str, int]:
+        """Remove what the retention limits exclude, see MemoryStorage.apply_retention()."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute("SELECT id, topic, timestamp FROM research_history ORDER BY id").fetchall()
+            topics, topic_blobs = {}, {}
+            for topic, last_researched, tombstone, blob_refs in conn.execute(
+                "SELECT topic, last_researched, tombstone, blob_refs FROM topics"
+            ):
+                topics[topic] = {"last_researched": last_researched, "tombstone": bool(tombstone)}
+                topic_blobs[topic] = json.loads(blob_refs) if blob_refs else []
+            blob_sizes = dict(conn.execute("SELECT hash, LENGTH(data) FROM blobs")) if max_bytes else {}
+
+            pruned, tombstones = plan_retention(
+                [{"topic": topic, "timestamp": timestamp} for _, topic, timestamp in rows],
+                topics, topic_blobs, blob_sizes, max_items, max_age_days, max_bytes
+            )
+            if pruned or tombstones:
+                ids = [(rows[i][0],) for i in pruned]
+                conn.executemany("DELETE FROM research_history WHERE id = ?", ids)
+                conn.executemany("DELETE FROM research_fts WHERE rowid = ?", ids)
+                conn.executemany(
+                    """
+                    INSERT INTO pruned_sessions (day, sessions) VALUES (?, ?)
+                    ON CONFLICT (day) DO UPDATE SET sessions = sessions + excluded.sessions
+                    """,
+                    Counter(rows[i][2][:10] for i in pruned).items()
+                )
+                for topic in tombstones:
+                    self._put_results(conn, topic, None)
+                    conn.execute(
+                        """
+                        UPDATE research_fts SET report = ''
+                        WHERE rowid = (SELECT MAX(id) FROM research_history WHERE topic = ?)
+                        """,
+                        (topic,)
+                    )
+                self._bump(conn, epoch=True)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return {"entries_removed": len(pruned), "topics_tombstoned": len(tombstones)}
+
+    def needs_compaction(self) -> bool:
+        """Whether free pages make up enough of the database to vacuum it."""
+        conn = self._connect()
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return pages * page_size >= self.vacuum_min_bytes and free >= self.vacuum_ratio * pages
+
+    def compact(self):
+        """
+        Rebuild the database without its free pages.
+
+        Readers keep reading their WAL snapshot meanwhile; writers wait.
+        """
+        conn = self._connect()
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    @staticmethod
+    def _is_empty(conn: sqlite3.Connection) -> bool:
+        return (
+            conn.execute("SELECT 1 FROM research_history LIMIT 1").fetchone() is None
+            and conn.execute("SELECT 1 FROM topics LIMIT 1").fetchone() is None
+        )
+
+    def is_empty(self) -> bool:
+        """Whether nothing has been stored yet."""
+        return self._is_empty(self._connect())
+
+    def clear(self):
+        """Remove everything stored."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM research_history")
+            conn.execute("DELETE FROM research_fts")
+            conn.execute("DELETE FROM topics")
+            conn.execute("DELETE FROM blobs")
+            conn.execute("DELETE FROM pruned_sessions")
+            self._bump(conn, epoch=True)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class FileLock:
+    """
+    Exclusive lock on a file, shared by every process on the host.
+
+    Uses flock where available and msvcrt byte-range locking on Windows.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the lock.
+
+        Args:
+            path: Lock file path (created on first use)
+        """
+        self.path = path
+        self._file = None
+
+    def __enter__(self) -> "FileLock":
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class JSONLMemoryStorage(MemoryStorage):
+    """
+    Append-only JSONL log of memory bank operations.
+
+    Storing a session writes the blobs of its results that aren't stored
+    yet to a directory of compressed, content-addressed files, then appends
+    one record line naming them. Loading replays the record lines and
+    counts the references to each blob; results are read from the blobs
+    when asked for, and a blob is deleted once no topic refers to it. A
+    topic researched again supersedes its earlier line; once superseded
+    lines make up ``compact_ratio`` of a log larger than
+    ``compact_min_bytes``, the log is rewritten with only the live lines
+    and atomically swapped in.
+
+    Writers in any process hold an exclusive file lock and first replay
+    what other processes appended, so counts and blob references stay
+    exact. Readers take no file lock: the log only grows until it is
+    swapped, and a swap is noticed by the file's identity changing. A line
+    torn by a crash is ignored by readers and truncated by the next writer.
+    Full-text search over topics, summaries and reports uses an in-process
+    inverted index kept up to date with the log; as in SQLite, a topic's
+    report is indexed on its latest session. The report text is written
+    into the topic's log line, so replay never reads the result blobs. Retention rewrites the log like
+    compaction, without the removed entries and results.
+    """
+
+    def __init__(
+        self,
+        path: str = "memory_bank.jsonl",
+        compact_ratio: float = 0.5,
+        compact_min_bytes: int = 1024 * 1024,
+        codec: str = "zlib"
+    ):
+        """
+        Initialize the storage.
+
+        Args:
+            path: Path to the log file; blobs go to "<path>.blobs"
+            compact_ratio: Share of superseded bytes that triggers compaction
+            compact_min_bytes: Smallest log that is compacted
+            codec: Blob compression, "zlib" or "lzma"
+        """
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self.compact_min_bytes = compact_min_bytes
+        self.blobs = FileBlobStore(f"{path}.blobs", codec)
+        self._file_lock = FileLock(f"{path}.lock")
+        # Serializes this process's writers; the state lock guards the
+        # in-memory view and is never held during file writes
+        self._write_lock = threading.Lock()
+        self._state_lock = threading.RLock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._reset()
+
+    def _reset(self):
+        """Forget the replayed state."""
+        # Identity of the replayed log file and bytes replayed from it
+        self._identity = None
+        self._offset = 0
+        self._memory = empty_memory()
+        self._pending = {"history": [], "topics": {}}
+        # Log bytes of each topic's live record line, and bytes superseded
+        self._record_bytes: Dict[str, int] = {}
+        self._stale_bytes = 0
+        # Root blob and blob references of each topic's results
+        self._results_ref: Dict[str, str] = {}
+        self._blob_refs: Dict[str, List[str]] = {}
+        self._refs: Dict[str, int] = {}
+        # Search index over history entries, by position in the history
+        self._index = InvertedIndex()
+        # Latest history position of each topic and the position its
+        # report is indexed on
+        self._topic_docs: Dict[str, int] = {}
+        self._report_docs: Dict[str, int] = {}
+
+    def _snapshot(self) -> Dict[str, Any]:
+        """Copy of the replayed memory (caller holds the state lock)."""
+        return {
+            "research_history": list(self._memory["research_history"]),
+            "topics": dict(self._memory["topics"]),
+            "pruned_sessions": dict(self._memory["pruned_sessions"])
+        }
+
+    @staticmethod
+    def _line(op: Dict[str, Any]) -> bytes:
+        return (json.dumps(op, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+    @staticmethod
+    def _public_record(record: Dict[str, Any]) -> Dict[str, Any]:
+        """Topic record without the storage's blob references."""
+        return {k: v for k, v in record.items() if k not in ("results_ref", "blobs")}
+
+    def _stat(self) -> Optional[tuple]:
+        """(identity, size) of the log file, None if it doesn't exist."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_dev, st.st_ino), st.st_size
+
+    def _set_topic(self, topic: str, record: Dict[str, Any], size: int) -> List[str]:
+        """
+        Account for a topic record line of ``size`` bytes.
+
+        Returns:
+            Blobs no longer referenced by any topic
+        """
+        self._stale_bytes += self._record_bytes.get(topic, 0)
+        self._record_bytes[topic] = size
+
+        new_refs = record.get("blobs") or []
+        old_refs = self._blob_refs.get(topic, [])
+        for key in new_refs:
+            self._refs[key] = self._refs.get(key, 0) + 1
+        released = []
+        for key in old_refs:
+            self._refs[key] -= 1
+            if self._refs[key] <= 0:
+                del self._refs[key]
+                released.append(key)
+        self._blob_refs[topic] = list(new_refs)
+        if "results_ref" in record:
+            self._results_ref[topic] = record["results_ref"]
+        else:
+            self._results_ref.pop(topic, None)
+        return released
+
+    def _apply(self, line: bytes) -> List[str]:
+        """
+        Apply one complete log line to the replayed state.
+
+        Returns:
+            Blobs no longer referenced by any topic
+        """
+        try:
+            op = json.loads(line)
+        except ValueError:
+            return []
+
+        released = []
+        if "entry" in op:
+            entry = op["entry"]
+            doc_id = len(self._memory["research_history"])
+            self._index_entry(doc_id, entry)
+            self._topic_docs[entry.get("topic", "")] = doc_id
+            self._memory["research_history"].append(entry)
+            self._pending["history"].append(entry)
+        if "daily" in op:
+            pruned = self._memory["pruned_sessions"]
+            for day, sessions in op["daily"].items():
+                pruned[day] = pruned.get(day, 0) + sessions
+        if "record" in op:
+            record = self._public_record(op["record"])
+            self._memory["topics"][op["topic"]] = record
+            self._pending["topics"][op["topic"]] = record
+            released = self._set_topic(op["topic"], op["record"], len(line))
+            self._index_report(op["topic"], op.get("report", ""))
+        return released
+
+    def _index_entry(self, doc_id: int, entry: Dict[str, Any], report: str = ""):
+        """Index a history entry, with its topic's report if it is the latest."""
+        self._index.add(doc_id, entry.get("timestamp", ""), {
+            "topic": entry.get("topic", ""), "summary": entry.get("summary", ""), "report": report
+        })
+
+    def _report(self, topic: str) -> str:
+        """Report body of a topic's live results, "" if it has none."""
+        try:
+            return report_text(self._read_results(topic))
+        except (FileNotFoundError, KeyError, ValueError):
+            # Superseded and collected by another process
+            return ""
+
+    def _index_report(self, topic: str, report: str):
+        """Index a topic's live report on its latest session, unindexing the previous one."""
+        history = self._memory["research_history"]
+        doc_id = self._topic_docs.get(topic)
+        previous = self._report_docs.pop(topic, None)
+        if previous is not None:
+            self._index_entry(previous, history[previous])
+        if report and doc_id is not None:
+            self._index_entry(doc_id, history[doc_id], report)
+            self._report_docs[topic] = doc_id
+
+    def _catch_up(self) -> List[str]:
+        """
+        Replay what was appended to the log since the last replay.
+
+        A log that was swapped (compacted or cleared) is replayed from the
+        start and a reset is reported by refresh(). Caller holds the state lock.
+
+        Returns:
+            Blobs no longer referenced by any topic
+        """
+        stat = self._stat()
+        if stat is None:
+            if self._identity is not None:
+                self._reset()
+                self._pending["reset"] = True
+            return []
+        identity, size = stat
+        if identity != self._identity or size < self._offset:
+            reset = self._identity is not None
+            self._reset()
+            self._identity = identity
+            if reset:
+                self._pending["reset"] = True
+        if size == self._offset:
+            return []
+
+        released = []
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Being appended by another process, or torn by a crash
+                    break
+                released += self._apply(line)
+                self._offset += len(line)
+        return released
+
+    def load(self) -> Dict[str, Any]:
+        """Load the stored history and topic records by replaying the log."""
+        with self._state_lock:
+            self._reset()
+            self._catch_up()
+            self._pending = {"history": [], "topics": {}}
+            return self._snapshot()
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """Pick up what was stored since the last load() or refresh()."""
+        with self._state_lock:
+            if self._stat() != ((self._identity, self._offset) if self._identity else None):
+                self._catch_up()
+            pending = self._pending
+            if not pending.get("reset") and not pending["history"] and not pending["topics"]:
+                return None
+            self._pending = {"history": [], "topics": {}}
+            return {"reset": True} if pending.get("reset") else pending
+
+    def _read_results(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Read a topic's live results from its blobs."""
+        with self._state_lock:
+            root = self._results_ref.get(topic)
+        if root is None:
+            return None
+        return unpack_results(root, self.blobs.get)
+
+    def load_results(self, topic: str) -> Optional[Dict[str, Any]]:
+        """Read the stored results of a topic."""
+        try:
+            return self._read_results(topic)
+        except (FileNotFoundError, ValueError):
+            # Superseded and collected, or the log was swapped, by another process
+            with self._state_lock:
+                self._catch_up()
+            return self._read_results(topic)
+
+    def _store_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Write the missing blobs of results, returning their record fields."""
+        root, blobs = pack_results(results)
+        for key, data in blobs.items():
+            if key not in self._refs:
+                self.blobs.put(key, data)
+        return {"results_ref": root, "blobs": sorted(blobs)}
+
+    def _release(self, keys: List[str]):
+        """Delete blob files (caller holds the file lock)."""
+        for key in keys:
+            if key not in self._refs:
+                self.blobs.delete(key)
+
+    def _prepare_write(self):
+        """Catch up with other writers and drop a torn tail (caller holds the file lock)."""
+        with self._state_lock:
+            self._release(self._catch_up())
+        stat = self._stat()
+        if stat is not None and stat[1] > self._offset:
+            with open(self.path, "r+b") as f:
+                f.truncate(self._offset)
+
+    def append_research(
+        self,
+        entry: Dict[str, Any],
+        topic: str,
+        record: Dict[str, Any],
+        results: Dict[str, Any]
+    ):
+        """Persist one research session, see MemoryStorage.append_research()."""
+        with self._write_lock, self._file_lock:
+            self._prepare_write()
+            count = self._memory["topics"].get(topic, {}).get("research_count", 0) + 1
+            stored = {**record, "research_count": count, **self._store_results(results)}
+            op = {"op": "research", "entry": entry, "topic": topic, "record": stored}
+            if report_text(results):
+                # Indexed on replay without reading the result blobs
+                op["report"] = report_text(results)
+            data = self._line(op)
+            with open(self.path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            with self._state_lock:
+                self._release(self._catch_up())
+
+    def import_memory(self, memory: Dict[str, Any], only_if_empty: bool = False) -> bool:
+        """Persist a whole memory dict at once, see MemoryStorage.import_memory()."""
+        with self._write_lock, self._file_lock:
+            if only_if_empty and not self.is_empty():
+                return False
+            self._write_snapshot(memory)
+        return True
+
+    def search(
+        self,
+        query: str = "",
+        phrase: str = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        """Ranked full-text search, see MemoryStorage.search()."""
+        terms = tokenize(query) + tokenize(phrase)
+        with self._state_lock:
+            self._catch_up()
+            hits = self._index.search(query, phrase, since, until, limit)
+            history = self._memory["research_history"]
+            entries = [
+                (history[doc_id], score, self._report_docs.get(history[doc_id].get("topic")) == doc_id)
+                for doc_id, score in hits
+            ]
+        results = []
+        for entry, score, has_report in entries:
+            fields = [entry.get("summary", ""), entry.get("topic", "")]
+            if has_report and terms:
+                fields.append(self._report(entry.get("topic")))
+            results.append({**entry, "score": score, "snippet": make_snippet(fields, terms)})
+        return results
+
+    def blob_stats(self) -> Dict[str, int]:
+        """Number of stored result blobs and the bytes they take on disk."""
+        with self._state_lock:
+            keys = list(self._refs)
+        return {"blobs": len(keys), "stored_bytes": sum(self.blobs.size(k) for k in keys)}
+
+    def disk_bytes(self) -> int:
+        """Bytes the log and its result blobs take on disk."""
+        stat = self._stat()
+        return (stat[1] if stat else 0) + self.blob_stats()["stored_bytes"]
+
+    def apply_retention(
+        self,
+        max_items: int = None,
+        max_age_days: float = None,
+        max_bytes: int = None
+    ) -> Dict[str, int]:
+        """Remove what the retention limits exclude, see MemoryStorage.apply_retention()."""
+        with self._write_lock, self._file_lock:
+            self._prepare_write()
+            with self._state_lock:
+                memory = self._snapshot()
+                topic_blobs = {topic: list(keys) for topic, keys in self._blob_refs.items()}
+            blob_sizes = {}
+            if max_bytes:
+                blob_sizes = {key: self.blobs.size(key) for keys in topic_blobs.values() for key in keys}
+            pruned, tombstones = plan_retention(
+                memory["research_history"], memory["topics"], topic_blobs, blob_sizes,
+                max_items, max_age_days, max_bytes
+            )
+            if pruned or tombstones:
+                history = memory["research_history"]
+                for i in pruned:
+                    day = history[i].get("timestamp", "")[:10]
+                    memory["pruned_sessions"][day] = memory["pruned_sessions"].get(day, 0) + 1
+                pruned_set = set(pruned)
+                memory["research_history"] = [e for i, e in enumerate(history) if i not in pruned_set]
+                for topic in tombstones:
+                    memory["topics"][topic] = tombstone_record(memory["topics"][topic])
+                self._write_snapshot(memory)
+        return {"entries_removed": len(pruned), "topics_tombstoned": len(tombstones)}
+
+    def needs_compaction(self) -> bool:
+        """Whether superseded lines make up enough of the log to rewrite it."""
+        stat = self._stat()
+        if stat is None:
+            return False
+        return stat[1] >= self.compact_min_bytes and self._stale_bytes >= self.compact_ratio * stat[1]
+
+    def compact(self):
+        """Rewrite the log with only the live lines."""
+        with self._write_lock, self._file_lock:
+            self._prepare_write()
+            if not self._stale_bytes:
+                # Already compacted by another process
+                return
+            with self._state_lock:
+                memory = self._snapshot()
+            self._write_snapshot(memory, same_content=True)
+
+    def _write_snapshot(self, memory: Dict[str, Any], same_content: bool = False):
+        """
+        Write ``memory`` as a fresh log and swap it in atomically.
+
+        Results inline in a record (imports) are moved into blobs, each
+        live topic's report text is carried over for the search index, and
+        blob files nothing refers to afterwards are deleted. Caller holds
+        the file lock. With ``same_content`` (compaction) this process's
+        refresh() reports no reset, as nothing it loaded changed.
+        """
+        lines = []
+        if memory.get("pruned_sessions"):
+            lines.append(self._line({"op": "pruned", "daily": memory["pruned_sessions"]}))
+        lines += [self._line({"op": "history", "entry": e}) for e in memory.get("research_history", [])]
+        for topic, record in memory.get("topics", {}).items():
+            stored = self._public_record(record)
+            op = {"op": "topic", "topic": topic, "record": stored}
+            if record.get("tombstone"):
+                stored.pop("results", None)
+            elif "results" in record:
+                stored.pop("results")
+                stored.update(self._store_results(record["results"]))
+                op["report"] = report_text(record["results"])
+            elif topic in self._results_ref:
+                stored.update(results_ref=self._results_ref[topic], blobs=self._blob_refs[topic])
+                op["report"] = self._report(topic)
+            if not op.get("report"):
+                op.pop("report", None)
+            lines.append(self._line(op))
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        with self._state_lock:
+            pending = self._pending
+            self._catch_up()
+            if same_content:
+                self._pending = pending
+            self._stale_bytes = 0
+            self.collect_garbage()
+
+    def collect_garbage(self) -> int:
+        """
+        Delete blob files no topic refers to (e.g. left by an interrupted store).
+
+        Caller holds the file lock, so no store is writing blobs meanwhile.
+
+        Returns:
+            Number of blob files deleted
+        """
+        orphans = [key for key in self.blobs.keys() if key not in self._refs]
+        self._release(orphans)
+        return len(orphans)
+
+    def is_empty(self) -> bool:
+        """Whether nothing has been stored yet."""
+        stat = self._stat()
+        return stat is None or stat[1] == 0
+
+    def clear(self):
+        """Remove everything stored."""
+        with self._write_lock, self._file_lock:
+            self._write_snapshot(empty_memory())
+
+
+MEMORY_BACKENDS = {
+    "sqlite": (SQLiteMemoryStorage, ".sqlite3"),
+    "jsonl": (JSONLMemoryStorage, ".jsonl")
+}
+
+
+def create_memory_storage(storage_path: str, backend: Optional[str] = None) -> MemoryStorage:
+    """
+    Create the storage backend for a memory bank.
+
+    Args:
+        storage_path: Memory bank path; a ".json" path (the former whole-file
+            format) is given the backend's own extension
+        backend: "sqlite" or "jsonl", defaults to AgentConfig.MEMORY_BACKEND
+
+    Returns:
+        The storage backend
+    """
+    backend = (backend or AgentConfig.MEMORY_BACKEND).lower()
+    if backend not in MEMORY_BACKENDS:
+        raise ValueError(f"Unknown memory backend '{backend}', expected one of {sorted(MEMORY_BACKENDS)}")
+    storage_class, extension = MEMORY_BACKENDS[backend]
+
+    root, current = os.path.splitext(storage_path)
+    path = f"{root}{extension}" if current.lower() == ".json" else storage_path
+    if storage_class is JSONLMemoryStorage:
+        return JSONLMemoryStorage(
+            path,
+            compact_ratio=AgentConfig.MEMORY_LOG_COMPACT_RATIO,
+            compact_min_bytes=AgentConfig.MEMORY_LOG_COMPACT_MIN_BYTES,
+            codec=AgentConfig.MEMORY_BLOB_CODEC
+        )
+    return storage_class(path, codec=AgentConfig.MEMORY_BLOB_CODEC)
+
+
+def migrate_json_memory(json_path: str, storage: MemoryStorage) -> bool:
+    """
+    Move a whole-file JSON memory bank into a storage backend.
+
+    The JSON file is imported only while the backend is still empty, then
+    renamed to "<name>.migrated" so it is not imported again. Processes
+    starting at the same time import it once: the emptiness check is made
+    under the backend's write lock, and a file another process already
+    renamed counts as migrated.
+
+    Args:
+        json_path: Path of the former memory_bank.json
+        storage: Storage backend to import into
+
+    Returns:
+        True if a file was migrated
+    """
+    if not json_path.lower().endswith(".json") or not os.path.exists(json_path):
+        return False
+    if not storage.is_empty():
+        return False
+
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            memory = json.load(f)
+    except FileNotFoundError:
+        # Migrated by another process meanwhile
+        return False
+    memory.setdefault("research_history", [])
+    memory.setdefault("topics", {})
+    if not storage.import_memory(memory, only_if_empty=True):
+        return False
+    try:
+        os.replace(json_path, f"{json_path}.migrated")
+    except FileNotFoundError:
+        pass
+    return True
+
+
+__all__ = [
+    "JSONLMemoryStorage",
+    "MemoryStorage",
+    "SQLiteMemoryStorage",
+    "create_memory_storage",
+    "migrate_json_memory"
+]
@@ -0,0 +1,313 @@
+"""
+Source Store
+Persistent store of research sources and their summaries, shared across topics.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config.agent_config import AgentConfig
+
+
+# Query parameters that only track the click and never identify the source
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|ref_src)$", re.IGNORECASE)
+
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """
+    Canonical form of a URL, so the same source is recognized across searches.
+
+    The scheme and host are lowercased, "www." and default ports, fragments,
+    tracking parameters and trailing slashes are dropped, and the remaining
+    query parameters are sorted.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    if not parts.netloc:
+        return url.strip()
+    host = parts.hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and (parts.scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(k)
+    ))
+    scheme = "https" if parts.scheme.lower() in ("http", "https") else parts.scheme.lower()
+    return urlunsplit((scheme, host, parts.path.rstrip("/"), query, ""))
+
+
+class SourceStore:
+    """
+    SQLite-backed store of sources keyed by canonical URL.
+
+    Every search records the metadata of the sources it found, merged with
+    what earlier searches already knew, and the summarization agent records
+    the summary it produced from the grounded search text about each source.
+    A source found again, by an overlapping topic at any depth, reuses that
+    summary until it expires instead of having it generated again. WAL mode makes the store safe to share between threads and
+    processes.
+    """
+
+    def __init__(self, path: str = "source_store.sqlite3", summary_ttl_seconds: float = None):
+        """
+        Initialize the Source Store.
+
+        Args:
+            path: Path to the SQLite database file
+            summary_ttl_seconds: Age at which stored summaries expire,
+                defaults to AgentConfig.SOURCE_SUMMARY_TTL_SECONDS
+        """
+        self.path = path
+        self.summary_ttl_seconds = (
+            AgentConfig.SOURCE_SUMMARY_TTL_SECONDS if summary_ttl_seconds is None else summary_ttl_seconds
+        )
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        """Create store tables if they don't exist."""
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sources (
+                url TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                authors TEXT NOT NULL,
+                date TEXT,
+                relevance TEXT,
+                grounding_urls TEXT NOT NULL,
+                topics TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                times_seen INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS source_summaries (
+                url TEXT NOT NULL,
+                model TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (url, model)
+            )
+            """
+        )
+
+    @staticmethod
+    def key(source: Dict[str, Any]) -> Optional[str]:
+        """Store key of a source record: its canonical URL, None without a URL."""
+        return canonical_url(source.get("url"))
+
+    @staticmethod
+    def _row_to_source(row: sqlite3.Row) -> Dict[str, Any]:
+        url, title, authors, date, relevance, grounding, topics, first, last, seen = row
+        return {
+            "url": url,
+            "title": title,
+            "authors": json.loads(authors),
+            "date": date,
+            "relevance": relevance,
+            "grounding_urls": json.loads(grounding),
+            "topics": json.loads(topics),
+            "first_seen": first,
+            "last_seen": last,
+            "times_seen": seen
+        }
+
+    def record_sources(self, sources: List[Dict[str, Any]], topic: str = None) -> List[Dict[str, Any]]:
+        """
+        Record sources found by a search, merging them with stored metadata.
+
+        Missing fields (authors, date, relevance) are filled from what is
+        already known about the source, and newly found fields are kept. The
+        grounded "content" of this search is passed through, not stored.
+
+        Args:
+            sources: Source record dictionaries
+            topic: Topic the sources were found for
+
+        Returns:
+            The merged records in the given order, each with "known" telling
+            whether the source had been seen before; sources without a URL
+            are returned unchanged with known=False
+        """
+        conn = self._connect()
+        now = time.time()
+        merged = []
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for source in sources:
+                url = self.key(source)
+                if url is None:
+                    merged.append({**source, "known": False})
+                    continue
+
+                row = conn.execute("SELECT * FROM sources WHERE url = ?", (url,)).fetchone()
+                stored = self._row_to_source(row) if row else {}
+                topics = stored.get("topics", [])
+                if topic and topic not in topics:
+                    topics.append(topic)
+                grounding = list(dict.fromkeys(
+                    stored.get("grounding_urls", []) + list(source.get("grounding_urls") or [])
+                ))
+                record = {
+                    "title": source.get("title") or stored.get("title", ""),
+                    "url": source.get("url") or url,
+                    "authors": source.get("authors") or stored.get("authors", []),
+                    "date": source.get("date") or stored.get("date"),
+                    "relevance": source.get("relevance") or stored.get("relevance", ""),
+                    "grounding_urls": grounding,
+                    "content": source.get("content") or ""
+                }
+
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO sources
+                        (url, title, authors, date, relevance, grounding_urls, topics,
+                         first_seen, last_seen, times_seen)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        url,
+                        record["title"],
+                        json.dumps(record["authors"], ensure_ascii=False),
+                        record["date"],
+                        record["relevance"],
+                        json.dumps(grounding, ensure_ascii=False),
+                        json.dumps(topics, ensure_ascii=False),
+                        stored.get("first_seen", now),
+                        now,
+                        stored.get("times_seen", 0) + 1
+                    )
+                )
+                merged.append({**record, "known": bool(stored)})
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return merged
+
+    def get_source(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored metadata of a source.
+
+        Args:
+            url: Source URL (canonicalized before lookup)
+
+        Returns:
+            Stored source, or None if unknown
+        """
+        row = self._connect().execute(
+            "SELECT * FROM sources WHERE url = ?", (canonical_url(url),)
+        ).fetchone()
+        return self._row_to_source(row) if row else None
+
+    def get_summaries(self, sources: List[Dict[str, Any]], model: str) -> Dict[str, str]:
+        """
+        Get the stored, unexpired summaries of sources.
+
+        Args:
+            sources: Source record dictionaries
+            model: Model the summaries were produced with
+
+        Returns:
+            Summary by canonical URL, for the sources that have one
+        """
+        urls = [u for u in (self.key(s) for s in sources) if u]
+        if not urls:
+            return {}
+        placeholders = ", ".join("?" * len(urls))
+        rows = self._connect().execute(
+            f"""
+            SELECT url, summary FROM source_summaries
+            WHERE model = ? AND created_at >= ? AND url IN ({placeholders})
+            """,
+            [model, time.time() - self.summary_ttl_seconds, *urls]
+        )
+        return dict(rows)
+
+    def put_summaries(self, summaries: List[Tuple[Dict[str, Any], str]], model: str):
+        """
+        Store per-source summaries, dropping expired ones.
+
+        Args:
+            summaries: (source record dictionary, summary) pairs
+            model: Model the summaries were produced with
+        """
+        now = time.time()
+        rows = [(self.key(source), model, summary, now) for source, summary in summaries if self.key(source)]
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO source_summaries (url, model, summary, created_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                rows
+            )
+            conn.execute(
+                "DELETE FROM source_summaries WHERE created_at < ?", (now - self.summary_ttl_seconds,)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of stored sources and summaries."""
+        conn = self._connect()
+        return {
+            "sources": conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0],
+            "summaries": conn.execute("SELECT COUNT(*) FROM source_summaries").fetchone()[0]
+        }
+
+    def clear(self):
+        """Remove every stored source and summary."""
+        conn = self._connect()
+        conn.execute("DELETE FROM source_summaries")
+        conn.execute("DELETE FROM sources")
+
+
+_default_store: Optional[SourceStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_source_store() -> Optional[SourceStore]:
+    """Get the process-wide source store, or None when disabled in AgentConfig."""
+    global _default_store
+    if not AgentConfig.SOURCE_STORE_ENABLED:
+        return None
+    if _default_store is None:
+        with _default_store_lock:
+            if _default_store is None:
+                _default_store = SourceStore(AgentConfig.SOURCE_STORE_PATH)
+    return _default_store
+
+
+__all__ = ["SourceStore", "canonical_url", "get_default_source_store"]
@@ -0,0 +1,27 @@
+"""A failed or cancelled topic doesn't abort a comparison."""
+
+import asyncio
+
+from agents.orchestrator_agent import OrchestratorAgent
+from source_store import SourceStore
+
+
+def test_cancelled_topic_is_reported_as_error(tmp_path):
+    orchestrator = OrchestratorAgent(source_store=SourceStore(str(tmp_path / "sources.sqlite3")))
+
+    async def conduct_research_async(topic, **kwargs):
+        if topic == "cancelled":
+            raise asyncio.CancelledError()
+        return {"summary": {"summary": f"About {topic}"}}
+
+    async def synthesize_multiple_async(summaries, topic):
+        return {"topic": topic, "summaries": summaries}
+
+    orchestrator.conduct_research_async = conduct_research_async
+    orchestrator.summarization_agent.synthesize_multiple_async = synthesize_multiple_async
+
+    result = asyncio.run(orchestrator.research_and_compare_async(["solar", "cancelled", "wind"]))
+
+    assert list(result["individual_results"]) == ["solar", "wind"]
+    assert result["errors"] == {"cancelled": "CancelledError"}
+    assert result["comparison"]["summaries"] == ["About solar", "About wind"]
@@ -0,0 +1,47 @@
+"""The report step runs with whichever of its optional inputs the workflow has."""
+
+import asyncio
+
+import pytest
+
+from agents.orchestrator_agent import OrchestratorAgent
+from source_store import SourceStore
+
+
+@pytest.fixture
+def orchestrator(tmp_path):
+    orchestrator = OrchestratorAgent(source_store=SourceStore(str(tmp_path / "sources.sqlite3")))
+    written = []
+
+    async def search_async(topic):
+        return {"topic": topic, "search_results": f"Sources on {topic}", "sources": []}
+
+    async def summary_input_async(search_results):
+        return search_results["search_results"], None
+
+    async def summarize_async(content):
+        return {"summary": f"Summary of {content}"}
+
+    async def write_report_async(topic, research_data):
+        written.append(research_data)
+        return {"report": f"Report on {topic}"}
+
+    orchestrator.search_agent.search_async = search_async
+    orchestrator._summary_input_async = summary_input_async
+    orchestrator.summarization_agent.summarize_async = summarize_async
+    orchestrator.writer_agent.write_report_async = write_report_async
+    orchestrator.written = written
+    return orchestrator
+
+
+@pytest.mark.parametrize("steps, sources, findings", [
+    (["write"], "", ""),
+    (["search", "write"], "Sources on AI", ""),
+    (["search", "summarize", "write"], "Sources on AI", "Summary of Sources on AI"),
+])
+def test_write_uses_available_inputs(orchestrator, steps, sources, findings):
+    result = asyncio.run(orchestrator.custom_workflow_async("AI", steps))
+
+    assert result["steps"]["write"] == {"report": "Report on AI"}
+    assert "write" not in result["skipped"]
+    assert orchestrator.written == [{"findings": findings, "sources": sources, "synthesis": findings}]
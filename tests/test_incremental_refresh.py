@@ -0,0 +1,23 @@
+"""An incremental refresh only builds on earlier research on the same topic."""
+
+from agents.orchestrator_agent import OrchestratorAgent
+
+
+PREVIOUS = {
+    "summary": {"summary": "Earlier summary"},
+    "search_results": {
+        "topic": "Climate change effects on agriculture",
+        "sources": [{"title": "A", "url": "https://example.org/a"}],
+    },
+}
+FOUND = {"sources": [{"title": "B", "url": "https://example.org/b"}]}
+
+
+def test_other_topic_is_not_refreshed():
+    assert OrchestratorAgent._source_delta("Climate change effects on aquaculture", FOUND, PREVIOUS) is None
+
+
+def test_same_normalized_topic_is_refreshed():
+    delta = OrchestratorAgent._source_delta(" climate change effects on AGRICULTURE", FOUND, PREVIOUS)
+    assert delta["previous_sources"] == PREVIOUS["search_results"]["sources"]
+    assert delta["new_sources"] == FOUND["sources"]
@@ -0,0 +1,53 @@
+"""The whole-file JSON memory bank is migrated exactly once."""
+
+import json
+import threading
+
+import pytest
+
+from memory_storage import JSONLMemoryStorage, SQLiteMemoryStorage, migrate_json_memory
+
+
+BACKENDS = {
+    "sqlite": lambda tmp_path: SQLiteMemoryStorage(str(tmp_path / "memory_bank.sqlite3")),
+    "jsonl": lambda tmp_path: JSONLMemoryStorage(str(tmp_path / "memory_bank.jsonl")),
+}
+
+MEMORY = {
+    "research_history": [{"topic": "AI", "timestamp": "2024-01-01T00:00:00", "summary": "About AI"}],
+    "topics": {"AI": {"last_researched": "2024-01-01T00:00:00", "research_count": 1, "results": {}}},
+}
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_concurrent_migrations_import_once(tmp_path, backend):
+    json_path = tmp_path / "memory_bank.json"
+    json_path.write_text(json.dumps(MEMORY), encoding="utf-8")
+    storages = [BACKENDS[backend](tmp_path) for _ in range(4)]
+    barrier = threading.Barrier(len(storages))
+    migrated, errors = [], []
+
+    def migrate(storage):
+        barrier.wait()
+        try:
+            migrated.append(migrate_json_memory(str(json_path), storage))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=migrate, args=(storage,)) for storage in storages]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert migrated.count(True) == 1
+    assert len(BACKENDS[backend](tmp_path).load()["research_history"]) == 1
+    assert not json_path.exists()
+
+
+def test_import_only_if_empty_skips_stored_memory(tmp_path):
+    storage = BACKENDS["sqlite"](tmp_path)
+    assert storage.import_memory(MEMORY, only_if_empty=True)
+    assert not storage.import_memory(MEMORY, only_if_empty=True)
+    assert len(storage.load()["research_history"]) == 1
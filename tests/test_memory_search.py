@@ -0,0 +1,70 @@
+"""Full-text search matches report bodies on both storage backends."""
+
+import pytest
+
+from memory_storage import JSONLMemoryStorage, SQLiteMemoryStorage
+
+
+BACKENDS = {
+    "sqlite": lambda tmp_path: SQLiteMemoryStorage(str(tmp_path / "memory_bank.sqlite3")),
+    "jsonl": lambda tmp_path: JSONLMemoryStorage(str(tmp_path / "memory_bank.jsonl")),
+}
+
+
+def store(storage, topic, timestamp, report=None):
+    entry = {"topic": topic, "timestamp": timestamp, "summary": f"Summary of {topic}"}
+    record = {"last_researched": timestamp, "research_count": 1}
+    results = {"report": {"report": report}} if report else {"summary": {"summary": "No report"}}
+    storage.append_research(entry, topic, record, results)
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def storage(request, tmp_path):
+    return BACKENDS[request.param](tmp_path)
+
+
+def test_phrase_only_in_report_is_found(storage):
+    store(storage, "Ocean acidification", "2024-01-01T00:00:00", "Coral reefs lose calcium carbonate.")
+    store(storage, "Urban heat islands", "2024-01-02T00:00:00", "Asphalt stores heat overnight.")
+
+    hits = storage.search(phrase="calcium carbonate")
+
+    assert [hit["topic"] for hit in hits] == ["Ocean acidification"]
+    assert "calcium" in hits[0]["snippet"]
+
+
+def test_report_matches_only_latest_session(storage):
+    store(storage, "Ocean acidification", "2024-01-01T00:00:00", "Coral reefs lose calcium carbonate.")
+    store(storage, "Ocean acidification", "2024-01-03T00:00:00", "Shellfish struggle to build shells.")
+
+    assert storage.search(phrase="calcium carbonate") == []
+    hits = storage.search(phrase="build shells")
+    assert [hit["timestamp"] for hit in hits] == ["2024-01-03T00:00:00"]
+
+
+def test_report_is_dropped_when_researched_without_one(storage):
+    store(storage, "Ocean acidification", "2024-01-01T00:00:00", "Coral reefs lose calcium carbonate.")
+    store(storage, "Ocean acidification", "2024-01-03T00:00:00")
+
+    assert storage.search(phrase="calcium carbonate") == []
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_reloaded_jsonl_log_indexes_reports_without_reading_results(tmp_path, compact):
+    path = str(tmp_path / "memory_bank.jsonl")
+    writer = JSONLMemoryStorage(path)
+    store(writer, "Ocean acidification", "2024-01-01T00:00:00", "Coral reefs lose sea urchins.")
+    store(writer, "Ocean acidification", "2024-01-02T00:00:00", "Coral reefs lose calcium carbonate.")
+    if compact:
+        writer.compact()
+
+    storage = JSONLMemoryStorage(path)
+    read_blob = storage.blobs.get
+    storage.blobs.get = None
+    storage.load()
+    storage.blobs.get = read_blob
+
+    assert storage.search(phrase="sea urchins") == []
+    hits = storage.search(query="calcium")
+    assert [hit["timestamp"] for hit in hits] == ["2024-01-02T00:00:00"]
+    assert "[calcium]" in hits[0]["snippet"]
@@ -0,0 +1,35 @@
+"""Sessions stay serializable and survive idle eviction."""
+
+import json
+
+import pytest
+
+from memory_manager import InMemorySessionService, ResearchMemoryManager
+
+
+def test_get_session_is_json_serializable():
+    service = InMemorySessionService(timeout_minutes=0, spill_dir="")
+    session_id = service.create_session("s1")
+    service.update_session_state("last_topic", "AI")
+
+    session = service.get_session(session_id)
+    assert isinstance(session["history"], list)
+    json.dumps(session)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ResearchMemoryManager(str(tmp_path / "memory_bank.json"))
+    manager.session_service = InMemorySessionService(timeout_minutes=0, spill_dir="")
+    yield manager
+    manager.memory_bank.close()
+
+
+def test_evicted_session_is_recreated(manager):
+    session_id = manager.start_research_session("s1")
+    manager.session_service._evict(session_id)
+
+    manager.save_research_to_session("AI", {"summary": {"summary": "About AI"}})
+
+    assert manager.session_service.get_session_state(session_id)["last_topic"] == "AI"
+    assert manager.get_research_context()["session_state"]["last_topic"] == "AI"
@@ -0,0 +1,93 @@
+"""Per-source summaries are written from grounded search text and reused across topics."""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from agents.orchestrator_agent import OrchestratorAgent
+from agents.sources import attach_grounding, parse_source_records
+from agents.summarization_agent import SummarizationAgent
+from source_store import SourceStore
+
+
+READ = {"title": "Read", "url": "https://example.org/read", "relevance": "Search note", "content": "Grounded text."}
+UNREAD = {"title": "Unread", "url": "https://example.org/unread", "relevance": "Only a search note"}
+
+SEARCH_TEXT = json.dumps([
+    {"title": "Coral bleaching study", "url": "https://example.org/coral",
+     "relevance": "Reefs bleach at 1C above the summer maximum."},
+    {"title": "Ungrounded paper", "url": "https://example.org/other", "relevance": "A guess."},
+])
+GROUNDED = "Reefs bleach at 1C above the summer maximum."
+
+
+def search_response():
+    start = SEARCH_TEXT.encode("utf-8").find(GROUNDED.encode("utf-8"))
+    segment = SimpleNamespace(start_index=start, end_index=start + len(GROUNDED), text=GROUNDED)
+    metadata = SimpleNamespace(
+        grounding_chunks=[SimpleNamespace(web=SimpleNamespace(uri="https://example.org/coral", title="coral"))],
+        grounding_supports=[SimpleNamespace(segment=segment, grounding_chunk_indices=[0])],
+    )
+    return SimpleNamespace(text=SEARCH_TEXT, candidates=[SimpleNamespace(grounding_metadata=metadata)])
+
+
+def test_grounded_segments_become_source_content():
+    records = parse_source_records(SEARCH_TEXT)
+    attach_grounding(records, SEARCH_TEXT, search_response())
+    assert [record.content for record in records] == [GROUNDED, ""]
+
+
+def test_summaries_expire(tmp_path):
+    store = SourceStore(str(tmp_path / "sources.sqlite3"), summary_ttl_seconds=60)
+    store.put_summaries([(READ, "Summary of the grounded text")], "model")
+    assert store.get_summaries([READ, UNREAD], "model") == {"https://example.org/read": "Summary of the grounded text"}
+
+    store.summary_ttl_seconds = 0
+    time.sleep(0.01)
+    assert store.get_summaries([READ], "model") == {}
+
+
+def test_sources_without_content_are_not_summarized(tmp_path):
+    agent = SummarizationAgent.__new__(SummarizationAgent)
+    agent.model_name = "model"
+    agent.source_store = SourceStore(str(tmp_path / "sources.sqlite3"))
+    prompts = []
+
+    async def generate(prompt, temperature=None):
+        prompts.append(prompt)
+        return SimpleNamespace(text='{"1": "Summary of the grounded text"}')
+
+    agent._generate_async = generate
+    result = asyncio.run(agent.summarize_sources_async([READ, UNREAD]))
+
+    assert [s["summary"] for s in result["source_summaries"]] == ["Summary of the grounded text", "Only a search note"]
+    assert result["generated"] == 1
+    assert len(prompts) == 1 and "Grounded text." in prompts[0] and "Unread" not in prompts[0]
+
+
+def test_orchestrator_summarizes_grounded_sources_once(tmp_path):
+    orchestrator = OrchestratorAgent(source_store=SourceStore(str(tmp_path / "sources.sqlite3")))
+    prompts = []
+
+    async def search_generate(prompt, temperature=None, tools=None):
+        return search_response()
+
+    async def summary_generate(prompt, temperature=None):
+        prompts.append(prompt)
+        return SimpleNamespace(text='{"1": "Bleaching starts 1C above the summer maximum."}')
+
+    async def summarize_async(content, focus=None):
+        return {"summary": "Overall summary"}
+
+    orchestrator.search_agent._generate_async = search_generate
+    orchestrator.summarization_agent._generate_async = summary_generate
+    orchestrator.summarization_agent.summarize_async = summarize_async
+
+    first = asyncio.run(orchestrator.custom_workflow_async("Coral reefs", ["search", "summarize"]))
+    second = asyncio.run(orchestrator.custom_workflow_async("Reef bleaching", ["search", "summarize"]))
+
+    expected = ["Bleaching starts 1C above the summer maximum.", "A guess."]
+    for result in (first, second):
+        assert [s["summary"] for s in result["steps"]["summarize"]["source_summaries"]] == expected
+    assert len(prompts) == 1 and GROUNDED in prompts[0] and "Ungrounded" not in prompts[0]
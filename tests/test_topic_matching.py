@@ -0,0 +1,71 @@
+"""Similar-topic suggestions must never treat different topics as the same."""
+
+import pytest
+
+from memory_index import TopicIndex, content_words
+from memory_manager import ResearchMemoryManager
+
+
+STORED = [
+    "Climate change effects on agriculture",
+    "Impact of AI on education",
+    "education",
+    "Impact of AI on education systems",
+]
+
+
+@pytest.fixture
+def index():
+    topic_index = TopicIndex()
+    for topic in STORED:
+        topic_index.add(topic)
+    return topic_index
+
+
+@pytest.mark.parametrize("query", [
+    "Climate change effects on aquaculture",
+    "Impact of AI on higher education",
+    "primary education",
+])
+def test_different_content_word_never_matches(index, query):
+    assert index.best_match(query, 0.0) is None
+
+
+def test_rewording_matches(index):
+    topic, score = index.best_match("AI impact on education system", 0.8)
+    assert topic == "Impact of AI on education systems"
+    assert score < 1.0
+
+
+def test_normalized_topic_is_exact(index):
+    assert index.best_match("  impact of ai on EDUCATION ", 0.99) == ("Impact of AI on education", 1.0)
+    assert index.lookup("impact of ai on education") == "Impact of AI on education"
+
+
+def test_content_words_ignore_stopwords_and_plurals():
+    assert content_words("Impact of AI on education systems") == content_words("AI education system impact")
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ResearchMemoryManager(str(tmp_path / "memory_bank.json"))
+    for topic in STORED:
+        manager.memory_bank.store_research(topic, {"summary": {"summary": f"About {topic}"}})
+    yield manager
+    manager.memory_bank.close()
+
+
+def test_retrieve_previous_research_is_exact(manager):
+    assert manager.retrieve_previous_research("Climate change effects on aquaculture") is None
+    assert manager.retrieve_previous_research("primary education") is None
+    assert manager.retrieve_previous_research("Impact of AI on higher education") is None
+    previous = manager.retrieve_previous_research("impact of AI on Education")
+    assert previous["summary"]["summary"] == "About Impact of AI on education"
+
+
+def test_suggestion_carries_score_without_results(manager):
+    assert manager.suggest_similar_research("Climate change effects on aquaculture") is None
+    match = manager.suggest_similar_research("AI impact on education system", threshold=0.8)
+    assert match["topic"] == "Impact of AI on education systems"
+    assert 0.8 <= match["score"] < 1.0
+    assert "results" not in match
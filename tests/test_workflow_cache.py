@@ -0,0 +1,31 @@
+"""Cached workflow step outputs expire after their node's TTL."""
+
+import asyncio
+import time
+
+from agents.workflow import NodeCache, WorkflowGraph
+
+
+def test_node_output_expires():
+    calls = []
+
+    async def search(topic):
+        calls.append(topic)
+        return f"results for {topic}"
+
+    graph = WorkflowGraph().add("search", search, ["topic"], ttl_seconds=0.05)
+    cache = NodeCache()
+
+    asyncio.run(graph.run({"topic": "t"}, cache=cache))
+    asyncio.run(graph.run({"topic": "t"}, cache=cache))
+    assert len(calls) == 1
+
+    time.sleep(0.06)
+    asyncio.run(graph.run({"topic": "t"}, cache=cache))
+    assert len(calls) == 2
+
+
+def test_output_without_ttl_is_kept():
+    cache = NodeCache()
+    cache.put("key", "value")
+    assert cache.get("key") == "value"
@@ -17,6 +17,7 @@ from typing import Tuple
 import gradio as gr
 
 from agents import OrchestratorAgent
+from config.agent_config import AgentConfig
 from memory_manager import ResearchMemoryManager
 
 
@@ -50,38 +51,66 @@ def get_orchestrator() -> OrchestratorAgent:
 
 
 def run_research(topic: str, depth: str, validate: bool, generate_report: bool):
-    """Gradio callback: run a research job and return outputs.
+    """Gradio callback: run a research job and stream outputs as they arrive.
 
-    Returns a tuple of (search_results, summary, validation_report, full_report, metadata_text).
+    Yields tuples of (search_results, summary, validation_report, full_report, metadata_text),
+    so the textboxes fill in progressively while each phase is generated.
     """
     ok, msg = _ensure_api_key()
     if not ok:
-        return "", "", "", msg
+        yield "", "", "", "", msg
+        return
 
     topic = topic.strip()
     if not topic:
-        return "", "", "", "Please enter a research topic."
+        yield "", "", "", "", "Please enter a research topic."
+        return
 
     # Start a named session for the web UI
     session_id = memory_manager.start_research_session("web_ui_session")
 
+    outputs = {"search": "", "summary": "", "validation": "", "report": ""}
+
+    def snapshot(metadata: str):
+        return (
+            outputs["search"],
+            outputs["summary"],
+            outputs["validation"],
+            outputs["report"],
+            metadata,
+        )
+
     try:
         orc = get_orchestrator()
-        results = orc.conduct_research(
+        results = {}
+        yield snapshot(f"Session: {session_id}\nSearching literature...")
+
+        # Refresh a topic researched before instead of starting over; only
+        # the same (normalized) topic is refreshed, never a similar one
+        previous = None
+        if AgentConfig.INCREMENTAL_RESEARCH:
+            previous = memory_manager.memory_bank.retrieve_research(topic)
+
+        for event in orc.conduct_research_stream(
             topic=topic,
             depth=depth,
             validate=validate,
             generate_report=generate_report,
-        )
+            previous=previous,
+        ):
+            phase = event["phase"]
+            if event["event"] == "chunk":
+                outputs[phase] += event["text"]
+            elif phase == "search":
+                outputs["search"] = event["result"].get("search_results", "")
+            elif phase == "done":
+                results = event["result"]
+                continue
+            yield snapshot(f"Session: {session_id}\nRunning phase: {phase}...")
 
         # Persist to memory bank
         memory_manager.save_research_to_session(topic, results)
 
-        search_results = results.get("search_results", {}).get("search_results", "")
-        summary = results.get("summary", {}).get("summary", "")
-        validation_report = results.get("validation", {}).get("validation_report", "")
-        full_report = results.get("report", {}).get("report", "")
-
         ctx = memory_manager.get_research_context()
         stats = ctx["statistics"]
         metadata = (
@@ -91,10 +120,10 @@ def run_research(topic: str, depth: str, validate: bool, generate_report: bool):
             f"Most researched topic: {stats['most_researched']}"
         )
 
-        return search_results, summary, validation_report, full_report, metadata
+        yield snapshot(metadata)
 
     except Exception as e:  # Surface clean error to UI
-        return "", "", "", "", f"Error while running research: {e}"
+        yield snapshot(f"Error while running research: {e}")
 
     finally:
         memory_manager.end_research_session()